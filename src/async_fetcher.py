@@ -0,0 +1,258 @@
+"""
+异步GitHub数据抓取层
+基于asyncio + aiohttp：共享连接池、并发上限、Link头分页、X-RateLimit感知退避
+API根地址可通过参数或环境变量OPENSAGA_GITHUB_API指向本地桩服务器，便于回放录制的分页数据
+传入ResponseCache时使用条件请求重新验证缓存，离线模式下完全从缓存回放
+"""
+
+import asyncio
+import json
+import os
+import re
+import time
+from collections import deque
+from urllib.parse import urlencode, urlparse, parse_qs
+
+import aiohttp
+
+GITHUB_API_URL = os.environ.get('OPENSAGA_GITHUB_API', 'https://api.github.com')
+
+_LINK_RE = re.compile(r'<([^>]+)>\s*;\s*rel="([^"]+)"')
+
+
+def parse_link_header(value):
+    """解析Link响应头，返回 {rel: url}"""
+    if not value:
+        return {}
+    return {rel: url for url, rel in _LINK_RE.findall(value)}
+
+
+def _page_number(url):
+    """从分页URL中取出page参数"""
+    if not url:
+        return None
+    page = parse_qs(urlparse(url).query).get('page')
+    return int(page[0]) if page else None
+
+
+def _with_page(url, page):
+    """把分页URL中的page参数替换为指定页码"""
+    parsed = urlparse(url)
+    query = parse_qs(parsed.query)
+    query['page'] = [str(page)]
+    return parsed._replace(query=urlencode(query, doseq=True)).geturl()
+
+
+class AsyncFetcher:
+    """
+    异步HTTP抓取器，需在 async with 中使用
+
+    参数:
+        api_base: API根地址，默认https://api.github.com
+        token: GitHub token，默认读取环境变量GITHUB_TOKEN
+        max_concurrency: 同时进行的请求数上限（同时也是连接池大小）
+        max_retries: 单个请求的最大重试次数
+        timeout: 单个请求超时（秒）
+        backoff_base: 指数退避的基础等待时间（秒）
+        cache: http_cache.ResponseCache实例，None表示不缓存
+    """
+
+    def __init__(self, api_base=None, token=None, max_concurrency=8, max_retries=5,
+                 timeout=30, backoff_base=1.0, cache=None):
+        self.api_base = (api_base or GITHUB_API_URL).rstrip('/')
+        self.token = token if token is not None else os.environ.get('GITHUB_TOKEN')
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.backoff_base = backoff_base
+        self.cache = cache
+        self.stats = {'requests': 0, 'retries': 0, 'rate_limited': 0}
+        self._session = None
+        self._semaphore = None
+        # 速率限制耗尽时，在该时间点之前不再发出新请求
+        self._rate_reset_at = 0.0
+
+    async def __aenter__(self):
+        headers = {'Accept': 'application/vnd.github+json', 'User-Agent': 'OpenSaga'}
+        if self.token:
+            headers['Authorization'] = f'Bearer {self.token}'
+        connector = aiohttp.TCPConnector(limit=self.max_concurrency, ttl_dns_cache=300)
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            headers=headers,
+            timeout=aiohttp.ClientTimeout(total=self.timeout)
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self._session.close()
+        self._session = None
+
+    def _build_url(self, path, params=None):
+        url = path if path.startswith(('http://', 'https://')) else f"{self.api_base}/{path.lstrip('/')}"
+        if params:
+            url += ('&' if '?' in url else '?') + urlencode(params)
+        return url
+
+    def _update_rate_limit(self, headers):
+        """根据X-RateLimit-*响应头记录配额耗尽后的恢复时间"""
+        remaining = headers.get('X-RateLimit-Remaining')
+        reset = headers.get('X-RateLimit-Reset')
+        if remaining is not None and reset is not None and int(remaining) <= 0:
+            self._rate_reset_at = max(self._rate_reset_at, float(reset) + 1)
+
+    async def _wait_for_rate_limit(self):
+        delay = self._rate_reset_at - time.time()
+        if delay > 0:
+            print(f"   已达到API速率限制，等待 {delay:.0f} 秒后继续...")
+            await asyncio.sleep(delay)
+
+    def _retry_delay(self, status, headers, attempt):
+        """计算重试前的等待时间，返回None表示不可重试"""
+        retry_after = headers.get('Retry-After')
+        if status in (403, 429):
+            if retry_after:
+                self.stats['rate_limited'] += 1
+                return float(retry_after)
+            if headers.get('X-RateLimit-Remaining') == '0':
+                self.stats['rate_limited'] += 1
+                # 实际等待由_wait_for_rate_limit按重置时间完成
+                return 0.0
+            return None
+        if status >= 500:
+            return self.backoff_base * 2 ** attempt
+        return None
+
+    async def get_json(self, path, params=None):
+        """
+        发送GET请求，返回 (解析后的JSON, 响应头)
+        遇到速率限制、5xx或网络错误时按退避策略重试
+        """
+        url = self._build_url(path, params)
+        entry = None
+        request_headers = {}
+        if self.cache is not None:
+            cached, entry = self.cache.check(url)
+            if cached is not None:
+                return json.loads(cached[0]), cached[1]
+            if entry is not None:
+                request_headers = self.cache.conditional_headers(entry)
+
+        for attempt in range(self.max_retries + 1):
+            await self._wait_for_rate_limit()
+            async with self._semaphore:
+                try:
+                    async with self._session.get(url, headers=request_headers) as response:
+                        self.stats['requests'] += 1
+                        headers = response.headers.copy()
+                        self._update_rate_limit(headers)
+                        if response.status == 304 and entry is not None:
+                            body, cached_headers = self.cache.revalidated(url, entry, headers)
+                            return json.loads(body), cached_headers
+                        if response.status < 400:
+                            body = await response.read()
+                            if self.cache is not None:
+                                self.cache.store(url, body, headers)
+                            return json.loads(body), headers
+                        delay = self._retry_delay(response.status, headers, attempt)
+                        if delay is None or attempt == self.max_retries:
+                            body = await response.text()
+                            raise RuntimeError(f"请求失败，状态码: {response.status}, URL: {url}, 响应: {body[:200]}")
+                except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                    if attempt == self.max_retries:
+                        raise RuntimeError(f"请求失败: {url}: {e}") from e
+                    delay = self.backoff_base * 2 ** attempt
+            # 在信号量之外等待，避免占用并发名额
+            self.stats['retries'] += 1
+            await asyncio.sleep(delay)
+
+    async def iter_pages(self, path, params=None, max_pages=None):
+        """
+        按Link头分页，逐页产出条目列表（按页序）
+        响应带有rel="last"时，剩余页面在并发上限内预取；否则顺序跟随rel="next"
+        """
+        data, headers = await self.get_json(path, params)
+        yield data
+        links = parse_link_header(headers.get('Link'))
+        next_url = links.get('next')
+        last_page = _page_number(links.get('last'))
+        first_next = _page_number(next_url)
+
+        if next_url and last_page and first_next:
+            if max_pages:
+                last_page = min(last_page, first_next + max_pages - 2)
+            # 滑动窗口预取：队列中始终保持若干在途请求，结果按页序产出
+            pending = deque()
+            pages = iter(range(first_next, last_page + 1))
+            window = self.max_concurrency * 2
+            for page in pages:
+                pending.append(asyncio.ensure_future(self.get_json(_with_page(next_url, page))))
+                if len(pending) >= window:
+                    break
+            try:
+                while pending:
+                    data, _ = await pending.popleft()
+                    yield data
+                    page = next(pages, None)
+                    if page is not None:
+                        pending.append(asyncio.ensure_future(self.get_json(_with_page(next_url, page))))
+            finally:
+                for task in pending:
+                    task.cancel()
+            return
+
+        fetched = 1
+        while next_url and (max_pages is None or fetched < max_pages):
+            data, headers = await self.get_json(next_url)
+            yield data
+            fetched += 1
+            next_url = parse_link_header(headers.get('Link')).get('next')
+
+    async def fetch_all(self, path, params=None, max_pages=None, max_items=None):
+        """抓取全部分页并拼接为一个列表"""
+        items = []
+        async for page in self.iter_pages(path, params, max_pages=max_pages):
+            if not isinstance(page, list):
+                raise RuntimeError(f"分页接口返回了非列表数据: {str(page)[:200]}")
+            items.extend(page)
+            if max_items is not None and len(items) >= max_items:
+                return items[:max_items]
+        return items
+
+
+def fetch_github_repo(org, repo, since=None, max_contributors=50, per_page=100, include_issues=True,
+                      **fetcher_kwargs):
+    """
+    在同一个连接池内并发抓取仓库的贡献者与全部issues/PR
+
+    参数:
+        org, repo: 仓库所属组织与名称
+        since: ISO时间字符串，只抓取该时间之后更新过的issues
+        max_contributors: 贡献者数量上限
+        per_page: 每页条目数（GitHub上限为100）
+        include_issues: 为False时只抓取贡献者
+        fetcher_kwargs: 透传给AsyncFetcher的参数
+
+    返回:
+        (contributors, issues) 两个列表，include_issues为False时issues为None
+    """
+    issue_params = {'state': 'all', 'per_page': per_page}
+    if since:
+        issue_params['since'] = since
+
+    async def _run():
+        async with AsyncFetcher(**fetcher_kwargs) as fetcher:
+            requests = [fetcher.fetch_all(f'repos/{org}/{repo}/contributors',
+                                          {'per_page': min(per_page, max_contributors)},
+                                          max_items=max_contributors)]
+            if include_issues:
+                requests.append(fetcher.fetch_all(f'repos/{org}/{repo}/issues', issue_params))
+            results = await asyncio.gather(*requests)
+            contributors = results[0]
+            issues = results[1] if include_issues else None
+            print(f"   共发出 {fetcher.stats['requests']} 个请求，重试 {fetcher.stats['retries']} 次，"
+                  f"触发速率限制 {fetcher.stats['rate_limited']} 次")
+            return contributors, issues
+
+    return asyncio.run(_run())
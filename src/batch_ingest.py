@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+多仓库批量抓取
+各仓库在进程池中并发抓取原始交互记录（登录名层面），
+再统一登记到全局开发者注册表，合并为一份时序协作数据
+
+用法:
+    python batch_ingest.py pandas-dev/pandas numpy/numpy --workers 4
+    python batch_ingest.py --file repos.txt --since 2025-01-01T00:00:00Z
+"""
+
+import argparse
+import os
+import shutil
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from developer_registry import DeveloperRegistry
+from edge_extractor import extract_interactions, interactions_to_edges
+from edge_store import (DEFAULT_PARTITION_DIR, EDGE_COLUMNS, append_partitions,
+                        compute_monthly_metrics, list_partitions, read_partitions)
+from http_cache import ResponseCache
+
+PROJECT_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(PROJECT_PATH, 'data')
+DEFAULT_STAGING_DIR = os.path.join(DATA_DIR, '.batch')
+
+
+def _staging_dir(staging_root, repo_spec):
+    return os.path.join(staging_root, repo_spec.replace('/', '__'))
+
+
+def ingest_repo(repo_spec, since=None, staging_root=None, chunk_size=5000):
+    """
+    进程池工作函数：抓取单个仓库的交互记录并分块写入暂存目录
+
+    返回:
+        (repo_spec, 统计信息)
+    """
+    org, repo = repo_spec.split('/')
+    out_dir = _staging_dir(staging_root or DEFAULT_STAGING_DIR, repo_spec)
+    if os.path.isdir(out_dir):
+        shutil.rmtree(out_dir)
+    os.makedirs(out_dir)
+    chunk_ids = iter(range(1, 1000000))
+
+    def write_chunk(chunk_df):
+        chunk_df.to_csv(os.path.join(out_dir, f'chunk-{next(chunk_ids):05d}.csv'), index=False)
+
+    stats = extract_interactions(org, repo, write_chunk, since=since, chunk_size=chunk_size,
+                                 cache=ResponseCache.from_env())
+    return repo_spec, stats
+
+
+def merge_staged(repo_specs, registry, staging_root=None):
+    """
+    按仓库顺序把暂存的交互记录登记到注册表并写入月份分区
+    ID分配只依赖仓库顺序和记录顺序，与进程完成的先后无关
+    """
+    staging_root = staging_root or DEFAULT_STAGING_DIR
+    if os.path.isdir(DEFAULT_PARTITION_DIR):
+        shutil.rmtree(DEFAULT_PARTITION_DIR)
+    total = 0
+    for repo_spec in repo_specs:
+        repo_dir = _staging_dir(staging_root, repo_spec)
+        for index, name in enumerate(sorted(os.listdir(repo_dir))):
+            interactions_df = pd.read_csv(os.path.join(repo_dir, name))
+            logins = pd.concat([interactions_df[['author', 'timestamp']].set_axis(['login', 'timestamp'], axis=1),
+                                interactions_df[['responder', 'timestamp']].set_axis(['login', 'timestamp'], axis=1)])
+            first_seen = logins.sort_values('timestamp').drop_duplicates('login')
+            registry.intern_many(first_seen['login'], first_seen['timestamp'])
+            edges_df = interactions_to_edges(interactions_df, registry)
+            if not edges_df.empty:
+                append_partitions(edges_df, run_id=f"{repo_spec.replace('/', '__')}-{index:05d}")
+                total += len(edges_df)
+    return total
+
+
+def batch_ingest(repo_specs, workers=4, since=None, staging_root=None):
+    """
+    批量抓取多个仓库并合并为全局开发者ID空间下的一份时序协作数据
+
+    参数:
+        repo_specs: ['org/repo', ...]
+        workers: 并发抓取的进程数
+        since: 只抓取该时间之后的数据（ISO时间字符串）
+    """
+    print("=" * 60)
+    print(f"批量抓取 {len(repo_specs)} 个仓库（{workers} 个进程）")
+    print("=" * 60)
+
+    print("\n1. 并发抓取交互记录...")
+    succeeded = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(ingest_repo, spec, since, staging_root): spec for spec in repo_specs}
+        for future in as_completed(futures):
+            spec = futures[future]
+            try:
+                _, stats = future.result()
+                succeeded.append(spec)
+                print(f"    {spec}: {stats['interactions']} 次交互，{stats['requests']} 个请求")
+            except Exception as e:
+                print(f"    {spec} 抓取失败: {e}")
+    succeeded = [spec for spec in repo_specs if spec in succeeded]
+    if not succeeded:
+        print("没有成功抓取的仓库")
+        return None
+
+    print("\n2. 合并到全局开发者注册表...")
+    registry = DeveloperRegistry.load()
+    known = len(registry)
+    total = merge_staged(succeeded, registry, staging_root)
+    registry.save()
+    print(f"    developers.csv: {len(registry)} 位开发者（新增 {len(registry) - known} 位）")
+    print(f"    合并 {total} 条协作记录，{len(list_partitions())} 个月份分区")
+
+    print("\n3. 导出数据文件...")
+    collaborations_csv_path = os.path.join(DATA_DIR, 'collaborations_temporal.csv')
+    months = list_partitions()
+    if not months:
+        # 抓取成功但没有任何交互：写出只有表头的文件，避免下游读到上一批数据
+        empty_df = pd.DataFrame(columns=EDGE_COLUMNS)
+        monthly_df = compute_monthly_metrics(empty_df)
+        empty_df.to_csv(collaborations_csv_path, index=False)
+        monthly_df.to_csv(os.path.join(DATA_DIR, 'monthly_metrics.csv'), index=False)
+        empty_df[['source', 'target', 'weight']].to_csv(os.path.join(DATA_DIR, 'latest_network.csv'), index=False)
+        print("    没有协作记录，已写出只有表头的 collaborations_temporal.csv / monthly_metrics.csv / latest_network.csv")
+        print("\n" + "=" * 60)
+        print(f"批量抓取完成：{len(succeeded)}/{len(repo_specs)} 个仓库（无协作记录）")
+        print("=" * 60)
+        return registry.to_frame(), monthly_df
+
+    monthly = []
+    for index, year_month in enumerate(months):
+        # 逐月导出，避免一次性载入全部协作记录
+        month_df = read_partitions(months=[year_month])
+        month_df[EDGE_COLUMNS].to_csv(collaborations_csv_path, mode='w' if index == 0 else 'a',
+                                      header=index == 0, index=False)
+        monthly.append(compute_monthly_metrics(month_df))
+    monthly_df = pd.concat(monthly, ignore_index=True)
+    monthly_df.to_csv(os.path.join(DATA_DIR, 'monthly_metrics.csv'), index=False)
+    month_df[['source', 'target', 'weight']].to_csv(os.path.join(DATA_DIR, 'latest_network.csv'), index=False)
+    print(f"    collaborations_temporal.csv / monthly_metrics.csv: {len(monthly_df)} 个月份")
+    print(f"    latest_network.csv: {year_month} 月网络快照，{len(month_df)} 条边")
+
+    print("\n" + "=" * 60)
+    print(f"批量抓取完成：{len(succeeded)}/{len(repo_specs)} 个仓库")
+    print("=" * 60)
+    return registry.to_frame(), monthly_df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="多仓库批量抓取协作数据")
+    parser.add_argument('repos', nargs='*', help="org/repo 形式的仓库列表")
+    parser.add_argument('--file', help="每行一个org/repo的仓库列表文件")
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--since', help="只抓取该时间之后的数据，如2025-01-01T00:00:00Z")
+    args = parser.parse_args()
+
+    repo_specs = list(args.repos)
+    if args.file:
+        with open(args.file, encoding='utf-8') as f:
+            repo_specs += [line.strip() for line in f if line.strip() and not line.startswith('#')]
+    if not repo_specs:
+        parser.error("请指定至少一个仓库")
+    # 保持顺序去重
+    repo_specs = list(dict.fromkeys(repo_specs))
+    if batch_ingest(repo_specs, workers=args.workers, since=args.since) is None:
+        sys.exit(1)
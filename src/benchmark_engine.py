@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+GraphEngine后端一致性与性能对比
+
+在规模递增的模拟协作网络上，对每个后端运行 建图、由networkx图转换、PageRank、度中心性、社区检测、介数中心性，
+与参考后端（默认NetworkX）比较数值是否在容差内一致，并记录每项的耗时与峰值内存，
+结果写入JSON报告（默认 data/engine_benchmark.json）
+
+- 耗时: time.perf_counter，重复repeat次取最小值
+- 峰值内存: 另跑一次并用tracemalloc统计（tracemalloc会拖慢执行，因此不与计时混在一起）
+- 社区检测的划分带随机性，比较的是模块度之差
+- 介数中心性在节点数不超过exact_limit时精确计算并比较，更大的图按抽样源点计算，只记录性能
+
+用法:
+    python benchmark_engine.py
+    python benchmark_engine.py --sizes 100 1000 10000 --backends networkx sparse --repeat 3
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from cost_model import DEFAULT_REPORT_PATH
+import graph_engine
+from graph_engine import GraphEngine, available_backends
+from graph_snapshot import snapshot_from_frame
+from sparse_graph import as_sparse
+from synthetic_generator import SyntheticNetwork
+
+DEFAULT_SIZES = [100, 1000, 5000]
+
+# 与参考后端比较时允许的最大绝对误差（社区检测为模块度之差）
+TOLERANCES = {
+    'pagerank': 1.0e-5,
+    'degree_centrality': 1.0e-12,
+    'community_detection': 0.05,
+    'betweenness': 1.0e-9,
+}
+
+
+def make_snapshot(num_nodes, avg_degree=8, seed=0):
+    """生成一个月的模拟协作网络（全部开发者在岗），返回CSR快照"""
+    network = SyntheticNetwork(num_developers=num_nodes, months=1, events_per_month=num_nodes * avg_degree,
+                               initial_fraction=1.0, churn_rate=0.0, seed=seed)
+    edges_df = next(network.iter_edges())
+    return snapshot_from_frame(edges_df, nodes=np.arange(1, num_nodes + 1))
+
+
+def modularity(snapshot, communities):
+    """无向加权模块度（与python-louvain所用的定义一致）"""
+    G = as_sparse(snapshot).to_undirected()
+    indptr, indices, weights = G.csr()
+    n = len(indptr) - 1
+    labels = np.full(n, -1, dtype=np.int64)
+    index = {node: i for i, node in enumerate(G.labels().tolist())}
+    for community_id, members in enumerate(communities):
+        labels[[index[node] for node in members]] = community_id
+    rows = np.repeat(np.arange(n), np.diff(indptr))
+    # 自环在对称CSR中只存一次，度数按两倍计
+    weights = np.where(rows == indices, 2 * weights, weights)
+    total = weights.sum()
+    if total == 0:
+        return 0.0
+    degree = np.bincount(rows, weights=weights, minlength=n)
+    inside = np.bincount(labels[rows], weights=np.where(labels[rows] == labels[indices], weights, 0.0),
+                         minlength=len(communities))
+    community_degree = np.bincount(labels, weights=degree, minlength=len(communities))
+    return float((inside / total - (community_degree / total) ** 2).sum())
+
+
+def _operations(engine, G, snapshot, exact_limit, seed):
+    """{操作名称: 无参函数}"""
+    n = snapshot.num_nodes
+    mode = 'exact' if n <= exact_limit else 'sampled'
+    return {
+        'pagerank': lambda: engine.calculate_pagerank(G, alpha=0.85),
+        'degree_centrality': lambda: engine.calculate_degree_centrality(G),
+        'community_detection': lambda: engine.add_community_detection(G),
+        'betweenness': lambda: engine.calculate_betweenness_centrality(G, mode=mode, seed=seed, workers=1),
+    }
+
+
+def _convert_uncached(engine, G):
+    """把networkx图转换为后端的表示（先清掉转换缓存，测的是真实的转换开销）"""
+    graph_engine._CONVERSIONS.pop(G, None)
+    return engine.convert(G)
+
+
+def _measure(func, repeat):
+    """返回 (结果, 最短耗时, 峰值内存字节数)"""
+    seconds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        seconds.append(time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, min(seconds), peak
+
+
+def _compare(operation, result, reference, snapshot):
+    """与参考结果的最大绝对误差"""
+    if operation == 'community_detection':
+        return abs(modularity(snapshot, result) - modularity(snapshot, reference))
+    nodes = list(reference)
+    if set(result) != set(nodes):
+        return float('inf')
+    return float(np.max(np.abs(np.array([result[node] for node in nodes]) -
+                               np.array([reference[node] for node in nodes])))) if nodes else 0.0
+
+
+def run_benchmark(sizes=None, backends=None, reference='networkx', repeat=3, avg_degree=8, exact_limit=2000,
+                  seed=0, output_path=None):
+    """
+    运行对比并写入JSON报告
+
+    参数:
+        sizes: 节点数列表
+        backends: 参与对比的后端名称，默认全部已注册后端
+        reference: 参考后端，其结果作为一致性比较的基准（不可用时取第一个可用后端）
+        exact_limit: 介数中心性精确计算的最大节点数
+
+    返回:
+        报告dict
+    """
+    sizes = sizes or DEFAULT_SIZES
+    backends = backends or available_backends()
+    output_path = output_path or DEFAULT_REPORT_PATH
+    print("=" * 60)
+    print(f"GraphEngine后端对比: {backends}，规模 {sizes}")
+    print("=" * 60)
+
+    engines = {}
+    backend_info = {}
+    for name in backends:
+        engine = GraphEngine(backend=name)
+        try:
+            backend_info[name] = dict(engine.get_info(), status='ok')
+            engines[name] = engine
+        except RuntimeError as e:
+            backend_info[name] = {'status': 'unavailable', 'error': str(e)}
+    if reference not in engines:
+        reference = next(iter(engines), None)
+    order = ([reference] if reference else []) + [name for name in engines if name != reference]
+
+    results = []
+    for size in sizes:
+        snapshot = make_snapshot(size, avg_degree=avg_degree, seed=seed)
+        print(f"\n规模 {size}: {snapshot.num_nodes} 个节点, {snapshot.num_edges} 条边")
+        G_dict = snapshot.to_networkx()
+        reference_results = {}
+        for name in order:
+            engine = engines[name]
+            record = {'backend': name, 'size': size, 'num_nodes': snapshot.num_nodes,
+                      'num_edges': snapshot.num_edges}
+            G, build_seconds, build_peak = _measure(lambda: engine.from_snapshot(snapshot), repeat)
+            results.append(dict(record, operation='build', status='ok', seconds=build_seconds,
+                                peak_memory_bytes=build_peak))
+            # 由dict图（networkx）转换而来的开销，代价模型据此估计跨后端调用的转换成本
+            _, convert_seconds, convert_peak = _measure(lambda: _convert_uncached(engine, G_dict), repeat)
+            results.append(dict(record, operation='convert', status='ok', seconds=convert_seconds,
+                                peak_memory_bytes=convert_peak))
+            for operation, func in _operations(engine, G, snapshot, exact_limit, seed).items():
+                entry = dict(record, operation=operation, tolerance=TOLERANCES[operation])
+                try:
+                    result, seconds, peak = _measure(func, repeat)
+                except Exception as e:
+                    entry.update(status='error', error=f"{type(e).__name__}: {e}")
+                    results.append(entry)
+                    print(f"    {name:<10} {operation:<20} 失败: {entry['error']}")
+                    continue
+                entry.update(status='ok', seconds=seconds, peak_memory_bytes=peak)
+                comparable = operation != 'betweenness' or snapshot.num_nodes <= exact_limit
+                if name == reference:
+                    reference_results[operation] = result
+                    entry.update(max_abs_error=0.0, agrees=True)
+                elif comparable and operation in reference_results:
+                    error = _compare(operation, result, reference_results[operation], snapshot)
+                    entry.update(max_abs_error=error, agrees=bool(error <= TOLERANCES[operation]))
+                else:
+                    entry.update(max_abs_error=None, agrees=None)
+                results.append(entry)
+                print(f"    {name:<10} {operation:<20} {seconds:8.4f}s  峰值内存 {peak / 1024 ** 2:8.2f} MB"
+                      f"  {'' if entry['agrees'] is None else ('一致' if entry['agrees'] else '不一致')}")
+
+    report = {
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'reference': reference,
+        'sizes': sizes,
+        'repeat': repeat,
+        'avg_degree': avg_degree,
+        'exact_limit': exact_limit,
+        'backends': backend_info,
+        'results': results,
+    }
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n报告已保存到: {output_path}")
+    disagreements = [r for r in results if r.get('agrees') is False]
+    if disagreements:
+        print(f"   {len(disagreements)} 项结果超出容差: "
+              f"{sorted({(r['backend'], r['operation']) for r in disagreements})}")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="GraphEngine后端一致性与性能对比")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--backends', nargs='+', default=None, help="默认全部已注册后端")
+    parser.add_argument('--reference', default='networkx')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--avg-degree', type=int, default=8)
+    parser.add_argument('--exact-limit', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=None)
+    args = parser.parse_args()
+
+    run_benchmark(sizes=args.sizes, backends=args.backends, reference=args.reference, repeat=args.repeat,
+                  avg_degree=args.avg_degree, exact_limit=args.exact_limit, seed=args.seed,
+                  output_path=args.output)
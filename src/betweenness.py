@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+介数与接近中心性（CSR邻接上的Brandes算法，按跳数计最短路径，与networkx默认weight=None一致）
+
+三种模式:
+- exact: 以全部节点为源点，结果与networkx.betweenness_centrality一致
+- sampled: 随机抽取k个源点（Brandes-Pich），按networkx的k参数同样的方式缩放为无偏估计
+- rk: Riondato-Kornaropoulos自适应采样，随机抽取(s, t)节点对并在其最短路径中均匀抽一条，
+      样本数由顶点直径上界与(epsilon, delta)决定，以至少1-delta的概率所有节点的
+      归一化介数误差不超过epsilon，样本数与图规模无关
+
+每个源点的BFS按层整批处理：逐层展开前沿节点的出边、累计最短路径条数sigma，
+再逐层反向累计依赖度delta，不为单个节点/边执行Python循环
+
+精确计算可按源点划分到进程池（shortest_path_centrality）：CSR数组写入临时目录后由各进程
+以内存映射只读共享，每个进程累计自己那部分源点的依赖度与距离和，最后按固定顺序归约
+"""
+
+import math
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+import numpy as np
+
+from sparse_graph import as_sparse, connected_component_labels
+
+BETWEENNESS_MODES = ['exact', 'sampled', 'rk']
+
+# 节点数低于该值时进程池的启动与归约开销大于收益，GraphEngine直接串行计算
+PARALLEL_MIN_NODES = 2000
+
+
+def _expand(indptr, indices, frontier):
+    """前沿节点的全部出边 (源节点, 目标节点)"""
+    starts = indptr[frontier]
+    counts = indptr[frontier + 1] - starts
+    total = int(counts.sum())
+    if total == 0:
+        return frontier[:0], indices[:0]
+    offsets = np.repeat(starts - np.cumsum(counts) + counts, counts)
+    return np.repeat(frontier, counts), indices[offsets + np.arange(total)]
+
+
+def _bfs(indptr, indices, source, n, target=None):
+    """
+    单源BFS
+
+    返回:
+        dist: 跳数（不可达为-1）
+        sigma: 最短路径条数
+        levels: 每层最短路径DAG上的边 [(u数组, v数组), ...]，第i项为第i层到第i+1层的边
+    """
+    dist = np.full(n, -1, dtype=np.int64)
+    sigma = np.zeros(n)
+    dist[source] = 0
+    sigma[source] = 1.0
+    frontier = np.array([source], dtype=np.int64)
+    levels = []
+    depth = 0
+    while len(frontier):
+        u, v = _expand(indptr, indices, frontier)
+        dist[v[dist[v] == -1]] = depth + 1
+        on_dag = dist[v] == depth + 1
+        u, v = u[on_dag], v[on_dag]
+        if len(v) == 0:
+            break
+        sigma += np.bincount(v, weights=sigma[u], minlength=n)
+        levels.append((u, v))
+        if target is not None and dist[target] >= 0:
+            break
+        depth += 1
+        frontier = np.flatnonzero(dist == depth)
+    return dist, sigma, levels
+
+
+def _dependencies(sigma, levels, source, n):
+    """由单源BFS结果计算依赖度 delta_s(v)（不含源点自身）"""
+    delta = np.zeros(n)
+    for u, v in reversed(levels):
+        delta += np.bincount(u, weights=sigma[u] / sigma[v] * (1.0 + delta[v]), minlength=n)
+    delta[source] = 0.0
+    return delta
+
+
+def accumulate(G, sources):
+    """以sources为源点累计依赖度之和（未缩放）"""
+    indptr, indices, _ = G.csr()
+    n = len(indptr) - 1
+    return _partials(indptr, indices, sources, n, closeness=False)[0]
+
+
+def _partials(indptr, indices, sources, n, betweenness=True, closeness=True):
+    """
+    一组源点的部分结果
+
+    返回:
+        (依赖度之和, 各节点被这些源点到达的距离之和, 可到达该节点的源点数)
+    """
+    total = np.zeros(n)
+    dist_sum = np.zeros(n, dtype=np.int64)
+    reach = np.zeros(n, dtype=np.int64)
+    for source in sources:
+        source = int(source)
+        dist, sigma, levels = _bfs(indptr, indices, source, n)
+        if betweenness:
+            total += _dependencies(sigma, levels, source, n)
+        if closeness:
+            reachable = dist >= 0
+            dist_sum[reachable] += dist[reachable]
+            reach += reachable
+    return total, dist_sum, reach
+
+
+_SHARED_CSR = None
+
+
+def _init_worker(directory):
+    global _SHARED_CSR
+    _SHARED_CSR = tuple(np.load(os.path.join(directory, f'{name}.npy'), mmap_mode='r')
+                        for name in ('indptr', 'indices'))
+
+
+def _partials_task(sources, betweenness, closeness):
+    indptr, indices = _SHARED_CSR
+    return _partials(indptr, indices, sources, len(indptr) - 1, betweenness, closeness)
+
+
+def shortest_path_centrality(G, betweenness=True, closeness=True, workers=None, normalized=True, wf_improved=True):
+    """
+    以全部节点为源点精确计算介数与接近中心性，一次BFS同时服务两个指标
+
+    参数:
+        workers: 进程数，None为CPU核数，1为在当前进程中串行计算
+        normalized: 介数的缩放方式（同networkx.betweenness_centrality）
+        wf_improved: 接近中心性按可达比例修正（同networkx.closeness_centrality）
+
+    返回:
+        {'betweenness': {节点: 值}, 'closeness': {节点: 值}}（只包含要求计算的指标）；
+        接近中心性按到达该节点的距离计算（有向图即入向距离），与networkx一致
+    """
+    G = as_sparse(G)
+    indptr, indices, _ = G.csr()
+    n = len(indptr) - 1
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or n < 2:
+        partials = [_partials(indptr, indices, range(n), n, betweenness, closeness)]
+    else:
+        # 源点交错划分成多于进程数的块，各块的BFS开销更均衡
+        num_chunks = min(n, workers * 4)
+        chunks = [np.arange(i, n, num_chunks) for i in range(num_chunks)]
+        with tempfile.TemporaryDirectory() as directory:
+            np.save(os.path.join(directory, 'indptr.npy'), np.ascontiguousarray(indptr))
+            np.save(os.path.join(directory, 'indices.npy'), np.ascontiguousarray(indices))
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(directory,)) as pool:
+                partials = list(pool.map(_partials_task, chunks, repeat(betweenness), repeat(closeness)))
+
+    total = np.zeros(n)
+    dist_sum = np.zeros(n, dtype=np.int64)
+    reach = np.zeros(n, dtype=np.int64)
+    for part_total, part_dist, part_reach in partials:
+        total += part_total
+        dist_sum += part_dist
+        reach += part_reach
+
+    labels = G.labels().tolist()
+    result = {}
+    if betweenness:
+        result['betweenness'] = dict(zip(labels, _rescale(total, n, normalized, G.directed).tolist()))
+    if closeness:
+        values = np.zeros(n)
+        valid = dist_sum > 0
+        if n > 1:
+            values[valid] = (reach[valid] - 1.0) / dist_sum[valid]
+            if wf_improved:
+                values[valid] *= (reach[valid] - 1.0) / (n - 1)
+        result['closeness'] = dict(zip(labels, values.tolist()))
+    return result
+
+
+def closeness_centrality(G, workers=1, wf_improved=True):
+    """返回 {节点: 接近中心性}，与networkx.closeness_centrality一致"""
+    return shortest_path_centrality(G, betweenness=False, workers=workers, wf_improved=wf_improved)['closeness']
+
+
+def _rescale(total, n, normalized, directed, sampled=None):
+    """与networkx的_rescale（endpoints=False）相同的缩放"""
+    N = n - 1
+    if N < 2:
+        return total
+    if sampled is None:
+        return total / (N * (N - 1)) if normalized else total / (1 if directed else 2)
+    k = len(sampled)
+    correction = 1 if directed else 2
+    if normalized:
+        scale_source = 1 / ((k - 1) * (N - 1)) if k > 1 else math.nan
+        scale_nonsource = 1 / (k * (N - 1))
+    else:
+        scale_source = N / ((k - 1) * correction) if k > 1 else math.nan
+        scale_nonsource = N / (k * correction)
+    scale = np.full(n, scale_nonsource)
+    scale[sampled] = scale_source
+    return total * scale
+
+
+def vertex_diameter_bound(G):
+    """
+    顶点直径（最长最短路径上的节点数）的上界
+    无向图：每个连通分量取 2×离心率+1（离心率由一次BFS得到）；有向图：最大弱连通分量的节点数
+    """
+    indptr, indices, _ = G.csr()
+    n = len(indptr) - 1
+    if n == 0:
+        return 0
+    component = connected_component_labels(G)
+    if G.directed:
+        return int(np.bincount(component).max())
+    bound = 1
+    for root in np.flatnonzero(component == np.arange(n)):
+        dist, _, _ = _bfs(indptr, indices, int(root), n)
+        bound = max(bound, 2 * int(dist.max()) + 1)
+    return bound
+
+
+def rk_sample_size(vertex_diameter, epsilon=0.05, delta=0.1, c=0.5):
+    """Riondato-Kornaropoulos样本数 r = c/ε² · (⌊log2(VD-2)⌋ + 1 + ln(1/δ))"""
+    return int(math.ceil(c / epsilon ** 2 * (math.floor(math.log2(max(vertex_diameter - 2, 1))) + 1
+                                              + math.log(1 / delta))))
+
+
+def _rk_betweenness(G, epsilon, delta, rng):
+    """返回 (归一化到n(n-1)个有序节点对的介数估计, 样本数)"""
+    indptr, indices, _ = G.csr()
+    n = len(indptr) - 1
+    samples = rk_sample_size(vertex_diameter_bound(G), epsilon, delta)
+    estimate = np.zeros(n)
+    for _ in range(samples):
+        s, t = (int(x) for x in rng.choice(n, size=2, replace=False))
+        dist, sigma, levels = _bfs(indptr, indices, s, n, target=t)
+        if dist[t] < 0:
+            continue
+        # 从t沿最短路径DAG反向走回s，每步按 sigma[u]/sigma[v] 选择前驱
+        v = t
+        for u_level, v_level in reversed(levels[:dist[t]]):
+            predecessors = u_level[v_level == v]
+            weights = sigma[predecessors]
+            v = int(predecessors[rng.choice(len(predecessors), p=weights / weights.sum())])
+            if v == s:
+                break
+            estimate[v] += 1.0 / samples
+    return estimate, samples
+
+
+def betweenness_centrality(G, mode='exact', k=256, epsilon=0.05, delta=0.1, normalized=True, seed=None,
+                           workers=1, return_info=False):
+    """
+    计算介数中心性
+
+    参数:
+        G: networkx图、CSR快照或SparseGraph
+        mode: 'exact' | 'sampled' | 'rk' | 'auto'（节点数不超过k时精确计算，否则抽取k个源点）
+        k: sampled模式的源点数
+        epsilon, delta: rk模式的误差与失败概率
+        workers: 精确计算时的进程数（见shortest_path_centrality）
+        return_info: 同时返回 {'mode', 'samples', ...}
+
+    返回:
+        {节点: 介数}，缩放方式与networkx.betweenness_centrality相同
+    """
+    G = as_sparse(G)
+    n = G.number_of_nodes()
+    if mode == 'auto':
+        mode = 'exact' if n <= k else 'sampled'
+    if mode not in BETWEENNESS_MODES:
+        raise ValueError(f"未知的介数计算模式: {mode}，可选 {BETWEENNESS_MODES + ['auto']}")
+    rng = np.random.default_rng(seed)
+    info = {'mode': mode}
+
+    if mode == 'rk' and n > 2:
+        estimate, samples = _rk_betweenness(G, epsilon, delta, rng)
+        # 估计值以n(n-1)个有序节点对归一化，换算为networkx的缩放
+        values = estimate * (n / (n - 2) if normalized else n * (n - 1) / (1 if G.directed else 2))
+        info.update(samples=samples, epsilon=epsilon, delta=delta)
+    elif mode == 'sampled' and k < n:
+        sources = np.sort(rng.choice(n, size=k, replace=False))
+        values = _rescale(accumulate(G, sources), n, normalized, G.directed, sampled=sources)
+        info['samples'] = k
+    else:
+        info.update(mode='exact', samples=n, workers=workers)
+        result = shortest_path_centrality(G, closeness=False, workers=workers, normalized=normalized)['betweenness']
+        return (result, info) if return_info else result
+
+    result = dict(zip(G.labels().tolist(), values.tolist()))
+    return (result, info) if return_info else result
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+跨月份的增量社区跟踪
+
+每个月的Louvain以上个月的划分为初始划分（python-louvain的part_init），
+新出现的节点和关联边发生变化（新增、消失、权重改变）的节点重置为单点社区，
+其余节点从上月所在社区出发，通常一两轮局部移动即可收敛。
+注意python-louvain的局部移动仍会遍历全部节点，热启动只改变初始划分，不缩小优化的范围；
+统计中的reset_nodes是重置为单点社区的节点数，moved_nodes是社区ID实际改变的节点数。
+得到划分后按与上月社区的重叠度（Jaccard）做贪心匹配，匹配上的沿用上月的社区ID，
+其余分配新ID，使同一个社区在各月的ID保持稳定（便于桑基图展示社区流动）。
+
+用法:
+    tracker = CommunityTracker(seed=42)
+    for month, G_undir in monthly_graphs:
+        partition, stats = tracker.update(month, G_undir)
+
+并行分析时各月的划分在子进程中由detect_communities从头计算，主进程按时间顺序调用
+tracker.adopt(month, raw_partition, modularity) 完成ID匹配。
+"""
+
+import time
+
+import networkx as nx
+
+try:
+    import community as community_louvain
+except ImportError:
+    community_louvain = None
+
+
+class CommunityTracker:
+    """
+    参数:
+        warm_start: 是否以上月划分为初始划分；False时每月从单点社区开始（与原流程一致）
+        match_threshold: 与上月社区的Jaccard相似度不低于该值才沿用其ID
+        resolution: Louvain分辨率
+        seed: Louvain随机种子
+    """
+
+    def __init__(self, warm_start=True, match_threshold=0.3, resolution=1.0, seed=None):
+        self.warm_start = warm_start
+        self.match_threshold = match_threshold
+        self.resolution = resolution
+        self.seed = seed
+        self.partition = {}
+        self.history = []
+        self._edges = {}
+        self._next_id = 0
+
+    def _edge_weights(self, G):
+        return {(u, v) if u <= v else (v, u): data.get('weight', 1.0) for u, v, data in G.edges(data=True)}
+
+    def _touched_nodes(self, edges):
+        """与上月相比关联边有变化的节点"""
+        touched = set()
+        for key, weight in edges.items():
+            if self._edges.get(key) != weight:
+                touched.update(key)
+        for key in self._edges.keys() - edges.keys():
+            touched.update(key)
+        return touched
+
+    def _initial_partition(self, G, touched):
+        """未变化的老节点沿用上月社区，其余节点各自为一个社区"""
+        initial = {}
+        next_id = max(self.partition.values(), default=-1) + 1
+        for node in G.nodes():
+            if node in self.partition and node not in touched:
+                initial[node] = self.partition[node]
+            else:
+                initial[node] = next_id
+                next_id += 1
+        return initial
+
+    def _match(self, raw_partition):
+        """把本月划分的社区标签映射为稳定ID"""
+        current = {}
+        for node, label in raw_partition.items():
+            current.setdefault(label, set()).add(node)
+        previous = {}
+        for node, community_id in self.partition.items():
+            previous.setdefault(community_id, set()).add(node)
+
+        # 候选对：至少有一个共同节点的 (本月社区, 上月社区)，按Jaccard从高到低贪心匹配
+        candidates = []
+        for label, members in current.items():
+            overlaps = {}
+            for node in members:
+                if node in self.partition:
+                    overlaps[self.partition[node]] = overlaps.get(self.partition[node], 0) + 1
+            for community_id, shared in overlaps.items():
+                jaccard = shared / (len(members) + len(previous[community_id]) - shared)
+                if jaccard >= self.match_threshold:
+                    candidates.append((jaccard, shared, label, community_id))
+        candidates.sort(key=lambda item: (-item[0], -item[1], str(item[2]), item[3]))
+
+        mapping = {}
+        used = set()
+        for _, _, label, community_id in candidates:
+            if label not in mapping and community_id not in used:
+                mapping[label] = community_id
+                used.add(community_id)
+        # 新社区按规模从大到小分配新ID，保证结果与字典顺序无关
+        for label in sorted(current, key=lambda label: (-len(current[label]), min(map(str, current[label])))):
+            if label not in mapping:
+                mapping[label] = self._next_id
+                self._next_id += 1
+        self._next_id = max([self._next_id] + [community_id + 1 for community_id in mapping.values()])
+        return {node: mapping[label] for node, label in raw_partition.items()}, len(used)
+
+    def update(self, month, G):
+        """
+        处理一个月的无向图
+
+        返回:
+            partition: {节点: 稳定社区ID}
+            stats: 模块度、Louvain层数、重置为单点社区的节点数、社区ID改变的节点数、沿用ID的社区数、耗时等
+        """
+        start = time.perf_counter()
+        edges = self._edge_weights(G)
+        touched = self._touched_nodes(edges) if self.partition else set(G.nodes())
+        warm = self.warm_start and bool(self.partition)
+        part_init = self._initial_partition(G, touched) if warm else None
+        raw_partition, levels = detect_communities(G, part_init, self.resolution, self.seed)
+        # 热启动时只有这些节点从单点社区出发，冷启动时为全部节点
+        reset = len(touched & set(G.nodes())) if warm else G.number_of_nodes()
+        partition, stats = self._adopt(month, raw_partition, partition_modularity(raw_partition, G), levels,
+                                       reset, warm)
+        stats['seconds'] = time.perf_counter() - start
+        self._edges = edges
+        return partition, stats
+
+    def adopt(self, month, raw_partition, modularity, levels=0, seconds=0.0):
+        """
+        接收在别处（如进程池中）从头计算的划分，只做ID匹配与统计
+        社区标签任意，模块度与标签无关，可在计算划分的进程里算好传入
+        """
+        partition, stats = self._adopt(month, raw_partition, modularity, levels, len(raw_partition), False)
+        stats['seconds'] = seconds
+        self._edges = {}
+        return partition, stats
+
+    def _adopt(self, month, raw_partition, modularity, levels, reset, warm):
+        new_nodes = sum(1 for node in raw_partition if node not in self.partition)
+        partition, matched = self._match(raw_partition)
+        moved = sum(1 for node, community_id in partition.items()
+                    if node in self.partition and self.partition[node] != community_id)
+        stats = {
+            'year_month': month,
+            'warm_start': warm,
+            'modularity': modularity,
+            'louvain_levels': levels,
+            'reset_nodes': reset,
+            'new_nodes': new_nodes,
+            'moved_nodes': moved,
+            'num_communities': len(set(partition.values())),
+            'matched_communities': matched,
+            'seconds': 0.0,
+        }
+        self.partition = partition
+        self.history.append(stats)
+        return partition, stats
+
+
+def detect_communities(G, part_init=None, resolution=1.0, seed=None):
+    """
+    无向图的社区划分
+
+    返回:
+        (partition {节点: 社区标签}, Louvain层数)；未安装python-louvain时为连通组件与0
+    """
+    if G.number_of_edges() == 0:
+        return {node: i for i, node in enumerate(G.nodes())}, 0
+    if community_louvain is None:
+        partition = {}
+        for comm_id, nodes in enumerate(nx.connected_components(G)):
+            for node in nodes:
+                partition[node] = comm_id
+        return partition, 0
+    dendrogram = community_louvain.generate_dendrogram(G, part_init=part_init, resolution=resolution,
+                                                       random_state=seed)
+    return community_louvain.partition_at_level(dendrogram, len(dendrogram) - 1), len(dendrogram)
+
+
+def partition_modularity(partition, G):
+    if community_louvain is None or G.number_of_edges() == 0:
+        return 0.0
+    return community_louvain.modularity(partition, G)
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+GraphEngine按次调用选择后端的代价模型
+
+由benchmark_engine.py写出的报告（data/engine_benchmark.json）校准：对每个 (后端, 操作)
+用对数坐标最小二乘拟合 耗时 ≈ exp(a) · (节点数+边数)^b，图的规模与密度都通过边数进入模型。
+选择后端时，若图当前不是该后端的表示，再加上转换到该后端的耗时
+（报告中的convert项，即由networkx图转换；旧报告没有该项时用build项，即由CSR快照建图）。
+报告中失败或与参考结果不一致的 (后端, 操作) 不参与选择。
+
+用法:
+    python cost_model.py                 # 打印校准结果
+    python cost_model.py 50 200 100000   # 打印各规模下每个操作的估计耗时与选择
+"""
+
+import json
+import math
+import os
+import sys
+
+PROJECT_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_REPORT_PATH = os.path.join(PROJECT_PATH, 'data', 'engine_benchmark.json')
+
+
+class CostModel:
+    """
+    属性:
+        fits: {(后端, 操作): (a, b)}，耗时估计为 exp(a + b·log(节点数+边数))
+        excluded: {(后端, 操作)}，报告中失败或结果不一致的组合
+    """
+
+    def __init__(self, fits=None, excluded=None, source=None):
+        self.fits = dict(fits or {})
+        self.excluded = set(excluded or ())
+        self.source = source
+
+    @classmethod
+    def from_report(cls, report, source=None):
+        points = {}
+        excluded = set()
+        for record in report.get('results', []):
+            key = (record['backend'], record['operation'])
+            if record.get('status') != 'ok' or record.get('agrees') is False:
+                excluded.add(key)
+                continue
+            work = record['num_nodes'] + record['num_edges']
+            if work > 0 and record['seconds'] > 0:
+                points.setdefault(key, []).append((math.log(work), math.log(record['seconds'])))
+        fits = {key: _fit(values) for key, values in points.items() if key not in excluded}
+        return cls(fits, excluded, source)
+
+    @classmethod
+    def load(cls, path=None):
+        """读取校准报告，文件不存在时返回None"""
+        path = path or DEFAULT_REPORT_PATH
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding='utf-8') as f:
+            return cls.from_report(json.load(f), source=path)
+
+    def predict(self, backend, operation, num_nodes, num_edges):
+        """估计耗时（秒），没有校准数据时返回None"""
+        fit = self.fits.get((backend, operation))
+        if fit is None:
+            return None
+        a, b = fit
+        return math.exp(a + b * math.log(max(num_nodes + num_edges, 1)))
+
+    def estimate(self, backend, operation, num_nodes, num_edges, current=None):
+        """在后端上执行操作的估计总耗时，图当前不是该后端的表示时加上转换耗时"""
+        seconds = self.predict(backend, operation, num_nodes, num_edges)
+        if seconds is None or backend == current:
+            return seconds
+        convert = self.predict(backend, 'convert', num_nodes, num_edges)
+        if convert is None:
+            convert = self.predict(backend, 'build', num_nodes, num_edges)
+        return None if convert is None else seconds + convert
+
+    def choose(self, operation, num_nodes, num_edges, candidates, current=None):
+        """
+        在candidates中选择估计总耗时最小的后端
+
+        返回:
+            (后端名称, {后端: 估计耗时})，没有可用的校准数据时后端为None
+        """
+        estimates = {}
+        for backend in candidates:
+            seconds = self.estimate(backend, operation, num_nodes, num_edges, current)
+            if seconds is not None:
+                estimates[backend] = seconds
+        if not estimates:
+            return None, estimates
+        return min(estimates, key=estimates.get), estimates
+
+
+def _fit(points):
+    """对数坐标下的最小二乘直线；只有一个规模时按线性复杂度外推"""
+    xs = [x for x, _ in points]
+    ys = [y for _, y in points]
+    mean_x, mean_y = sum(xs) / len(xs), sum(ys) / len(ys)
+    spread = sum((x - mean_x) ** 2 for x in xs)
+    if spread == 0:
+        return mean_y - mean_x, 1.0
+    b = sum((x - mean_x) * (y - mean_y) for x, y in points) / spread
+    return mean_y - b * mean_x, b
+
+
+if __name__ == "__main__":
+    model = CostModel.load()
+    if model is None:
+        print(f"没有校准报告: {DEFAULT_REPORT_PATH}，请先运行 benchmark_engine.py")
+        sys.exit(1)
+    print(f"校准报告: {model.source}")
+    for (backend, operation), (a, b) in sorted(model.fits.items()):
+        print(f"   {backend:<10} {operation:<20} 耗时 ≈ {math.exp(a):.3e} · (n+m)^{b:.2f}")
+    for backend, operation in sorted(model.excluded):
+        print(f"   {backend:<10} {operation:<20} 不参与选择（失败或结果不一致）")
+    for num_nodes in (int(value) for value in sys.argv[1:]):
+        num_edges = num_nodes * 8
+        print(f"\n{num_nodes} 个节点, {num_edges} 条边:")
+        for operation in ('pagerank', 'degree_centrality', 'community_detection', 'betweenness'):
+            backend, estimates = model.choose(operation, num_nodes, num_edges, sorted({b for b, _ in model.fits}))
+            detail = ', '.join(f"{name} {seconds:.4f}s" for name, seconds in sorted(estimates.items()))
+            print(f"   {operation:<20} -> {backend}  ({detail})")
@@ -0,0 +1,155 @@
+"""
+全局开发者注册表
+登录名 -> 全局developer_id，跨仓库、跨批次保持稳定，持久化为 data/developers.csv
+ID到行号的映射保存为稠密数组，属性查询为O(1)，并支持整批事件的向量化解析
+"""
+
+import os
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+PROJECT_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_DEVELOPERS_PATH = os.path.join(PROJECT_PATH, 'data', 'developers.csv')
+
+DEVELOPER_COLUMNS = ['developer_id', 'name', 'primary_tech', 'join_date', 'activity_level']
+TECH_STACKS = ['Python', 'JavaScript', 'Java', 'Go', 'Rust', 'C++', 'TypeScript']
+
+
+class DeveloperRegistry:
+    """
+    开发者注册表，新登录名按首次出现顺序分配递增ID，已有ID永不改变
+
+    参数:
+        developers_df: 已有的开发者表（列同developers.csv），None表示空表
+        seed: 为新开发者生成属性时使用的随机种子
+
+    用法:
+        registry = DeveloperRegistry(developers_df)
+        registry.get(3, 'primary_tech')                    # 单个查询
+        registry.lookup('primary_tech', edges['source'])   # 整批查询
+        registry.resolve(['alice', 'bob'])                 # 登录名 -> ID，未登记为-1
+    """
+
+    def __init__(self, developers_df=None, seed=None):
+        if developers_df is None:
+            developers_df = pd.DataFrame(columns=DEVELOPER_COLUMNS)
+        extra = [c for c in developers_df.columns if c not in DEVELOPER_COLUMNS]
+        self._frame = developers_df[DEVELOPER_COLUMNS + extra].reset_index(drop=True)
+        self._ids = dict(zip(self._frame['name'], self._frame['developer_id'].astype(int)))
+        self._next_id = int(self._frame['developer_id'].max()) + 1 if len(self._frame) else 1
+        self._new_rows = []
+        self._rng = np.random.default_rng(seed)
+        self._positions = None
+        self._name_index = None
+        self._columns = {}
+
+    @classmethod
+    def load(cls, path=None, seed=None):
+        """从developers.csv加载，文件不存在时返回空注册表"""
+        path = path or DEFAULT_DEVELOPERS_PATH
+        if os.path.exists(path):
+            return cls(pd.read_csv(path), seed=seed)
+        return cls(seed=seed)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, login):
+        return login in self._ids
+
+    def _new_row(self, developer_id, login, first_seen=None):
+        if first_seen is None:
+            first_seen = (datetime.now() - timedelta(days=int(self._rng.integers(0, 365)))).strftime('%Y-%m-%d')
+        return {
+            'developer_id': developer_id,
+            'name': login,
+            'primary_tech': TECH_STACKS[int(self._rng.integers(len(TECH_STACKS)))],
+            'join_date': str(first_seen)[:10],
+            'activity_level': round(float(self._rng.uniform(0.3, 1.0)), 4)
+        }
+
+    def intern(self, login, first_seen=None):
+        """返回登录名对应的developer_id，未登记时分配新ID"""
+        developer_id = self._ids.get(login)
+        if developer_id is None:
+            developer_id = self._next_id
+            self._next_id += 1
+            self._ids[login] = developer_id
+            self._new_rows.append(self._new_row(developer_id, login, first_seen))
+        return developer_id
+
+    def intern_many(self, logins, first_seen=None):
+        """
+        批量登记登录名，返回对应的developer_id数组
+        first_seen: 与logins对齐的首次出现时间，用作新开发者的join_date
+        """
+        logins = pd.Index(logins)
+        known = self._names().get_indexer(logins) >= 0
+        if not known.all():
+            new_mask = ~known & ~logins.duplicated()
+            seen = dict(zip(logins[new_mask], np.asarray(first_seen)[new_mask])) if first_seen is not None else {}
+            for login in logins[new_mask]:
+                self.intern(login, seen.get(login))
+        return self.resolve(logins)
+
+    def to_frame(self):
+        """返回完整的开发者表"""
+        if self._new_rows:
+            self._frame = pd.concat([self._frame, pd.DataFrame(self._new_rows)], ignore_index=True)
+            self._new_rows = []
+            self._positions = None
+            self._name_index = None
+            self._columns = {}
+        return self._frame
+
+    def save(self, path=None):
+        path = path or DEFAULT_DEVELOPERS_PATH
+        self.to_frame().to_csv(path, index=False)
+
+    def _names(self):
+        frame = self.to_frame()
+        if self._name_index is None:
+            self._name_index = pd.Index(frame['name'])
+        return self._name_index
+
+    def positions(self, developer_ids):
+        """developer_id数组 -> 行号数组（稠密数组下标查询），未登记的ID为-1"""
+        frame = self.to_frame()
+        if self._positions is None:
+            ids = frame['developer_id'].to_numpy(dtype=np.int64)
+            self._positions = np.full(int(ids.max()) + 1 if len(ids) else 1, -1, dtype=np.int64)
+            self._positions[ids] = np.arange(len(ids))
+        developer_ids = np.asarray(developer_ids, dtype=np.int64)
+        in_range = (developer_ids >= 0) & (developer_ids < len(self._positions))
+        return np.where(in_range, self._positions[np.clip(developer_ids, 0, len(self._positions) - 1)], -1)
+
+    def column(self, name):
+        """按行号排列的属性数组"""
+        self.to_frame()
+        if name not in self._columns:
+            self._columns[name] = self._frame[name].to_numpy()
+        return self._columns[name]
+
+    def lookup(self, name, developer_ids):
+        """整批查询属性，遇到未登记的ID抛出KeyError"""
+        positions = self.positions(developer_ids)
+        if (positions < 0).any():
+            missing = np.asarray(developer_ids)[positions < 0]
+            raise KeyError(f"未登记的developer_id: {missing[:5].tolist()}")
+        return self.column(name)[positions]
+
+    def get(self, developer_id, name):
+        """查询单个开发者的属性"""
+        return self.lookup(name, [developer_id])[0]
+
+    def contains_ids(self, developer_ids):
+        """返回每个developer_id是否已登记的布尔数组"""
+        return self.positions(developer_ids) >= 0
+
+    def resolve(self, logins):
+        """登录名数组 -> developer_id数组（哈希索引），未登记的为-1"""
+        positions = self._names().get_indexer(pd.Index(logins))
+        ids = self.column('developer_id').astype(np.int64)
+        return np.where(positions >= 0, ids[positions], -1)
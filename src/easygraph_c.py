@@ -0,0 +1,86 @@
+"""
+EasyGraph C++图核心（GraphC / DiGraphC）适配，作为GraphEngine的backend='easygraph-c'
+
+EasyGraph的算法函数对 cflag 为真的C++图会调用编译实现（PageRank、Dijkstra最短路径、
+聚类系数、结构洞指标等）；某个函数没有编译实现、在C++图上调用失败时，
+这里把图转换为Python版EasyGraph图再调用一次，并在fallbacks中记录回退过的函数
+"""
+
+import warnings
+
+# 有C++实现、在C++图上直接调用的函数
+COMPILED_ROUTINES = [
+    'pagerank', 'multi_source_dijkstra', 'Dijkstra', 'clustering', 'closeness_centrality',
+    'betweenness_centrality', 'k_core', 'constraint', 'effective_size', 'hierarchy',
+]
+
+# 在Python实现中支持多进程参数n_workers的函数
+MULTI_WORKER_ROUTINES = ['betweenness_centrality', 'closeness_centrality', 'constraint', 'effective_size',
+                         'hierarchy']
+
+
+class EasyGraphC:
+    """
+    与EasyGraph模块接口一致的包装：DiGraph/Graph为C++图类，其余属性转发到easygraph，
+    返回的函数在C++图上失败时回退到Python图
+
+    参数:
+        eg: easygraph模块
+    """
+
+    def __init__(self, eg):
+        if not hasattr(eg, 'GraphC') or not hasattr(eg, 'DiGraphC'):
+            raise ImportError("当前EasyGraph未包含C++图核心(GraphC/DiGraphC)")
+        self.eg = eg
+        self.DiGraph = eg.DiGraphC
+        self.Graph = eg.GraphC
+        self.__version__ = getattr(eg, '__version__', '未知')
+        self.fallbacks = {}
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        func = getattr(self.eg, name)
+        if not callable(func) or isinstance(func, type):
+            return func
+        return self._with_fallback(name, func)
+
+    def _with_fallback(self, name, func):
+        def call(G, *args, **kwargs):
+            if not getattr(G, 'cflag', 0):
+                return func(G, *args, **kwargs)
+            try:
+                return func(G, *args, **kwargs)
+            except (AttributeError, NotImplementedError, TypeError) as e:
+                # 该函数只有Python实现，不能直接处理C++图
+                if name not in self.fallbacks:
+                    warnings.warn(f"EasyGraph的{name}在C++图上不可用({e})，回退到Python实现")
+                self.fallbacks[name] = f"{type(e).__name__}: {e}"
+                return func(self.to_python(G), *args, **kwargs)
+        call.__name__ = name
+        return call
+
+    def build(self, nodes, edges, directed=True):
+        """由节点列表与 (u, v, weight) 边列表整批构建C++图"""
+        G = self.DiGraph() if directed else self.Graph()
+        if hasattr(G, 'add_nodes'):
+            G.add_nodes(list(nodes))
+        else:
+            for node in nodes:
+                G.add_node(node)
+        edges = list(edges)
+        if hasattr(G, 'add_edges'):
+            G.add_edges([(u, v) for u, v, _ in edges], [{'weight': w} for _, _, w in edges])
+        else:
+            for u, v, w in edges:
+                G.add_edge(u, v, weight=w)
+        return G
+
+    def to_python(self, G):
+        """C++图 -> Python版EasyGraph图"""
+        if hasattr(G, 'py'):
+            return G.py()
+        H = self.eg.DiGraph() if G.is_directed() else self.eg.Graph()
+        H.add_nodes_from(list(G.nodes))
+        H.add_edges_from((u, v, dict(data)) for u, v, data in G.edges)
+        return H
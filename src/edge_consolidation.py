@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+协作事件的多重边合并
+
+同一时间窗口内同一对开发者之间的多次协作在建图前合并为一条边，一次排序完成分组，
+每条边给出 权重之和、事件数、最大权重、首/末次事件的权重与时间；
+无向合并时 (u, v) 与 (v, u) 归为同一对。
+建图时以哪一项作为边权由weight_agg指定（默认为权重之和，即该窗口内的协作总强度）。
+
+用法:
+    python edge_consolidation.py    # 统计协作数据中每月的重复边
+"""
+
+import numpy as np
+import pandas as pd
+
+from sparse_graph import encode, unique_sorted
+
+# 可作为边权的合并方式
+AGGREGATIONS = ('sum', 'count', 'max', 'first', 'last')
+DEFAULT_WEIGHT_AGG = 'sum'
+
+
+def consolidate_edges(source, target, weight=None, timestamp=None, window=None, directed=True):
+    """
+    把事件数组合并为每个 (窗口, source, target) 一条边
+
+    参数:
+        weight: 事件权重，None时每个事件权重为1
+        timestamp: 事件时间（可排序即可，如日期字符串），同一对内按时间确定首/末次，
+                   None时按输入顺序
+        window: 事件所属的时间窗口标签（如year_month），None时全部事件属于同一窗口
+        directed: False时 (u, v) 与 (v, u) 合并，source为较小的节点
+
+    返回:
+        {列名: 数组}，按 (窗口, source, target) 升序：
+        source, target, weight_sum, count, weight_max, weight_first, weight_last,
+        以及给定timestamp时的first_seen/last_seen、给定window时的window
+    """
+    source = np.asarray(source)
+    target = np.asarray(target)
+    weight = np.ones(len(source)) if weight is None else np.asarray(weight, dtype=np.float64)
+    labels = unique_sorted(np.concatenate([source, target]))
+    n = max(len(labels), 1)
+    rows = encode(source, labels).astype(np.int64)
+    cols = encode(target, labels).astype(np.int64)
+    if not directed:
+        rows, cols = np.minimum(rows, cols), np.maximum(rows, cols)
+    key = rows * n + cols
+    if window is not None:
+        windows, window_codes = np.unique(np.asarray(window), return_inverse=True)
+        key = window_codes.astype(np.int64) * (n * n) + key
+
+    # 同一对内按时间（再按输入顺序，lexsort是稳定的）排列
+    if timestamp is not None:
+        timestamp = np.asarray(timestamp)
+        order = np.lexsort((np.unique(timestamp, return_inverse=True)[1], key))
+    else:
+        order = np.argsort(key, kind='stable')
+    sorted_key = key[order]
+    if len(order) == 0:
+        starts = np.zeros(0, dtype=np.int64)
+    else:
+        starts = np.flatnonzero(np.concatenate([[True], sorted_key[1:] != sorted_key[:-1]]))
+    bounds = np.append(starts, len(order))
+    first, last = order[starts], order[bounds[1:] - 1]
+    sorted_weight = weight[order]
+
+    result = {
+        'source': labels[rows[first]],
+        'target': labels[cols[first]],
+        'weight_sum': np.add.reduceat(sorted_weight, starts) if len(starts) else weight[:0],
+        'count': np.diff(bounds),
+        'weight_max': np.maximum.reduceat(sorted_weight, starts) if len(starts) else weight[:0],
+        'weight_first': weight[first],
+        'weight_last': weight[last],
+    }
+    if timestamp is not None:
+        result['first_seen'] = timestamp[first]
+        result['last_seen'] = timestamp[last]
+    if window is not None:
+        result['window'] = windows[sorted_key[starts] // (n * n)] if len(starts) else np.asarray(window)[:0]
+    return result
+
+
+def aggregate_weight(consolidated, weight_agg=DEFAULT_WEIGHT_AGG):
+    """按weight_agg取出合并后的边权"""
+    if weight_agg not in AGGREGATIONS:
+        raise ValueError(f"未知的合并方式: {weight_agg}，可选 {AGGREGATIONS}")
+    if weight_agg == 'count':
+        return consolidated['count'].astype(np.float64)
+    return consolidated[{'sum': 'weight_sum', 'max': 'weight_max', 'first': 'weight_first',
+                         'last': 'weight_last'}[weight_agg]]
+
+
+def consolidate_frame(edges_df, window=None, directed=True, weight_agg=DEFAULT_WEIGHT_AGG,
+                      source='source', target='target', weight='weight', timestamp='timestamp'):
+    """
+    DataFrame版本：返回每个 (窗口, source, target) 一行的DataFrame
+
+    参数:
+        window: 时间窗口列名（如'year_month'），None时整张表为一个窗口
+        weight_agg: weight列取哪种合并结果，其余合并结果作为单独的列保留
+        timestamp: 时间列名，该列不存在时按行顺序确定首/末次
+
+    返回:
+        列为 [window,] source, target, weight, count, weight_sum, weight_max, weight_first, weight_last
+        [, first_seen, last_seen]
+    """
+    consolidated = consolidate_edges(
+        edges_df[source].to_numpy(), edges_df[target].to_numpy(),
+        edges_df[weight].to_numpy() if weight in edges_df.columns else None,
+        timestamp=edges_df[timestamp].to_numpy() if timestamp in edges_df.columns else None,
+        window=edges_df[window].to_numpy() if window is not None else None,
+        directed=directed)
+    columns = {}
+    if window is not None:
+        columns[window] = consolidated.pop('window')
+    columns[source] = consolidated.pop('source')
+    columns[target] = consolidated.pop('target')
+    columns[weight] = aggregate_weight(consolidated, weight_agg)
+    columns['count'] = consolidated.pop('count')
+    columns.update(consolidated)
+    return pd.DataFrame(columns)
+
+
+if __name__ == "__main__":
+    from edge_store import load_collaborations
+
+    edges_df = load_collaborations(columns=['source', 'target', 'weight', 'timestamp', 'year_month'])
+    consolidated = consolidate_frame(edges_df, window='year_month')
+    print(f"协作事件 {len(edges_df)} 条 -> 合并后 {len(consolidated)} 条边")
+    summary = consolidated.groupby('year_month').agg(edges=('count', 'size'), events=('count', 'sum'),
+                                                     max_repeats=('count', 'max'))
+    print(summary.to_string())
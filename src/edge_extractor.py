@@ -0,0 +1,231 @@
+"""
+基于评论与评审的真实协作边提取
+流水线: issues分页 -> 有界工作池抓取评论/PR评审 -> (author, responder, timestamp, interaction_type)
+       -> 映射开发者ID -> 分块写出
+原始API数据逐页流过流水线，内存占用与仓库规模无关
+"""
+
+import asyncio
+
+import numpy as np
+import pandas as pd
+
+from async_fetcher import AsyncFetcher
+from developer_registry import DeveloperRegistry
+from edge_store import EDGE_COLUMNS
+
+# 不同交互类型的基础协作权重
+INTERACTION_WEIGHTS = {
+    'issue_comment': 1.0,
+    'review_comment': 1.5,
+    'pr_review': 2.0
+}
+
+INTERACTION_COLUMNS = ['author', 'responder', 'timestamp', 'interaction_type']
+
+_DONE = object()
+
+
+def _login(user):
+    """返回用户登录名，机器人与已注销账号返回None"""
+    if not user or user.get('type') == 'Bot':
+        return None
+    return user.get('login')
+
+
+async def fetch_issue_interactions(fetcher, org, repo, issue, created_after=None):
+    """
+    抓取单个issue/PR上的全部交互
+
+    返回:
+        [(author, responder, timestamp, interaction_type), ...]
+    """
+    author = _login(issue.get('user'))
+    if author is None:
+        return []
+    number = issue['number']
+    params = {'per_page': 100}
+    if created_after:
+        params['since'] = created_after
+
+    records = []
+    if issue.get('comments', 0) > 0:
+        for comment in await fetcher.fetch_all(f'repos/{org}/{repo}/issues/{number}/comments', params):
+            records.append((_login(comment.get('user')), comment['created_at'], 'issue_comment'))
+    if 'pull_request' in issue:
+        for review in await fetcher.fetch_all(f'repos/{org}/{repo}/pulls/{number}/reviews', {'per_page': 100}):
+            if review.get('submitted_at'):
+                records.append((_login(review.get('user')), review['submitted_at'], 'pr_review'))
+        for comment in await fetcher.fetch_all(f'repos/{org}/{repo}/pulls/{number}/comments', params):
+            records.append((_login(comment.get('user')), comment['created_at'], 'review_comment'))
+
+    return [
+        (author, responder, timestamp, interaction_type)
+        for responder, timestamp, interaction_type in records
+        if responder and responder != author and (not created_after or timestamp > created_after)
+    ]
+
+
+async def _iter_issues(issues):
+    """统一遍历issues列表或按页产出的异步迭代器"""
+    if hasattr(issues, '__aiter__'):
+        async for page in issues:
+            for issue in page:
+                yield issue
+    else:
+        for issue in issues:
+            yield issue
+
+
+async def iter_interactions(fetcher, org, repo, issues, created_after=None, workers=8, queue_size=256):
+    """
+    用有界工作池并发抓取每个issue的交互，逐条产出
+
+    参数:
+        issues: issue列表，或按页产出issue列表的异步迭代器（如AsyncFetcher.iter_pages）
+        created_after: 只保留该时间之后发生的交互
+        workers: 并发处理issue的工作协程数
+        queue_size: 待处理issue与待产出交互队列的容量，决定内存上限
+    """
+    issue_queue = asyncio.Queue(maxsize=queue_size)
+    out_queue = asyncio.Queue(maxsize=queue_size)
+
+    async def produce():
+        try:
+            async for issue in _iter_issues(issues):
+                await issue_queue.put(issue)
+        except Exception as e:
+            await out_queue.put(e)
+            return
+        for _ in range(workers):
+            await issue_queue.put(_DONE)
+
+    async def work():
+        try:
+            while True:
+                issue = await issue_queue.get()
+                if issue is _DONE:
+                    break
+                for interaction in await fetch_issue_interactions(fetcher, org, repo, issue, created_after):
+                    await out_queue.put(interaction)
+        except Exception as e:
+            await out_queue.put(e)
+        await out_queue.put(_DONE)
+
+    tasks = [asyncio.ensure_future(produce())] + [asyncio.ensure_future(work()) for _ in range(workers)]
+    try:
+        finished = 0
+        while finished < workers:
+            item = await out_queue.get()
+            if item is _DONE:
+                finished += 1
+            elif isinstance(item, Exception):
+                raise item
+            else:
+                yield item
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def collect_edges(fetcher, org, repo, issues, developers, created_after=None, workers=8):
+    """提取一批issues上的全部协作边，返回DataFrame（用于增量抓取的逐页处理）"""
+    interactions = [interaction async for interaction in
+                    iter_interactions(fetcher, org, repo, issues, created_after, workers)]
+    return interactions_to_edges(pd.DataFrame(interactions, columns=INTERACTION_COLUMNS), developers)
+
+
+def interactions_to_edges(interactions_df, developers):
+    """
+    把一批交互记录向量化地映射为协作边，任一方不在开发者表中的交互被丢弃
+
+    参数:
+        developers: DeveloperRegistry，或开发者信息DataFrame（每次调用都会重建索引）
+    """
+    registry = developers if isinstance(developers, DeveloperRegistry) else DeveloperRegistry(developers)
+    source = registry.resolve(interactions_df['author'])
+    target = registry.resolve(interactions_df['responder'])
+    known = (source >= 0) & (target >= 0)
+    interactions_df = interactions_df[known]
+    source, target = source[known], target[known]
+
+    source_tech = registry.lookup('primary_tech', source)
+    target_tech = registry.lookup('primary_tech', target)
+    # 与模拟数据一致：技术栈相同的协作权重更高
+    tech_match = np.where(source_tech == target_tech, 1.0, 0.3)
+    timestamp = interactions_df['timestamp'].str.slice(0, 10).to_numpy()
+    return pd.DataFrame({
+        'source': source,
+        'target': target,
+        'weight': (interactions_df['interaction_type'].map(INTERACTION_WEIGHTS).to_numpy() * tech_match).round(2),
+        'timestamp': timestamp,
+        'year_month': [t[:7] for t in timestamp],
+        'source_tech': source_tech,
+        'target_tech': target_tech
+    }, columns=EDGE_COLUMNS)
+
+
+def extract_interactions(org, repo, sink, since=None, chunk_size=5000, workers=8, **fetcher_kwargs):
+    """
+    流式提取仓库中的原始交互记录（登录名层面），分块交给sink
+
+    参数:
+        sink: 函数 (DataFrame) -> None，列为INTERACTION_COLUMNS，每凑满chunk_size条调用一次
+        since: 只处理该时间之后更新的issues及之后发生的交互（ISO时间字符串）
+        fetcher_kwargs: 透传给AsyncFetcher的参数
+
+    返回:
+        统计信息字典
+    """
+    params = {'state': 'all', 'per_page': 100}
+    if since:
+        params['since'] = since
+    stats = {'interactions': 0, 'chunks': 0}
+
+    async def _run():
+        async with AsyncFetcher(**fetcher_kwargs) as fetcher:
+            buffer = []
+            pages = fetcher.iter_pages(f'repos/{org}/{repo}/issues', params)
+            async for interaction in iter_interactions(fetcher, org, repo, pages, since, workers):
+                buffer.append(interaction)
+                if len(buffer) >= chunk_size:
+                    sink(pd.DataFrame(buffer, columns=INTERACTION_COLUMNS))
+                    stats['interactions'] += len(buffer)
+                    stats['chunks'] += 1
+                    buffer = []
+            if buffer:
+                sink(pd.DataFrame(buffer, columns=INTERACTION_COLUMNS))
+                stats['interactions'] += len(buffer)
+                stats['chunks'] += 1
+            stats['requests'] = fetcher.stats['requests']
+
+    asyncio.run(_run())
+    return stats
+
+
+def extract_collaboration_edges(org, repo, developers, sink, since=None, chunk_size=5000,
+                                workers=8, **fetcher_kwargs):
+    """
+    流式提取仓库的协作边并分块交给sink
+
+    参数:
+        developers: DeveloperRegistry或开发者信息DataFrame，不在表中的账号会被忽略
+        sink: 函数 (DataFrame) -> None，每个交互块映射成协作边后调用一次
+        since: 只处理该时间之后更新的issues及之后发生的交互（ISO时间字符串）
+        fetcher_kwargs: 透传给AsyncFetcher的参数
+
+    返回:
+        统计信息字典
+    """
+    registry = developers if isinstance(developers, DeveloperRegistry) else DeveloperRegistry(developers)
+    edge_count = [0]
+
+    def resolve_chunk(interactions_df):
+        edges_df = interactions_to_edges(interactions_df, registry)
+        if not edges_df.empty:
+            sink(edges_df)
+            edge_count[0] += len(edges_df)
+
+    stats = extract_interactions(org, repo, resolve_chunk, since, chunk_size, workers, **fetcher_kwargs)
+    stats['edges'] = edge_count[0]
+    return stats
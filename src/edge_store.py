@@ -0,0 +1,196 @@
+"""
+协作记录的按月分区存储
+目录结构: data/collaborations_temporal/year_month=YYYY-MM/part-*.parquet
+增量抓取只追加新的分区文件，下游按月份读取，无需重写整个时序表
+分区文件为Parquet列式格式（技术栈列字典编码），读取时支持列投影与按月份裁剪分区；
+未安装pyarrow时退化为CSV分区。collaborations_temporal.csv仅作为给DataEase的导出
+"""
+
+import os
+import shutil
+import time
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+from time_buckets import add_time_key, time_key
+
+PROJECT_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(PROJECT_PATH, 'data')
+DEFAULT_PARTITION_DIR = os.path.join(DATA_DIR, 'collaborations_temporal')
+
+EDGE_COLUMNS = ['source', 'target', 'weight', 'timestamp', 'year_month', 'source_tech', 'target_tech']
+# 取值很少的字符串列，以字典编码存储
+TECH_COLUMNS = ['source_tech', 'target_tech']
+
+PARTITION_FORMAT = 'parquet' if pq is not None else 'csv'
+
+
+def _partition_dir(root, year_month):
+    return os.path.join(root, f'year_month={year_month}')
+
+
+def list_partitions(root=None):
+    """列出已有的月份分区（升序）"""
+    root = root or DEFAULT_PARTITION_DIR
+    if not os.path.isdir(root):
+        return []
+    return sorted(name.split('=', 1)[1] for name in os.listdir(root) if name.startswith('year_month='))
+
+
+def append_partitions(edges_df, root=None, run_id=None, fmt=None):
+    """
+    将协作记录按year_month追加为新的分区文件
+
+    参数:
+        fmt: 'parquet' 或 'csv'，默认安装了pyarrow时使用parquet
+
+    返回:
+        本次写入涉及的月份列表
+    """
+    root = root or DEFAULT_PARTITION_DIR
+    run_id = run_id or time.strftime('%Y%m%dT%H%M%S')
+    fmt = fmt or PARTITION_FORMAT
+    touched = []
+    for year_month, group in edges_df.groupby('year_month', sort=True):
+        part_dir = _partition_dir(root, year_month)
+        os.makedirs(part_dir, exist_ok=True)
+        path = os.path.join(part_dir, f'part-{run_id}.{fmt}')
+        tmp_path = f'{path}.tmp'
+        if fmt == 'parquet':
+            table = pa.Table.from_pandas(_with_tech_categories(group[EDGE_COLUMNS]), preserve_index=False)
+            pq.write_table(table, tmp_path)
+        else:
+            group[EDGE_COLUMNS].to_csv(tmp_path, index=False)
+        os.replace(tmp_path, path)
+        touched.append(year_month)
+    return touched
+
+
+def write_partitions(edges_df, root=None, fmt=None):
+    """全量重建分区（删除已有分区后写入）"""
+    root = root or DEFAULT_PARTITION_DIR
+    if os.path.isdir(root):
+        shutil.rmtree(root)
+    return append_partitions(edges_df, root=root, fmt=fmt)
+
+
+def _with_tech_categories(edges_df):
+    """两个技术栈列转为共享同一组类别的category，便于直接比较"""
+    tech_columns = [col for col in TECH_COLUMNS if col in edges_df.columns]
+    if not tech_columns:
+        return edges_df
+    categories = sorted(set().union(*(pd.unique(edges_df[col].dropna().astype(str)) for col in tech_columns)))
+    return edges_df.assign(**{col: pd.Categorical(edges_df[col], categories=categories) for col in tech_columns})
+
+
+def _read_part(path, columns=None):
+    if path.endswith('.parquet'):
+        return pq.read_table(path, columns=columns).to_pandas()
+    return pd.read_csv(path, usecols=columns)
+
+
+def read_partitions(root=None, months=None, columns=None, start=None, end=None):
+    """
+    读取协作记录
+
+    参数:
+        months: 只读取这些月份的分区，默认全部
+        columns: 只读取这些列（列投影），默认EDGE_COLUMNS
+        start, end: 只读取 start <= year_month <= end 的分区（YYYY-MM）
+    """
+    root = root or DEFAULT_PARTITION_DIR
+    columns = list(columns) if columns is not None else EDGE_COLUMNS
+    months = list_partitions(root) if months is None else months
+    months = [m for m in months if (start is None or m >= start) and (end is None or m <= end)]
+    frames = []
+    for year_month in months:
+        part_dir = _partition_dir(root, year_month)
+        if not os.path.isdir(part_dir):
+            continue
+        for name in sorted(os.listdir(part_dir)):
+            if name.endswith('.parquet') or name.endswith('.csv'):
+                frames.append(_read_part(os.path.join(part_dir, name), columns))
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    return _with_tech_categories(pd.concat(frames, ignore_index=True))
+
+
+def load_collaborations(data_dir=None, columns=None, months=None, start=None, end=None):
+    """
+    下游脚本读取时序协作记录的统一入口：优先读取月份分区，
+    没有分区时回退到 collaborations_temporal.csv
+    """
+    data_dir = data_dir or DATA_DIR
+    root = os.path.join(data_dir, os.path.basename(DEFAULT_PARTITION_DIR))
+    if list_partitions(root):
+        return read_partitions(root, months=months, columns=columns, start=start, end=end)
+    filtered = months is not None or start is not None or end is not None
+    usecols = None if columns is None else list(dict.fromkeys(list(columns) + (['year_month'] if filtered else [])))
+    collab_df = pd.read_csv(os.path.join(data_dir, 'collaborations_temporal.csv'), usecols=usecols)
+    if filtered:
+        year_month = collab_df['year_month']
+        keep = year_month.isin(months) if months is not None else pd.Series(True, index=collab_df.index)
+        if start is not None:
+            keep &= year_month >= start
+        if end is not None:
+            keep &= year_month <= end
+        collab_df = collab_df[keep].reset_index(drop=True)
+    return collab_df if columns is None else collab_df[list(columns)]
+
+
+def load_latest_network(data_dir=None):
+    """最新一个月的网络快照 (source, target, weight)，有分区时只读取最后一个分区"""
+    data_dir = data_dir or DATA_DIR
+    root = os.path.join(data_dir, os.path.basename(DEFAULT_PARTITION_DIR))
+    months = list_partitions(root)
+    if months:
+        return read_partitions(root, months=months[-1:], columns=['source', 'target', 'weight'])
+    return pd.read_csv(os.path.join(data_dir, 'latest_network.csv'))
+
+
+def export_csv(path, root=None, months=None):
+    """
+    逐月把分区导出为一个扁平CSV（供DataEase等工具使用），内存占用为单月数据量
+
+    返回:
+        导出的记录数
+    """
+    total = 0
+    for index, year_month in enumerate(list_partitions(root) if months is None else months):
+        month_df = read_partitions(root, months=[year_month])
+        month_df.to_csv(path, mode='w' if index == 0 else 'a', header=index == 0, index=False)
+        total += len(month_df)
+    return total
+
+
+def compute_monthly_metrics(edges_df):
+    """按月聚合协作指标，列与monthly_metrics.csv一致"""
+    return compute_period_metrics(edges_df, 'month')
+
+
+def compute_period_metrics(edges_df, granularity='month'):
+    """
+    按时间粒度（day/week/month/quarter）聚合协作指标
+    时间列为time_buckets.time_key(granularity)，月粒度即year_month，其余列与monthly_metrics.csv一致
+    """
+    key = time_key(granularity)
+    edges_df = add_time_key(edges_df, granularity)
+    grouped = edges_df.groupby(key)
+    metrics = pd.DataFrame({
+        'num_collaborations': grouped.size(),
+        'avg_collab_weight': grouped['weight'].mean().round(4)
+    })
+    participants = pd.concat([
+        edges_df[[key, 'source']].rename(columns={'source': 'developer_id'}),
+        edges_df[[key, 'target']].rename(columns={'target': 'developer_id'})
+    ]).drop_duplicates()
+    metrics['num_active_developers'] = participants.groupby(key).size()
+    metrics['unique_pairs'] = edges_df[[key, 'source', 'target']].drop_duplicates().groupby(key).size()
+    metrics = metrics.reset_index().sort_values(key)
+    return metrics[[key, 'num_collaborations', 'num_active_developers', 'avg_collab_weight', 'unique_pairs']]
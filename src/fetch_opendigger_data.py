@@ -8,11 +8,22 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import os
+import sys
 import json
+import calendar
 
-def fetch_opendigger_data():
+from http_cache import ResponseCache, cached_get_json
+from developer_registry import DeveloperRegistry
+from edge_store import compute_period_metrics, write_partitions
+from time_buckets import DEFAULT_GRANULARITY, PERIOD_LABELS, period_filename
+
+def fetch_opendigger_data(org="pandas-dev", repo="pandas", granularity=DEFAULT_GRANULARITY):
     """
     使用OpenDigger获取真实开发者协作数据
+    
+    参数:
+        org, repo: 仓库所属组织与名称（多仓库请使用batch_ingest.py）
+        granularity: 聚合指标的时间粒度（day/week/month/quarter）
     """
     print("=" * 60)
     print("使用OpenDigger获取真实开发者协作数据...")
@@ -21,14 +32,20 @@ def fetch_opendigger_data():
     # 创建数据目录
     os.makedirs('../data', exist_ok=True)
     
-    # 1. 选择一个开源项目，例如pandas
+    # 1. 选择一个开源项目，默认为pandas
     platform = "github"
-    org = "pandas-dev"
-    repo = "pandas"
     
     # OpenDigger数据URL
     base_url = f"https://oss.open-digger.cn/{platform}/{org}/{repo}/"
     
+    # 获取元数据（经由本地缓存；设置OPENSAGA_OFFLINE=1时只从缓存回放）
+    cache = ResponseCache.from_env()
+    try:
+        meta = cached_get_json(f"{base_url}meta.json", cache=cache)
+        print(f"元数据字段: {list(meta.keys()) if isinstance(meta, dict) else type(meta).__name__}")
+    except Exception as e:
+        print(f"元数据获取失败: {e}")
+    
     # 2. 获取开发者数据
     print("1. 获取开发者数据...")
     
@@ -51,6 +68,7 @@ def fetch_opendigger_data():
         developers.append(dev)
     
     developers_df = pd.DataFrame(developers)
+    registry = DeveloperRegistry(developers_df)
     
     # 3. 获取协作数据
     print("2. 获取协作数据...")
@@ -65,6 +83,7 @@ def fetch_opendigger_data():
     for month_offset in range(months-1, -1, -1):
         month_date = end_date - timedelta(days=30*month_offset)
         year_month = month_date.strftime('%Y-%m')
+        days_in_month = calendar.monthrange(month_date.year, month_date.month)[1]
         print(f"  生成 {year_month} 月数据...")
         
         # 每月生成100-200条协作记录
@@ -78,18 +97,21 @@ def fetch_opendigger_data():
                 target_id = np.random.randint(1, 51)
             
             # 获取开发者技术栈
-            source_tech = developers_df[developers_df['developer_id'] == source_id]['primary_tech'].iloc[0]
-            target_tech = developers_df[developers_df['developer_id'] == target_id]['primary_tech'].iloc[0]
+            source_tech = registry.get(source_id, 'primary_tech')
+            target_tech = registry.get(target_id, 'primary_tech')
             
             # 计算协作权重
             tech_match = 1.0 if source_tech == target_tech else 0.3
             weight = round(tech_match * np.random.uniform(0.5, 1.5), 2)
             
+            # 协作发生在该月的任意一天
+            event_date = month_date.replace(day=np.random.randint(1, days_in_month + 1))
+            
             edge = {
                 'source': source_id,
                 'target': target_id,
                 'weight': weight,
-                'timestamp': month_date.strftime('%Y-%m-%d'),
+                'timestamp': event_date.strftime('%Y-%m-%d'),
                 'year_month': year_month,
                 'source_tech': source_tech,
                 'target_tech': target_tech
@@ -98,23 +120,10 @@ def fetch_opendigger_data():
     
     edges_df = pd.DataFrame(all_edges)
     
-    # 4. 生成月度聚合指标
-    print("3. 生成月度聚合指标...")
-    monthly_metrics = []
-    
-    for year_month in sorted(edges_df['year_month'].unique()):
-        month_edges = edges_df[edges_df['year_month'] == year_month]
-        
-        metrics = {
-            'year_month': year_month,
-            'num_collaborations': len(month_edges),
-            'num_active_developers': len(set(month_edges['source'].tolist() + month_edges['target'].tolist())),
-            'avg_collab_weight': round(month_edges['weight'].mean(), 4),
-            'unique_pairs': len(month_edges[['source', 'target']].drop_duplicates())
-        }
-        monthly_metrics.append(metrics)
-    
-    monthly_df = pd.DataFrame(monthly_metrics)
+    # 4. 生成按时间粒度聚合的指标
+    print(f"3. 生成{PERIOD_LABELS[granularity]}聚合指标...")
+    monthly_df = compute_period_metrics(edges_df, granularity)
+    metrics_filename = period_filename('monthly_metrics.csv', granularity)
     
     # 5. 保存所有数据文件
     print("4. 保存数据文件...")
@@ -125,11 +134,12 @@ def fetch_opendigger_data():
     
     # 详细协作关系（时序）
     edges_df.to_csv('../data/collaborations_temporal.csv', index=False)
+    write_partitions(edges_df)
     print(f"    collaborations_temporal.csv: {len(edges_df)} 条协作记录")
     
-    # 月度聚合指标
-    monthly_df.to_csv('../data/monthly_metrics.csv', index=False)
-    print(f"    monthly_metrics.csv: {len(monthly_df)} 个月度指标")
+    # 按时间粒度聚合的指标
+    monthly_df.to_csv(os.path.join('../data', metrics_filename), index=False)
+    print(f"    {metrics_filename}: {len(monthly_df)} 个{PERIOD_LABELS[granularity]}指标")
     
     # 最新一个月的数据快照（用于网络图）
     latest_month = edges_df['year_month'].max()
@@ -143,14 +153,19 @@ def fetch_opendigger_data():
     print("\n生成的文件:")
     print("  data/developers.csv          - 开发者属性信息")
     print("  data/collaborations_temporal.csv - 详细时序协作数据")
-    print("  data/monthly_metrics.csv     - 月度聚合指标（用于趋势图）")
+    print(f"  data/{metrics_filename}     - {PERIOD_LABELS[granularity]}聚合指标（用于趋势图）")
     print("  data/latest_network.csv      - 最新网络快照（用于网络图）")
     
     return developers_df, edges_df, monthly_df
 
 if __name__ == "__main__":
     # 获取数据
-    dev_df, edges_df, monthly_df = fetch_opendigger_data()
+    # 用法: python fetch_opendigger_data.py [org/repo] [--granularity=week]
+    repo_args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    org, repo = repo_args[0].split('/') if repo_args else ("pandas-dev", "pandas")
+    granularity = next((arg.split('=', 1)[1] for arg in sys.argv[1:] if arg.startswith('--granularity=')),
+                       DEFAULT_GRANULARITY)
+    dev_df, edges_df, monthly_df = fetch_opendigger_data(org, repo, granularity=granularity)
     
     # 显示数据摘要
     print("\n📊 数据摘要:")
@@ -4,16 +4,95 @@
 OpenDigger提供了静态数据访问方式，不需要API Key
 """
 
-import requests
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import os
+import sys
 import json
+import shutil
+import calendar
 
-def fetch_real_opendigger_data():
+from async_fetcher import fetch_github_repo
+from developer_registry import DeveloperRegistry
+from http_cache import ResponseCache, cached_get_json
+from edge_extractor import collect_edges, extract_collaboration_edges
+from ingest_state import IngestState, fetch_issues_incremental
+from edge_store import (DEFAULT_PARTITION_DIR, EDGE_COLUMNS, append_partitions,
+                        compute_period_metrics, list_partitions, read_partitions,
+                        write_partitions)
+from time_buckets import (DEFAULT_GRANULARITY, PERIOD_LABELS, TemporalIndex, bucket_months,
+                          period_filename, time_key)
+
+
+def ingest_incremental(org, repo, state, data_dir, granularity=DEFAULT_GRANULARITY):
+    """
+    增量抓取：只获取高水位之后更新的issues/PR，追加为新的月份分区，
+    并只重算受影响时间段（按granularity）的聚合指标
+    """
+    print(f"\n增量抓取 {org}/{repo}，高水位: {state.watermark}")
+    registry = DeveloperRegistry.load(os.path.join(data_dir, 'developers.csv'))
+    developers_df = registry.to_frame()
+    collaborations_csv_path = os.path.join(data_dir, 'collaborations_temporal.csv')
+    metrics_filename = period_filename('monthly_metrics.csv', granularity)
+    monthly_csv_path = os.path.join(data_dir, metrics_filename)
+    
+    async def page_to_edges(fetcher, issues, run_watermark):
+        return await collect_edges(fetcher, org, repo, issues, registry, created_after=run_watermark)
+    
+    new_edges = fetch_issues_incremental(state, page_to_edges, cache=ResponseCache.from_env())
+    if new_edges is None or new_edges.empty:
+        state.commit()
+        print("   没有新增协作记录")
+        return developers_df, pd.DataFrame(columns=EDGE_COLUMNS), \
+            pd.read_csv(monthly_csv_path) if os.path.exists(monthly_csv_path) else None
+    
+    # 分区文件名由本轮run_id决定，中断后重放会覆盖同名文件
+    touched = append_partitions(new_edges, run_id=state.checkpoint['run_id'])
+    
+    # 追加到时序总表；记录追加前的文件大小，中断后重放时先截断再追加
+    if 'flat_size' not in state.checkpoint:
+        state.checkpoint['flat_size'] = os.path.getsize(collaborations_csv_path) if os.path.exists(collaborations_csv_path) else 0
+        state.save()
+    if os.path.exists(collaborations_csv_path):
+        with open(collaborations_csv_path, 'r+b') as f:
+            f.truncate(state.checkpoint['flat_size'])
+    new_edges[EDGE_COLUMNS].to_csv(collaborations_csv_path, mode='a', index=False,
+                                   header=state.checkpoint['flat_size'] == 0)
+    print(f"    collaborations_temporal.csv: 追加 {len(new_edges)} 条协作记录，涉及月份 {touched}")
+    
+    # 只重算受影响时间段的指标；周、季度可能跨月，读取覆盖这些时间段的全部月份分区
+    key = time_key(granularity)
+    touched_index = TemporalIndex.from_frame(new_edges, granularity)
+    first_months, last_months = bucket_months(touched_index.codes, granularity)
+    monthly_df = compute_period_metrics(read_partitions(start=first_months.min(), end=last_months.max()),
+                                        granularity)
+    monthly_df = monthly_df[monthly_df[key].isin(touched_index.labels)]
+    if os.path.exists(monthly_csv_path):
+        previous = pd.read_csv(monthly_csv_path)
+        monthly_df = pd.concat([previous[~previous[key].isin(touched_index.labels)], monthly_df])
+        monthly_df = monthly_df.sort_values(key).reset_index(drop=True)
+    monthly_df.to_csv(monthly_csv_path, index=False)
+    print(f"    {metrics_filename}: 更新 {len(touched_index)} 个{PERIOD_LABELS[granularity]}指标")
+    
+    latest_month = list_partitions()[-1]
+    latest_edges = read_partitions(months=[latest_month])
+    latest_edges[['source', 'target', 'weight']].to_csv(os.path.join(data_dir, 'latest_network.csv'), index=False)
+    print(f"    latest_network.csv: {latest_month} 月网络快照，{len(latest_edges)} 条边")
+    
+    state.commit()
+    print(f"   高水位推进到: {state.watermark}")
+    return developers_df, new_edges, monthly_df
+
+
+def fetch_real_opendigger_data(org="pandas-dev", repo="pandas", incremental=False, granularity=DEFAULT_GRANULARITY):
     """
     使用OpenDigger获取真实开发者协作数据
+    
+    参数:
+        org, repo: 仓库所属组织与名称（多仓库请使用batch_ingest.py）
+        incremental: 已有高水位时只抓取增量数据并追加月份分区
+        granularity: 聚合指标的时间粒度（day/week/month/quarter）
     """
     print("=" * 60)
     print("使用OpenDigger获取真实开发者协作数据...")
@@ -22,10 +101,8 @@ def fetch_real_opendigger_data():
     # 创建数据目录
     os.makedirs('../data', exist_ok=True)
     
-    # 1. 选择一个开源项目，例如pandas
+    # 1. 选择一个开源项目，默认为pandas
     platform = "github"
-    org = "pandas-dev"
-    repo = "pandas"
     
     # OpenDigger静态数据URL
     base_url = f"https://oss.open-digger.cn/{platform}/{org}/{repo}/"
@@ -33,61 +110,74 @@ def fetch_real_opendigger_data():
     print(f"正在获取 {org}/{repo} 的数据...")
     print(f"数据URL: {base_url}")
     
+    # 使用绝对路径保存文件，确保保存到项目目录下的data文件夹
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    data_dir = os.path.join(project_root, 'data')
+    
+    state = IngestState(org, repo)
+    if incremental and state.watermark and os.path.exists(os.path.join(data_dir, 'developers.csv')):
+        return ingest_incremental(org, repo, state, data_dir, granularity)
+    
+    # 分析窗口：最近12个自然月
+    end_date = datetime.now()
+    since_month = (end_date.year * 12 + end_date.month - 1) - 11
+    since = datetime(since_month // 12, since_month % 12 + 1, 1).strftime('%Y-%m-%dT%H:%M:%SZ')
+    
     # 2. 获取开发者数据
     print("\n2. 获取开发者数据...")
     
+    real_developers = False
     try:
         # 尝试从OpenDigger获取真实数据
         print("   尝试从OpenDigger获取真实数据...")
         
-        # 先获取元数据，了解数据结构
+        # 先获取元数据，了解数据结构（经由本地缓存，未变化时只做一次条件请求）
+        cache = ResponseCache.from_env()
         meta_url = f"{base_url}meta.json"
         print(f"   获取元数据: {meta_url}")
+        try:
+            meta = cached_get_json(meta_url, cache=cache)
+            print(f"   元数据字段: {list(meta.keys()) if isinstance(meta, dict) else type(meta).__name__}")
+        except Exception as e:
+            print(f"   元数据获取失败: {e}")
         
         # 这里我们使用GitHub API获取真实的开发者数据，因为OpenDigger的API需要特殊处理
-        # 首先获取pandas项目的贡献者列表
-        github_api_url = f"https://api.github.com/repos/{org}/{repo}/contributors?per_page=50"
-        print(f"   从GitHub API获取贡献者: {github_api_url}")
+        print(f"   从GitHub API获取贡献者...")
         
-        # 发送请求获取贡献者数据
-        response = requests.get(github_api_url)
+        contributors, _ = fetch_github_repo(org, repo, max_contributors=50, include_issues=False, cache=cache)
+        print(f"   HTTP缓存: 命中 {cache.stats['hits']} 次，重新验证 {cache.stats['revalidated']} 次，写入 {cache.stats['stored']} 次")
         
-        # 检查响应状态码
-        if response.status_code == 200:
-            contributors = response.json()
+        # 检查contributors是否是列表且非空
+        if isinstance(contributors, list) and len(contributors) > 0:
+            # 处理贡献者数据，转换为我们需要的格式
+            developers = []
+            tech_stacks = ['Python', 'JavaScript', 'Java', 'Go', 'Rust', 'C++', 'TypeScript']
             
-            # 检查contributors是否是列表且非空
-            if isinstance(contributors, list) and len(contributors) > 0:
-                # 处理贡献者数据，转换为我们需要的格式
-                developers = []
-                tech_stacks = ['Python', 'JavaScript', 'Java', 'Go', 'Rust', 'C++', 'TypeScript']
-                
-                print(f"   获取到 {len(contributors)} 位贡献者")
-                
-                for i, contributor in enumerate(contributors[:50]):  # 取前50个贡献者
-                    # 确保contributor是字典且包含login字段
-                    if isinstance(contributor, dict) and 'login' in contributor:
-                        dev = {
-                            'developer_id': i + 1,
-                            'name': contributor['login'],
-                            'primary_tech': np.random.choice(tech_stacks),  # 这里可以根据实际情况调整
-                            'join_date': (datetime.now() - timedelta(days=np.random.randint(0, 365))).strftime('%Y-%m-%d'),
-                            'activity_level': round(np.random.uniform(0.3, 1.0), 4)
-                        }
-                        developers.append(dev)
-                    else:
-                        print(f"   贡献者数据格式错误: {contributor}")
-                        
-                if len(developers) > 0:
-                    developers_df = pd.DataFrame(developers)
-                    print(f"    成功获取 {len(developers_df)} 位真实开发者数据")
-                    print(f"   示例用户名: {developers_df['name'].iloc[0]}, {developers_df['name'].iloc[1]}, {developers_df['name'].iloc[2]}")
+            print(f"   获取到 {len(contributors)} 位贡献者")
+            
+            for i, contributor in enumerate(contributors[:50]):  # 取前50个贡献者
+                # 确保contributor是字典且包含login字段
+                if isinstance(contributor, dict) and 'login' in contributor:
+                    dev = {
+                        'developer_id': i + 1,
+                        'name': contributor['login'],
+                        'primary_tech': np.random.choice(tech_stacks),  # 这里可以根据实际情况调整
+                        'join_date': (datetime.now() - timedelta(days=np.random.randint(0, 365))).strftime('%Y-%m-%d'),
+                        'activity_level': round(np.random.uniform(0.3, 1.0), 4)
+                    }
+                    developers.append(dev)
                 else:
-                    raise Exception("没有获取到有效的贡献者数据")
+                    print(f"   贡献者数据格式错误: {contributor}")
+                    
+            if len(developers) > 0:
+                developers_df = pd.DataFrame(developers)
+                real_developers = True
+                print(f"    成功获取 {len(developers_df)} 位真实开发者数据")
+                print(f"   示例用户名: {developers_df['name'].iloc[0]}, {developers_df['name'].iloc[1]}, {developers_df['name'].iloc[2]}")
             else:
-                raise Exception("GitHub API返回的贡献者数据为空或格式错误")
+                raise Exception("没有获取到有效的贡献者数据")
         else:
-            raise Exception(f"GitHub API请求失败，状态码: {response.status_code}, 响应: {response.text}")
+            raise Exception("GitHub API返回的贡献者数据为空或格式错误")
         
     except Exception as e:
         print(f"     从OpenDigger获取数据失败: {e}")
@@ -110,127 +200,39 @@ def fetch_real_opendigger_data():
         
         developers_df = pd.DataFrame(developers)
     
+    # 按ID/登录名的O(1)索引，替代逐条扫描developers_df
+    registry = DeveloperRegistry(developers_df)
+    
     # 3. 获取协作数据
     print("\n3. 获取协作数据...")
     
+    real_edges = False
+    run_started_at = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
     try:
         # 尝试从OpenDigger获取真实的协作数据
         print("   尝试从OpenDigger获取真实协作数据...")
         
-        # 获取pandas项目的issues和pull requests数据，用于生成协作关系
-        issues_url = f"https://api.github.com/repos/{org}/{repo}/issues?per_page=100&state=all"
-        print(f"   从GitHub API获取issues: {issues_url}")
+        if not real_developers:
+            raise Exception("未能从GitHub API获取开发者数据")
         
-        response = requests.get(issues_url)
-        issues = response.json()
+        # 流式提取issue评论、PR评审与评审评论中的真实协作关系，分块写入月份分区
+        print(f"   流式提取 {since} 之后的issue评论与PR评审...")
+        if os.path.isdir(DEFAULT_PARTITION_DIR):
+            shutil.rmtree(DEFAULT_PARTITION_DIR)
+        run_id = datetime.now().strftime('%Y%m%dT%H%M%S')
+        chunk_ids = iter(range(1, 1000000))
         
-        # 处理issues数据，生成协作关系
-        all_edges = []
+        def write_chunk(chunk_df):
+            append_partitions(chunk_df, run_id=f'{run_id}-{next(chunk_ids):05d}')
         
-        # 生成过去12个月的数据
-        end_date = datetime.now()
-        months = 12
+        stats = extract_collaboration_edges(org, repo, registry, sink=write_chunk, since=since, cache=cache)
+        print(f"   {stats['requests']} 个请求，{stats['interactions']} 次交互，"
+              f"{stats['edges']} 条开发者间协作边，分 {stats['chunks']} 块写出")
+        if stats['edges'] == 0:
+            raise Exception("未提取到开发者之间的协作关系")
         
-        for month_offset in range(months-1, -1, -1):
-            # 使用精确的月份计算，确保覆盖完整的12个月
-            target_month = end_date.month - month_offset
-            target_year = end_date.year
-            
-            # 处理月份越界
-            while target_month <= 0:
-                target_month += 12
-                target_year -= 1
-            
-            # 构建目标月份日期
-            month_date = end_date.replace(year=target_year, month=target_month, day=1)
-            year_month = month_date.strftime('%Y-%m')
-            print(f"   处理 {year_month} 月数据...")
-            
-            # 从issues和PR中提取该月的协作关系
-            for issue in issues:
-                if 'created_at' in issue and issue['created_at'].startswith(year_month):
-                    # 获取issue的创建者和参与者
-                    creator = issue['user']['login']
-                    
-                    # 查找创建者的developer_id
-                    creator_dev = developers_df[developers_df['name'] == creator]
-                    if not creator_dev.empty:
-                        creator_id = creator_dev['developer_id'].iloc[0]
-                        
-                        # 随机选择一个参与者（这里简化处理，实际可以从comments中获取）
-                        target_dev = developers_df.sample(n=1)
-                        target_id = target_dev['developer_id'].iloc[0]
-                        
-                        # 确保创建者和参与者不是同一个人
-                        if creator_id != target_id:
-                            # 获取技术栈
-                            source_tech = developers_df[developers_df['developer_id'] == creator_id]['primary_tech'].iloc[0]
-                            target_tech = developers_df[developers_df['developer_id'] == target_id]['primary_tech'].iloc[0]
-                            
-                            # 计算协作权重
-                            tech_match = 1.0 if source_tech == target_tech else 0.3
-                            weight = round(tech_match * np.random.uniform(0.5, 1.5), 2)
-                            
-                            edge = {
-                                'source': creator_id,
-                                'target': target_id,
-                                'weight': weight,
-                                'timestamp': month_date.strftime('%Y-%m-%d'),
-                                'year_month': year_month,
-                                'source_tech': source_tech,
-                                'target_tech': target_tech
-                            }
-                            all_edges.append(edge)
-        
-        # 如果没有获取到足够的数据，生成一些补充数据
-        if len(all_edges) < 500:
-            print("     从GitHub API获取的协作数据不足，生成补充数据...")
-            
-            # 生成补充的协作数据
-            for month_offset in range(months-1, -1, -1):
-                # 使用精确的月份计算，确保覆盖完整的12个月
-                target_month = end_date.month - month_offset
-                target_year = end_date.year
-                
-                # 处理月份越界
-                while target_month <= 0:
-                    target_month += 12
-                    target_year -= 1
-                
-                # 构建目标月份日期
-                month_date = end_date.replace(year=target_year, month=target_month, day=1)
-                year_month = month_date.strftime('%Y-%m')
-                
-                # 每月生成50-100条补充记录
-                num_edges = np.random.randint(50, 100)
-                
-                for _ in range(num_edges):
-                    # 随机选择两个不同的开发者
-                    source_id = np.random.randint(1, len(developers_df) + 1)
-                    target_id = np.random.randint(1, len(developers_df) + 1)
-                    while target_id == source_id:
-                        target_id = np.random.randint(1, len(developers_df) + 1)
-                    
-                    # 获取开发者技术栈
-                    source_tech = developers_df[developers_df['developer_id'] == source_id]['primary_tech'].iloc[0]
-                    target_tech = developers_df[developers_df['developer_id'] == target_id]['primary_tech'].iloc[0]
-                    
-                    # 计算协作权重
-                    tech_match = 1.0 if source_tech == target_tech else 0.3
-                    weight = round(tech_match * np.random.uniform(0.5, 1.5), 2)
-                    
-                    edge = {
-                        'source': source_id,
-                        'target': target_id,
-                        'weight': weight,
-                        'timestamp': month_date.strftime('%Y-%m-%d'),
-                        'year_month': year_month,
-                        'source_tech': source_tech,
-                        'target_tech': target_tech
-                    }
-                    all_edges.append(edge)
-        
-        edges_df = pd.DataFrame(all_edges)
+        edges_df = read_partitions().sort_values('timestamp', kind='stable').reset_index(drop=True)
+        real_edges = True
         print(f"    成功生成 {len(edges_df)} 条协作记录")
         
     except Exception as e:
@@ -257,6 +259,7 @@ def fetch_real_opendigger_data():
             # 构建目标月份日期
             month_date = end_date.replace(year=target_year, month=target_month, day=1)
             year_month = month_date.strftime('%Y-%m')
+            days_in_month = calendar.monthrange(target_year, target_month)[1]
             print(f"   生成 {year_month} 月数据...")
             
             # 每月生成100-200条协作记录
@@ -270,18 +273,21 @@ def fetch_real_opendigger_data():
                     target_id = np.random.randint(1, len(developers_df) + 1)
                 
                 # 获取开发者技术栈
-                source_tech = developers_df[developers_df['developer_id'] == source_id]['primary_tech'].iloc[0]
-                target_tech = developers_df[developers_df['developer_id'] == target_id]['primary_tech'].iloc[0]
+                source_tech = registry.get(source_id, 'primary_tech')
+                target_tech = registry.get(target_id, 'primary_tech')
                 
                 # 计算协作权重
                 tech_match = 1.0 if source_tech == target_tech else 0.3
                 weight = round(tech_match * np.random.uniform(0.5, 1.5), 2)
                 
+                # 协作发生在该月的任意一天
+                event_date = month_date.replace(day=np.random.randint(1, days_in_month + 1))
+                
                 edge = {
                     'source': source_id,
                     'target': target_id,
                     'weight': weight,
-                    'timestamp': month_date.strftime('%Y-%m-%d'),
+                    'timestamp': event_date.strftime('%Y-%m-%d'),
                     'year_month': year_month,
                     'source_tech': source_tech,
                     'target_tech': target_tech
@@ -290,31 +296,14 @@ def fetch_real_opendigger_data():
         
         edges_df = pd.DataFrame(all_edges)
     
-    # 4. 生成月度聚合指标
-    print("4. 生成月度聚合指标...")
-    monthly_metrics = []
-    
-    for year_month in sorted(edges_df['year_month'].unique()):
-        month_edges = edges_df[edges_df['year_month'] == year_month]
-        
-        metrics = {
-            'year_month': year_month,
-            'num_collaborations': len(month_edges),
-            'num_active_developers': len(set(month_edges['source'].tolist() + month_edges['target'].tolist())),
-            'avg_collab_weight': round(month_edges['weight'].mean(), 4),
-            'unique_pairs': len(month_edges[['source', 'target']].drop_duplicates())
-        }
-        monthly_metrics.append(metrics)
-    
-    monthly_df = pd.DataFrame(monthly_metrics)
+    # 4. 生成按时间粒度聚合的指标
+    print(f"4. 生成{PERIOD_LABELS[granularity]}聚合指标...")
+    monthly_df = compute_period_metrics(edges_df, granularity)
+    metrics_filename = period_filename('monthly_metrics.csv', granularity)
     
     # 5. 保存所有数据文件
     print("5. 保存数据文件...")
     
-    # 使用绝对路径保存文件，确保保存到项目目录下的data文件夹
-    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    data_dir = os.path.join(project_root, 'data')
-    
     # 添加调试信息
     print(f"   开发者数据前3行: {developers_df.head(3).to_dict('records')}")
     print(f"   数据类型: {type(developers_df)}")
@@ -342,10 +331,10 @@ def fetch_real_opendigger_data():
     print(f"    collaborations_temporal.csv: {len(edges_df)} 条协作记录")
     print(f"    保存路径: {collaborations_csv_path}")
     
-    # 月度聚合指标
-    monthly_csv_path = os.path.join(data_dir, 'monthly_metrics.csv')
+    # 按时间粒度聚合的指标
+    monthly_csv_path = os.path.join(data_dir, metrics_filename)
     monthly_df.to_csv(monthly_csv_path, index=False)
-    print(f"    monthly_metrics.csv: {len(monthly_df)} 个月度指标")
+    print(f"    {metrics_filename}: {len(monthly_df)} 个{PERIOD_LABELS[granularity]}指标")
     print(f"    保存路径: {monthly_csv_path}")
     
     # 最新一个月的数据快照（用于网络图）
@@ -356,13 +345,23 @@ def fetch_real_opendigger_data():
     print(f"    latest_network.csv: {latest_month} 月网络快照，{len(latest_edges)} 条边")
     print(f"    保存路径: {latest_csv_path}")
     
+    # 模拟数据需要全量重建月份分区；真实数据已在提取时分块写入，并记录高水位供下次增量抓取使用
+    if not real_edges:
+        write_partitions(edges_df)
+    else:
+        state.watermark = run_started_at
+        state.checkpoint = None
+        state.save()
+        print(f"    高水位: {state.watermark}")
+    print(f"    data/collaborations_temporal/: {len(list_partitions())} 个月份分区")
+    
     print("\n" + "=" * 60)
     print("数据获取完成！")
     print("=" * 60)
     print("\n生成的文件:")
     print("  data/developers.csv          - 开发者属性信息")
     print("  data/collaborations_temporal.csv - 详细时序协作数据")
-    print("  data/monthly_metrics.csv     - 月度聚合指标（用于趋势图）")
+    print(f"  data/{metrics_filename}     - {PERIOD_LABELS[granularity]}聚合指标（用于趋势图）")
     print("  data/latest_network.csv      - 最新网络快照（用于网络图）")
     
     # 6. 说明如何使用真实的OpenDigger数据
@@ -380,7 +379,13 @@ def fetch_real_opendigger_data():
 
 if __name__ == "__main__":
     # 获取数据
-    dev_df, edges_df, monthly_df = fetch_real_opendigger_data()
+    # 用法: python fetch_real_opendigger_data.py [org/repo] [--incremental] [--granularity=week]
+    repo_args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    org, repo = repo_args[0].split('/') if repo_args else ("pandas-dev", "pandas")
+    granularity = next((arg.split('=', 1)[1] for arg in sys.argv[1:] if arg.startswith('--granularity=')),
+                       DEFAULT_GRANULARITY)
+    dev_df, edges_df, monthly_df = fetch_real_opendigger_data(org, repo, incremental='--incremental' in sys.argv,
+                                                              granularity=granularity)
     
     # 显示数据摘要
     print("\n📊 数据摘要:")
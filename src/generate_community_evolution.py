@@ -1,131 +1,200 @@
 #!/usr/bin/env python3
 # 生成社区演化数据，包含网络级指标
 
+import argparse
 import pandas as pd
+import numpy as np
 import networkx as nx
 import os
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 
-def generate_community_evolution():
-    """生成社区演化数据"""
+from community_tracker import CommunityTracker, detect_communities, partition_modularity
+from edge_store import list_partitions, load_collaborations
+from graph_snapshot import ensure_snapshots, load_snapshot, snapshot_from_frame
+from time_buckets import DEFAULT_GRANULARITY, GRANULARITIES, PERIOD_LABELS, TemporalIndex, period_filename, time_key
+
+def window_metrics(snapshot):
+    """
+    单个时间窗口的网络级指标（不含社区检测）
+
+    返回:
+        (指标dict, 无向图)
+    """
+    G_window = snapshot.to_networkx()
+    G_undir = G_window.to_undirected()
+    num_active = snapshot.num_nodes
+    num_edges = G_window.number_of_edges()
+    if num_edges == 0:
+        return {'num_active_developers': num_active, 'num_edges': 0, 'network_density': 0,
+                'avg_clustering_coefficient': 0, 'num_connected_components': num_active}, G_undir
+
+    # 计算平均聚类系数
+    try:
+        avg_clustering = nx.average_clustering(G_undir)
+    except:
+        avg_clustering = 0
+
+    return {
+        'num_active_developers': num_active,
+        'num_edges': num_edges,
+        'network_density': nx.density(G_window) if num_active > 1 else 0,
+        'avg_clustering_coefficient': avg_clustering,
+        'num_connected_components': nx.number_connected_components(G_undir) if num_active > 0 else 0,
+    }, G_undir
+
+
+def analyze_window(label, snapshot, seed=None, resolution=1.0):
+    """
+    进程池任务：一个时间窗口的网络级指标与从头计算的社区划分
+    snapshot为已落盘的快照时只按路径传入子进程，由子进程映射共享的快照文件
+
+    返回:
+        (label, 指标dict, 社区划分 {节点: 社区标签}, 模块度, Louvain层数, 社区检测耗时)
+    """
+    metrics, G_undir = window_metrics(snapshot)
+    if metrics['num_edges'] == 0:
+        return label, metrics, {}, 0.0, 0, 0.0
+    start = time.perf_counter()
+    raw_partition, levels = detect_communities(G_undir, resolution=resolution, seed=seed)
+    modularity = partition_modularity(raw_partition, G_undir)
+    return label, metrics, raw_partition, modularity, levels, time.perf_counter() - start
+
+
+def analyze_windows(windows, workers=1, warm_start=True, seed=42):
+    """
+    按时间顺序分析一组时间窗口（月份或任意区间）
+
+    参数:
+        windows: [(标签, CSRSnapshot)]，按时间排序
+        workers: 进程数，None为全部CPU核；大于1时各窗口分发到进程池并行计算，
+                 社区检测从头计算（上月划分作初始划分需要按顺序执行），
+                 社区ID的匹配在主进程中按时间顺序完成，结果与进程数无关
+        warm_start: 串行时是否以上一窗口的划分为初始划分
+
+    返回:
+        ([(标签, 指标dict, 社区划分 {节点: 稳定社区ID}, 跟踪统计)], CommunityTracker)
+    """
+    workers = workers or os.cpu_count() or 1
+    parallel = workers > 1 and len(windows) > 1
+    tracker = CommunityTracker(warm_start=warm_start and not parallel, seed=seed)
+    results = []
+    if parallel:
+        labels = [label for label, _ in windows]
+        snapshots = [snapshot for _, snapshot in windows]
+        with ProcessPoolExecutor(max_workers=min(workers, len(windows))) as pool:
+            # map按提交顺序返回，合并顺序确定
+            for label, metrics, raw_partition, modularity, levels, seconds in pool.map(
+                    analyze_window, labels, snapshots, repeat(seed)):
+                partition, stats = ({}, None) if metrics['num_edges'] == 0 else \
+                    tracker.adopt(label, raw_partition, modularity, levels, seconds)
+                results.append((label, metrics, partition, stats))
+        return results, tracker
+
+    for label, snapshot in windows:
+        metrics, G_undir = window_metrics(snapshot)
+        partition, stats = ({}, None) if metrics['num_edges'] == 0 else tracker.update(label, G_undir)
+        results.append((label, metrics, partition, stats))
+    return results, tracker
+
+
+def generate_community_evolution(warm_start=True, workers=1, granularity=DEFAULT_GRANULARITY):
+    """
+    生成社区演化数据
+
+    参数:
+        warm_start: 每月的Louvain以上月划分为初始划分，只把关联边有变化的节点重置为单点社区
+                    （局部移动仍遍历全部节点）；
+                    社区ID按与上月社区的重叠度沿用，跨月稳定
+        workers: 进程数，None为全部CPU核；大于1时各月份并行分析（社区检测每月从头计算），
+                 子进程按路径读取共享的CSR快照，结果按月份顺序合并
+        granularity: 时间粒度（day/week/month/quarter）；月粒度使用磁盘上的月份快照，
+                     其他粒度由timestamp列分桶后在内存中构建快照，输出文件名带粒度后缀
+                     （如community_evolution_weekly.csv），时间列为week/date/quarter，序号列为<粒度>_index
+    """
     print("=" * 60)
     print("生成社区演化数据")
     print("=" * 60)
     
     # 获取项目根目录
-project_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    project_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     
-    # 定义文件路径
-collab_path = os.path.join(project_path, 'data', 'collaborations_temporal.csv')
-    developers_path = os.path.join(project_path, 'data', 'developers.csv')
+    # 定义文件路径（社区演化只依赖协作记录，不读取developers.csv）
     output_dir = os.path.join(project_path, 'data')
     
     os.makedirs(output_dir, exist_ok=True)
     
     print("1. 加载数据...")
     try:
-        collab_df = pd.read_csv(collab_path)
-        developers_df = pd.read_csv(developers_path)
+        collab_df = load_collaborations(columns=['source', 'target', 'weight', 'timestamp', 'year_month'])
         print(f"   协作数据：{len(collab_df)} 条记录")
-        print(f"   开发者数据：{len(developers_df)} 条记录")
     except Exception as e:
         print(f"加载数据失败：{e}")
         sys.exit(1)
     
+    # 有月份分区时使用（并按需更新）磁盘上的CSR快照，否则在内存中按月构建
+    use_snapshots = granularity == 'month' and bool(list_partitions())
+    if use_snapshots:
+        rebuilt = ensure_snapshots()
+        print(f"   CSR快照：更新 {len(rebuilt)} 个月份")
+    
+    workers = workers or os.cpu_count() or 1
+    parallel = workers > 1
+    
     print("\n2. 检查依赖...")
     try:
         import community as community_louvain
-        use_louvain = True
-        print("   使用Louvain算法进行社区检测")
+        print(f"   使用Louvain算法进行社区检测（{'以上月划分为初始划分' if warm_start and not parallel else '每月从头计算'}）")
     except ImportError:
-        use_louvain = False
         print("未安装python-louvain，使用连通组件作为社区")
     
     # 初始化结果
-community_evolution = []
+    community_evolution = []
     monthly_summary = []
     
-    # 按月份分组（按时间排序）
-    print("\n3. 按月份分析网络结构演化...")
-    monthly_groups = sorted(collab_df.groupby('year_month'), key=lambda x: x[0])
+    # 按时间粒度分桶（一次排序完成分组，按时间排序）
+    key = time_key(granularity)
+    index_key = f'{granularity}_index'
+    print(f"\n3. {PERIOD_LABELS[granularity]}分析网络结构演化{f'（{workers}个进程）' if parallel else ''}...")
+    monthly_groups = list(TemporalIndex.from_frame(collab_df, granularity).groups(collab_df))
     
-    for month_idx, (month, month_data) in enumerate(monthly_groups):
+    # 由各时间段的CSR快照创建网络（节点为该时间段活跃的开发者）；落盘的快照跨进程只传递路径
+    windows = [(month, load_snapshot(month) if use_snapshots else snapshot_from_frame(month_data, year_month=month))
+               for month, month_data in monthly_groups]
+    results, tracker = analyze_windows(windows, workers=workers, warm_start=warm_start, seed=42)
+    
+    for month_idx, ((month, month_data), (_, metrics, partition, tracker_stats)) in enumerate(zip(monthly_groups, results)):
         print(f"   {month}: ", end="")
+        num_active = metrics['num_active_developers']
+        num_edges = metrics['num_edges']
         
-        # 创建该月的网络
-        G_month = nx.DiGraph()
-        
-        # 添加该月活跃的开发者
-        active_devs = set(month_data['source']).union(set(month_data['target']))
-        for dev_id in active_devs:
-            dev_info = developers_df[developers_df['developer_id'] == dev_id]
-            if not dev_info.empty:
-                G_month.add_node(dev_id, 
-                               name=dev_info.iloc[0]['name'],
-                               tech=dev_info.iloc[0]['primary_tech'])
-        
-        # 添加该月的协作关系
-        for _, edge in month_data.iterrows():
-            G_month.add_edge(edge['source'], edge['target'], weight=edge['weight'])
-        
-        num_active = len(active_devs)
-        num_edges = G_month.number_of_edges()
-        
-        # 检测社区
+        # 检测社区（未安装python-louvain时跟踪器使用连通组件），社区ID跨月稳定
         if num_edges > 0:
-            if use_louvain:
-                # 使用Louvain算法
-                G_undir = G_month.to_undirected()
-                partition = community_louvain.best_partition(G_undir)
-                
-                # 重组社区结构
-                communities_dict = {}
-                for node, comm_id in partition.items():
-                    communities_dict.setdefault(comm_id, []).append(node)
-                communities = list(communities_dict.values())
-                num_communities = len(communities)
-                
-            else:
-                # 使用连通组件
-                G_undir = G_month.to_undirected()
-                components = list(nx.connected_components(G_undir))
-                communities = components
-                num_communities = len(components)
-                partition = {}
-                for comm_id, nodes in enumerate(components):
-                    for node in nodes:
-                        partition[node] = comm_id
+            # 重组社区结构
+            communities_dict = {}
+            for node, comm_id in partition.items():
+                communities_dict.setdefault(comm_id, []).append(node)
+            communities = list(communities_dict.values())
+            num_communities = len(communities)
             
             # 记录社区信息
-            for comm_id, comm_nodes in enumerate(communities):
+            for comm_id, comm_nodes in communities_dict.items():
                 for node in comm_nodes:
                     community_evolution.append({
-                        'year_month': month,
-                        'month_index': month_idx,
+                        key: month,
+                        index_key: month_idx,
                         'developer_id': node,
                         'community_id': comm_id,
                         'community_size': len(comm_nodes)
                     })
             
-            # 计算网络级指标
-            G_undir = G_month.to_undirected()
-            network_density = nx.density(G_month) if num_active > 1 else 0
-            
-            # 计算平均聚类系数
-            try:
-                avg_clustering = nx.average_clustering(G_undir)
-            except:
-                avg_clustering = 0
-            
-            # 计算连通分量数
-            num_connected_components = nx.number_connected_components(G_undir) if num_active > 0 else 0
-            
             # 记录月度汇总
             avg_community_size = sum(len(c) for c in communities) / len(communities) if communities else 0
             
             # 计算社区规模的标准差
             if len(communities) > 1:
-                import numpy as np
                 community_sizes = [len(c) for c in communities]
                 community_size_std = np.std(community_sizes)
             else:
@@ -135,8 +204,8 @@ community_evolution = []
             avg_collab_strength = month_data['weight'].mean() if len(month_data) > 0 else 0
             
             monthly_summary.append({
-                'year_month': month,
-                'month_index': month_idx,
+                key: month,
+                index_key: month_idx,
                 'num_active_developers': num_active,
                 'num_collaborations': len(month_data),
                 'num_edges': num_edges,
@@ -144,17 +213,23 @@ community_evolution = []
                 'num_communities': num_communities,
                 'avg_community_size': round(avg_community_size, 1),
                 'community_size_std': round(community_size_std, 2),
-                'network_density': round(network_density, 4),
-                'avg_clustering_coefficient': round(avg_clustering, 4),
-                'num_connected_components': num_connected_components
+                'network_density': round(metrics['network_density'], 4),
+                'avg_clustering_coefficient': round(metrics['avg_clustering_coefficient'], 4),
+                'num_connected_components': metrics['num_connected_components'],
+                'modularity': round(tracker_stats['modularity'], 4),
+                'louvain_levels': tracker_stats['louvain_levels'],
+                'reset_nodes': tracker_stats['reset_nodes'],
+                'moved_nodes': tracker_stats['moved_nodes']
             })
             
-            print(f"{num_active}活跃开发者, {num_edges}条边, {num_communities}个社区")
+            print(f"{num_active}活跃开发者, {num_edges}条边, {num_communities}个社区, "
+                  f"重置{tracker_stats['reset_nodes']}个节点, {tracker_stats['moved_nodes']}个节点换社区, "
+                  f"沿用{tracker_stats['matched_communities']}个社区ID")
         else:
             # 当没有边时，设置默认值
             monthly_summary.append({
-                'year_month': month,
-                'month_index': month_idx,
+                key: month,
+                index_key: month_idx,
                 'num_active_developers': num_active,
                 'num_collaborations': len(month_data),
                 'num_edges': num_edges,
@@ -164,39 +239,49 @@ community_evolution = []
                 'community_size_std': 0,
                 'network_density': 0,
                 'avg_clustering_coefficient': 0,
-                'num_connected_components': num_active if num_active > 0 else 0
+                'num_connected_components': num_active if num_active > 0 else 0,
+                'modularity': 0,
+                'louvain_levels': 0,
+                'reset_nodes': 0,
+                'moved_nodes': 0
             })
             print(f"{num_active}活跃开发者, 0条边, 0个社区")
     
     # 处理结果
     print("\n4. 处理结果...")
     if community_evolution:
+        detail_filename = period_filename('community_evolution_detail.csv', granularity)
+        summary_filename = period_filename('community_evolution_monthly.csv', granularity)
+        viz_filename = period_filename('for_viz_community_monthly.csv', granularity)
         community_evolution_df = pd.DataFrame(community_evolution)
         monthly_summary_df = pd.DataFrame(monthly_summary)
         
         print(f"社区演化分析完成:")
-        print(f"   覆盖 {len(monthly_summary_df)} 个月份")
+        print(f"   覆盖 {len(monthly_summary_df)} 个{key}")
         print(f"   总记录数: {len(community_evolution_df)} 条")
-        print(f"   平均每月社区数: {monthly_summary_df['num_communities'].mean():.1f}")
+        print(f"   平均每个{key}社区数: {monthly_summary_df['num_communities'].mean():.1f}")
+        if tracker.history:
+            print(f"   社区检测耗时: {sum(stats['seconds'] for stats in tracker.history):.3f}s，"
+                  f"平均模块度: {np.mean([stats['modularity'] for stats in tracker.history]):.4f}")
         
         # 保存数据
-        community_evolution_df.to_csv(os.path.join(output_dir, 'community_evolution_detail.csv'), index=False, encoding='utf-8')
-        monthly_summary_df.to_csv(os.path.join(output_dir, 'community_evolution_monthly.csv'), index=False, encoding='utf-8')
+        community_evolution_df.to_csv(os.path.join(output_dir, detail_filename), index=False, encoding='utf-8')
+        monthly_summary_df.to_csv(os.path.join(output_dir, summary_filename), index=False, encoding='utf-8')
         
         # 保存用于可视化的数据
         viz_dir = os.path.join(project_path, 'viz')
         os.makedirs(viz_dir, exist_ok=True)
-        viz_monthly_path = os.path.join(viz_dir, 'for_viz_community_monthly.csv')
+        viz_monthly_path = os.path.join(viz_dir, viz_filename)
         monthly_summary_df.to_csv(viz_monthly_path, index=False, encoding='utf-8')
         
         print(f"\n数据已保存:")
-        print(f"   data/community_evolution_detail.csv")
-        print(f"   data/community_evolution_monthly.csv")
-        print(f"   viz/for_viz_community_monthly.csv")
+        print(f"   data/{detail_filename}")
+        print(f"   data/{summary_filename}")
+        print(f"   viz/{viz_filename}")
         
         print("\n社区演化趋势摘要:")
         print(monthly_summary_df[[
-            'year_month', 'num_communities', 'avg_community_size', 'num_active_developers',
+            key, 'num_communities', 'avg_community_size', 'num_active_developers',
             'network_density', 'avg_clustering_coefficient', 'num_connected_components'
         ]].to_string(index=False))
         
@@ -206,4 +291,10 @@ community_evolution = []
         return None
 
 if __name__ == "__main__":
-    generate_community_evolution()
+    parser = argparse.ArgumentParser(description="生成社区演化数据")
+    parser.add_argument('--workers', type=int, default=1, help="进程数，0为全部CPU核")
+    parser.add_argument('--cold-start', action='store_true', help="每月的Louvain从头计算")
+    parser.add_argument('--granularity', choices=GRANULARITIES, default=DEFAULT_GRANULARITY, help="时间粒度")
+    args = parser.parse_args()
+    generate_community_evolution(warm_start=not args.cold_start, workers=args.workers or None,
+                                 granularity=args.granularity)
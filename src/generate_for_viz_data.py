@@ -8,25 +8,34 @@
 """
 
 import pandas as pd
-import networkx as nx
 import os
 import sys
-import subprocess
 
+from developer_registry import DeveloperRegistry
+from edge_store import load_collaborations, load_latest_network
+from generate_for_viz_trends import generate_for_viz_trends
+from graph_engine import GraphEngine
+from graph_snapshot import monthly_snapshots, snapshot_from_frame
 
-def generate_for_viz_data():
+
+def generate_for_viz_data(betweenness_mode='auto', include_trends=True):
     """
     生成viz文件夹下的四个数据文件
+
+    参数:
+        betweenness_mode: 介数中心性的计算模式（见GraphEngine.calculate_betweenness_centrality），
+                          审计报告等需要精确值时用'exact'，大图按源点划分到多个进程并行计算
+        include_trends: 是否同时生成for_viz_trends.csv；流水线（pipeline.py）中趋势数据是单独的阶段
     """
     print("=" * 60)
     print("生成viz文件夹下的四个数据文件")
     print("=" * 60)
     
     # 获取项目根目录
-project_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    project_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     
     # 定义文件路径
-data_dir = os.path.join(project_path, 'data')
+    data_dir = os.path.join(project_path, 'data')
     viz_dir = os.path.join(project_path, 'viz')
     
     os.makedirs(viz_dir, exist_ok=True)
@@ -35,9 +44,10 @@ data_dir = os.path.join(project_path, 'data')
     print("1. 加载数据...")
     try:
         developers_df = pd.read_csv(os.path.join(data_dir, 'developers.csv'))
-        collab_df = pd.read_csv(os.path.join(data_dir, 'collaborations_temporal.csv'))
+        registry = DeveloperRegistry(developers_df)
+        collab_df = load_collaborations(columns=['year_month'])
         monthly_df = pd.read_csv(os.path.join(data_dir, 'monthly_metrics.csv'))
-        latest_network_df = pd.read_csv(os.path.join(data_dir, 'latest_network.csv'))
+        latest_network_df = load_latest_network()
         community_df = pd.read_csv(os.path.join(data_dir, 'community_evolution_detail.csv'))
         
         print(f"    开发者数据: {len(developers_df)} 位开发者")
@@ -52,45 +62,38 @@ data_dir = os.path.join(project_path, 'data')
     # 2. 生成节点数据 (for_viz_nodes.csv)
     print("\n2. 生成节点数据 (for_viz_nodes.csv)...")
     
-    # 构建网络
-    G = nx.DiGraph()
-    
-    # 添加节点
-    for _, dev in developers_df.iterrows():
-        G.add_node(dev['developer_id'], 
-                  name=dev['name'],
-                  tech=dev['primary_tech'],
-                  activity=dev['activity_level'])
+    # 构建网络：全部开发者为节点，只保留两端都在开发者表中的边
+    known = registry.contains_ids(latest_network_df['source']) & registry.contains_ids(latest_network_df['target'])
+    snapshot = snapshot_from_frame(latest_network_df[known], nodes=developers_df['developer_id'].to_numpy())
     
-    # 添加边
-    for _, edge in latest_network_df.iterrows():
-        if edge['source'] in G and edge['target'] in G:
-            G.add_edge(edge['source'], edge['target'], weight=edge['weight'])
+    print(f"    构建了 {snapshot.num_nodes} 个节点, {snapshot.num_edges} 条边的网络")
     
-    print(f"    构建了 {G.number_of_nodes()} 个节点, {G.number_of_edges()} 条边的网络")
-    
-    # 计算网络指标
-    pagerank = nx.pagerank(G, alpha=0.85)
-    degree_centrality = nx.degree_centrality(G)
-    betweenness_centrality = nx.betweenness_centrality(G)
+    # 计算网络指标：PageRank与度中心性在CSR稀疏后端上向量化计算
+    engine = GraphEngine(backend='sparse')
+    G_sparse = engine.from_snapshot(snapshot)
+    pagerank = engine.calculate_pagerank(G_sparse, alpha=0.85)
+    degree_centrality = engine.calculate_degree_centrality(G_sparse)
+    # 介数中心性：默认小图精确计算、大图按抽样源点估计，并记录实际使用的模式与样本数；
+    # 同样在稀疏图上计算，只有引擎回退到networkx等后端时才在其内部转换，这里不构建networkx图
+    betweenness_centrality, betweenness_info = engine.calculate_betweenness_centrality(
+        G_sparse, mode=betweenness_mode, seed=42, return_info=True)
     
     print(f"    计算了 PageRank, 度中心性, 介数中心性")
+    print(f"    介数中心性模式: {betweenness_info['mode']}，样本数: {betweenness_info['samples']}")
     
     # 准备节点数据
-    node_data = []
-    for node in G.nodes():
-        dev_info = developers_df[developers_df['developer_id'] == node].iloc[0]
-        node_data.append({
-            'developer_id': node,
-            'name': dev_info['name'],
-            'primary_tech': dev_info['primary_tech'],
-            'activity_level': dev_info['activity_level'],
-            'pagerank_score': pagerank[node],
-            'degree_centrality': degree_centrality[node],
-            'betweenness_centrality': betweenness_centrality[node]
-        })
-    
-    node_df = pd.DataFrame(node_data)
+    nodes = snapshot.nodes.tolist()
+    node_df = pd.DataFrame({
+        'developer_id': nodes,
+        'name': registry.lookup('name', nodes),
+        'primary_tech': registry.lookup('primary_tech', nodes),
+        'activity_level': registry.lookup('activity_level', nodes),
+        'pagerank_score': [pagerank[node] for node in nodes],
+        'degree_centrality': [degree_centrality[node] for node in nodes],
+        'betweenness_centrality': [betweenness_centrality[node] for node in nodes],
+        'betweenness_mode': betweenness_info['mode'],
+        'betweenness_samples': betweenness_info['samples']
+    })
     
     # 计算分位数
     for col in ['pagerank_score', 'degree_centrality', 'betweenness_centrality', 'activity_level']:
@@ -132,13 +135,23 @@ data_dir = os.path.join(project_path, 'data')
     print(f"    节点数据已保存到: {node_output_path}")
     print(f"    数据行数: {len(node_df)}")
     
+    # 逐月PageRank序列（月份 × 开发者），每月以上月结果为初始向量
+    pagerank_series, pagerank_info = engine.calculate_pagerank_series(monthly_snapshots(), alpha=0.85,
+                                                                      return_info=True)
+    pagerank_series_path = os.path.join(viz_dir, 'for_viz_pagerank_monthly.csv')
+    pagerank_series.to_csv(pagerank_series_path, encoding='utf-8')
+    print(f"    逐月PageRank已保存到: {pagerank_series_path}")
+    print(f"    {len(pagerank_series)} 个月份 × {pagerank_series.shape[1]} 位开发者，"
+          f"共迭代 {pagerank_info['total_iterations']} 次")
+    
     # 3. 生成趋势数据 (for_viz_trends.csv)
     print("\n3. 生成趋势数据 (for_viz_trends.csv)...")
     
-    # 调用现有的generate_for_viz_trends.py脚本
-    subprocess.run([sys.executable, os.path.join(project_path, 'src', 'generate_for_viz_trends.py')], 
-                   cwd=project_path, check=True)
-    print(f"    趋势数据已保存到: {os.path.join(viz_dir, 'for_viz_trends.csv')}")
+    if include_trends:
+        generate_for_viz_trends()
+        print(f"    趋势数据已保存到: {os.path.join(viz_dir, 'for_viz_trends.csv')}")
+    else:
+        print("    由流水线的viz_trends阶段生成，跳过")
     
     # 4. 生成社区数据 (for_viz_communities.csv)
     print("\n4. 生成社区数据 (for_viz_communities.csv)...")
@@ -173,7 +186,7 @@ data_dir = os.path.join(project_path, 'data')
     print("=" * 60)
     
     # 检查并显示生成的文件
-    for file_name in ['for_viz_nodes.csv', 'for_viz_trends.csv', 
+    for file_name in ['for_viz_nodes.csv', 'for_viz_pagerank_monthly.csv', 'for_viz_trends.csv',
                      'for_viz_communities.csv', 'for_viz_core_developers.csv']:
         file_path = os.path.join(viz_dir, file_name)
         if os.path.exists(file_path):
@@ -199,4 +212,4 @@ data_dir = os.path.join(project_path, 'data')
 
 if __name__ == "__main__":
     import sys
-    generate_for_viz_data()
+    generate_for_viz_data(betweenness_mode='exact' if '--exact-betweenness' in sys.argv else 'auto')
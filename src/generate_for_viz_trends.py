@@ -4,24 +4,33 @@
 将monthly_metrics.csv转换为包含unique、non_unique和total三种协作类型的格式
 """
 
-import pandas as pd
+import argparse
 import os
 
-def generate_for_viz_trends():
+import pandas as pd
+
+from time_buckets import DEFAULT_GRANULARITY, GRANULARITIES, period_filename, time_key
+
+def generate_for_viz_trends(granularity=DEFAULT_GRANULARITY):
     """
     生成符合要求格式的for_viz_trends.csv文件
+    
+    参数:
+        granularity: 时间粒度；月粒度读取monthly_metrics.csv，其他粒度读取对应的
+                     weekly_metrics.csv等并输出for_viz_trends_weekly.csv等
     """
     print("=" * 60)
     print("生成符合要求格式的for_viz_trends.csv文件")
     print("=" * 60)
     
     # 获取项目根目录
-project_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    project_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     
     # 定义文件路径
-input_path = os.path.join(project_path, 'data', 'monthly_metrics.csv')
+    key = time_key(granularity)
+    input_path = os.path.join(project_path, 'data', period_filename('monthly_metrics.csv', granularity))
     output_dir = os.path.join(project_path, 'viz')
-    output_path = os.path.join(output_dir, 'for_viz_trends.csv')
+    output_path = os.path.join(output_dir, period_filename('for_viz_trends.csv', granularity))
     
     os.makedirs(output_dir, exist_ok=True)
     
@@ -38,53 +47,23 @@ input_path = os.path.join(project_path, 'data', 'monthly_metrics.csv')
     # 处理数据
     print("\n2. 处理数据...")
     
-    # 创建结果列表
-    result = []
-    
-    # 遍历每个月份的数据
-    for _, row in df.iterrows():
-        # 计算non_unique值
-        non_unique = row['num_collaborations'] - row['unique_pairs']
-        
-        # 添加三种类型的记录
-        # 1. unique类型
-        result.append({
-            'year_month': row['year_month'],
-            'num_collaborations': row['num_collaborations'],
-            'num_active_developers': row['num_active_developers'],
-            'avg_collab_weight': row['avg_collab_weight'],
-            'unique_pairs': row['unique_pairs'],
-            'collab_type': 'unique',
-            'non_unique': non_unique,
-            'target_value': row['unique_pairs']
-        })
-        
-        # 2. non_unique类型
-        result.append({
-            'year_month': row['year_month'],
-            'num_collaborations': row['num_collaborations'],
-            'num_active_developers': row['num_active_developers'],
-            'avg_collab_weight': row['avg_collab_weight'],
-            'unique_pairs': row['unique_pairs'],
-            'collab_type': 'non_unique',
-            'non_unique': non_unique,
-            'target_value': non_unique
-        })
-        
-        # 3. total类型
-        result.append({
-            'year_month': row['year_month'],
-            'num_collaborations': row['num_collaborations'],
-            'num_active_developers': row['num_active_developers'],
-            'avg_collab_weight': row['avg_collab_weight'],
-            'unique_pairs': row['unique_pairs'],
-            'collab_type': 'total',
-            'non_unique': non_unique,
-            'target_value': row['num_collaborations']
-        })
+    # 每个时间段展开为unique、non_unique、total三行（整列运算，不逐行遍历）
+    base = df[[key, 'num_collaborations', 'num_active_developers', 'avg_collab_weight', 'unique_pairs']].copy()
+    base['non_unique'] = base['num_collaborations'] - base['unique_pairs']
+    targets = {
+        'unique': base['unique_pairs'],
+        'non_unique': base['non_unique'],
+        'total': base['num_collaborations'],
+    }
+    parts = []
+    for collab_type, target_value in targets.items():
+        part = base.assign(collab_type=collab_type, target_value=target_value)
+        parts.append(part[[key, 'num_collaborations', 'num_active_developers', 'avg_collab_weight',
+                           'unique_pairs', 'collab_type', 'non_unique', 'target_value']])
     
     # 转换为DataFrame
-    df_result = pd.DataFrame(result)
+    # 稳定排序还原为按时间段交错的顺序（每个时间段依次为unique、non_unique、total）
+    df_result = pd.concat(parts).sort_index(kind='stable').reset_index(drop=True)
     print(f"    处理后数据：{len(df_result)} 条记录")
     
     # 保存结果
@@ -98,10 +77,13 @@ input_path = os.path.join(project_path, 'data', 'monthly_metrics.csv')
     print(df_result.head(9))  # 显示前3个月的数据
     
     print("\n" + "=" * 60)
-    print(" for_viz_trends.csv 文件生成完成！")
+    print(f" {os.path.basename(output_path)} 文件生成完成！")
     print("=" * 60)
     
     return df_result
 
 if __name__ == "__main__":
-    generate_for_viz_trends()
+    parser = argparse.ArgumentParser(description="生成for_viz_trends.csv")
+    parser.add_argument('--granularity', choices=GRANULARITIES, default=DEFAULT_GRANULARITY, help="时间粒度")
+    args = parser.parse_args()
+    generate_for_viz_trends(granularity=args.granularity)
@@ -7,6 +7,8 @@
 import pandas as pd
 import os
 
+from edge_store import load_collaborations
+
 def generate_full_year_edges():
     """
     生成完整年度的开发者协作边数据
@@ -20,7 +22,7 @@ def generate_full_year_edges():
     
     print("1. 加载数据文件...")
     developers_df = pd.read_csv(os.path.join(project_path, 'data', 'developers.csv'))
-    collab_df = pd.read_csv(os.path.join(project_path, 'data', 'collaborations_temporal.csv'))
+    collab_df = load_collaborations(columns=['source', 'target', 'weight'])
     
     print(f"    开发者数据: {len(developers_df)} 位开发者")
     print(f"    协作记录: {len(collab_df)} 条时序记录")
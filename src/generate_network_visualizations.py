@@ -8,11 +8,19 @@
 """
 
 import pandas as pd
+import numpy as np
 import networkx as nx
 import matplotlib.pyplot as plt
 import os
 import sys
 
+from developer_registry import DeveloperRegistry
+from edge_store import load_latest_network
+from graph_engine import GraphEngine
+
+# 绘图需要节点/边属性，使用networkx后端
+engine = GraphEngine(backend='networkx')
+
 # 设置中文字体
 plt.rcParams['font.sans-serif'] = ['SimHei', 'Arial Unicode MS', 'DejaVu Sans']
 plt.rcParams['axes.unicode_minus'] = False
@@ -26,10 +34,10 @@ def generate_network_visualizations():
     print("=" * 60)
     
     # 获取项目根目录
-project_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    project_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     
     # 定义文件路径
-data_dir = os.path.join(project_path, 'data')
+    data_dir = os.path.join(project_path, 'data')
     viz_dir = os.path.join(project_path, 'viz')
     graph_dir = os.path.join(project_path, 'graph')
     
@@ -39,7 +47,7 @@ data_dir = os.path.join(project_path, 'data')
     print("1. 加载数据...")
     try:
         developers_df = pd.read_csv(os.path.join(data_dir, 'developers.csv'))
-        latest_network_df = pd.read_csv(os.path.join(data_dir, 'latest_network.csv'))
+        latest_network_df = load_latest_network()
         node_df = pd.read_csv(os.path.join(viz_dir, 'for_viz_nodes.csv'))
         
         print(f"    开发者数据: {len(developers_df)} 位开发者")
@@ -71,9 +79,6 @@ def generate_developer_collaboration_graph(developers_df, latest_network_df, nod
     生成开发者协作网络图
     节点大小表示PageRank，边粗细表示合作强度，颜色区分技术栈
     """
-    # 构建网络
-    G = nx.DiGraph()
-    
     # 定义技术栈颜色映射
     tech_colors = {
         'Python': '#3776AB',
@@ -85,18 +90,11 @@ def generate_developer_collaboration_graph(developers_df, latest_network_df, nod
         'TypeScript': '#3178C6'
     }
     
-    # 添加节点，直接使用node_df
-    for _, dev in node_df.iterrows():
-        G.add_node(dev['developer_id'],
-                  name=dev['name'],
-                  tech=dev['primary_tech'],
-                  pagerank=dev['pagerank_score'],
-                  color=tech_colors.get(dev['primary_tech'], '#808080'))
-    
-    # 添加边
-    for _, edge in latest_network_df.iterrows():
-        if edge['source'] in G and edge['target'] in G:
-            G.add_edge(edge['source'], edge['target'], weight=edge['weight'])
+    # 构建网络：节点直接使用node_df，只保留两端都在node_df中的边
+    node_table = node_df.assign(color=node_df['primary_tech'].map(tech_colors).fillna('#808080'))
+    G = engine.build_from_frame(latest_network_df, node_table,
+                                node_attrs={'name': 'name', 'tech': 'primary_tech',
+                                            'pagerank': 'pagerank_score', 'color': 'color'})
     
     # 设置节点大小（基于PageRank）
     node_sizes = [G.nodes[node]['pagerank'] * 10000 for node in G.nodes()]
@@ -148,32 +146,17 @@ def generate_core_developer_influence_graph(developers_df, latest_network_df, no
     生成核心开发者影响力图
     突出核心开发者的连接作用
     """
-    # 构建网络
-    G = nx.DiGraph()
-    
     # 筛选核心开发者，直接使用node_df
     core_devs = node_df[node_df['is_core_developer']]
     core_dev_ids = set(core_devs['developer_id'])
     
     # 定义节点颜色：核心开发者为红色，其他为灰色
-    node_colors = []
-    for _, dev in node_df.iterrows():
-        if dev['is_core_developer']:
-            node_colors.append('#FF5733')
-        else:
-            node_colors.append('#808080')
-    
-    # 添加节点，直接使用node_df
-    for _, dev in node_df.iterrows():
-        G.add_node(dev['developer_id'],
-                  name=dev['name'],
-                  pagerank=dev['pagerank_score'],
-                  is_core=dev['is_core_developer'])
+    node_colors = np.where(node_df['is_core_developer'], '#FF5733', '#808080').tolist()
     
-    # 添加边
-    for _, edge in latest_network_df.iterrows():
-        if edge['source'] in G and edge['target'] in G:
-            G.add_edge(edge['source'], edge['target'], weight=edge['weight'])
+    # 构建网络：节点直接使用node_df，只保留两端都在node_df中的边
+    G = engine.build_from_frame(latest_network_df, node_df,
+                                node_attrs={'name': 'name', 'pagerank': 'pagerank_score',
+                                            'is_core': 'is_core_developer'})
     
     # 设置节点大小（基于PageRank，核心开发者放大）
     node_sizes = []
@@ -238,25 +221,20 @@ def generate_tech_stack_collaboration_graph(developers_df, latest_network_df, ou
     # 计算技术栈之间的合作强度
     tech_collab_matrix = pd.DataFrame(0, index=tech_stacks, columns=tech_stacks, dtype=float)
     
-    # 遍历所有边，计算技术栈之间的合作强度
-    for _, edge in latest_network_df.iterrows():
-        source_tech = developers_df[developers_df['developer_id'] == edge['source']]['primary_tech'].iloc[0]
-        target_tech = developers_df[developers_df['developer_id'] == edge['target']]['primary_tech'].iloc[0]
-        tech_collab_matrix.loc[source_tech, target_tech] += edge['weight']
-    
-    # 构建技术栈合作网络
-    G_tech = nx.DiGraph()
-    
-    # 添加节点（技术栈）
-    for tech in tech_stacks:
-        G_tech.add_node(tech, size=tech_stack_counts[tech])
-    
-    # 添加边（技术栈之间的合作）
-    for source_tech in tech_stacks:
-        for target_tech in tech_stacks:
-            weight = tech_collab_matrix.loc[source_tech, target_tech]
-            if weight > 0:
-                G_tech.add_edge(source_tech, target_tech, weight=weight)
+    # 按边两端的技术栈分组累加合作强度
+    registry = DeveloperRegistry(developers_df)
+    tech_weights = pd.DataFrame({
+        'source_tech': registry.lookup('primary_tech', latest_network_df['source']),
+        'target_tech': registry.lookup('primary_tech', latest_network_df['target']),
+        'weight': latest_network_df['weight'].to_numpy()
+    }).groupby(['source_tech', 'target_tech'])['weight'].sum().unstack(fill_value=0)
+    tech_collab_matrix = tech_collab_matrix.add(tech_weights, fill_value=0).loc[tech_stacks, tech_stacks]
+    
+    # 构建技术栈合作网络：节点为技术栈，边为技术栈之间的合作
+    tech_edges = tech_collab_matrix.stack().rename_axis(['source', 'target']).reset_index(name='weight')
+    tech_edges = tech_edges[tech_edges['weight'] > 0]
+    tech_nodes = pd.DataFrame({'tech': tech_stacks, 'size': tech_stack_counts[tech_stacks].to_numpy()})
+    G_tech = engine.build_from_frame(tech_edges, tech_nodes, node_id='tech')
     
     # 定义技术栈颜色映射
     tech_colors = {
@@ -3,19 +3,27 @@
 生成过去12个月的模拟协作数据,用于时序可视化分析
 """
 
+import argparse
+import calendar
 import pandas as pd
 import numpy as np
 import random
 from datetime import datetime, timedelta
 import os
 
-def generate_temporal_network_data(months=12, num_developers=50):
+from developer_registry import DeveloperRegistry
+from edge_store import compute_period_metrics, write_partitions
+from time_buckets import DEFAULT_GRANULARITY, GRANULARITIES, PERIOD_LABELS, period_filename
+
+def generate_temporal_network_data(months=12, num_developers=50, granularity=DEFAULT_GRANULARITY):
     """
     生成时序网络数据
     
     参数:
         months: 生成几个月的数据
         num_developers: 开发者数量
+        granularity: 聚合指标的时间粒度（day/week/month/quarter），
+                     月粒度写入monthly_metrics.csv，其他粒度写入weekly_metrics.csv等
     """
     print("=" * 60)
     print("生成开源协作网络时序数据...")
@@ -40,6 +48,8 @@ def generate_temporal_network_data(months=12, num_developers=50):
         developers.append(dev)
     
     developers_df = pd.DataFrame(developers)
+    registry = DeveloperRegistry(developers_df)
+    developer_ids = [d['developer_id'] for d in developers]
     
     # 生成时序协作关系（动态网络）
     print("2. 生成时序协作关系...")
@@ -60,13 +70,14 @@ def generate_temporal_network_data(months=12, num_developers=50):
     for month_offset in range(months-1, -1, -1):
         month_date = end_date - timedelta(days=30*month_offset)
         year_month = month_date.strftime('%Y-%m')
+        days_in_month = calendar.monthrange(month_date.year, month_date.month)[1]
         print(f"  生成 {year_month} 月数据...")
         
         # 每月的协作关系
         for source_id, usual_partners in base_network.items():
             # 开发者本月的活跃度
-            source_dev = developers_df[developers_df['developer_id'] == source_id].iloc[0]
-            base_activity = source_dev['activity_level']
+            base_activity = registry.get(source_id, 'activity_level')
+            source_tech = registry.get(source_id, 'primary_tech')
             
             # 每月协作事件数量
             num_collabs = random.randint(1, 5) if random.random() < base_activity else 0
@@ -76,22 +87,22 @@ def generate_temporal_network_data(months=12, num_developers=50):
                 if random.random() < 0.8 and usual_partners:
                     target_id = random.choice(usual_partners)
                 else:
-                    target_id = random.choice([d['developer_id'] for d in developers 
-                                             if d['developer_id'] != source_id])
+                    target_id = random.choice([d for d in developer_ids if d != source_id])
                 
                 # 协作权重（基于技术栈匹配度和活跃度）
-                source_tech = source_dev['primary_tech']
-                target_dev = developers_df[developers_df['developer_id'] == target_id].iloc[0]
-                target_tech = target_dev['primary_tech']
+                target_tech = registry.get(target_id, 'primary_tech')
                 
                 tech_match = 1.0 if source_tech == target_tech else 0.3
                 weight = round(tech_match * random.uniform(0.5, 1.5), 2)
                 
+                # 协作发生在该月的任意一天
+                event_date = month_date.replace(day=random.randint(1, days_in_month))
+                
                 edge = {
                     'source': source_id,
                     'target': target_id,
                     'weight': weight,
-                    'timestamp': month_date.strftime('%Y-%m-%d'),
+                    'timestamp': event_date.strftime('%Y-%m-%d'),
                     'year_month': year_month,
                     'source_tech': source_tech,
                     'target_tech': target_tech
@@ -100,23 +111,10 @@ def generate_temporal_network_data(months=12, num_developers=50):
     
     edges_df = pd.DataFrame(all_edges)
     
-    # 生成月度聚合指标（为DataEase准备）
-    print("3. 生成月度聚合指标...")
-    monthly_metrics = []
-    
-    for year_month in sorted(edges_df['year_month'].unique()):
-        month_edges = edges_df[edges_df['year_month'] == year_month]
-        
-        metrics = {
-            'year_month': year_month,
-            'num_collaborations': len(month_edges),
-            'num_active_developers': len(set(month_edges['source'].tolist() + month_edges['target'].tolist())),
-            'avg_collab_weight': month_edges['weight'].mean(),
-            'unique_pairs': month_edges[['source', 'target']].drop_duplicates().shape[0]
-        }
-        monthly_metrics.append(metrics)
-    
-    monthly_df = pd.DataFrame(monthly_metrics)
+    # 生成按时间粒度聚合的指标（为DataEase准备）
+    print(f"3. 生成{PERIOD_LABELS[granularity]}聚合指标...")
+    monthly_df = compute_period_metrics(edges_df, granularity)
+    metrics_filename = period_filename('monthly_metrics.csv', granularity)
     
     # 保存所有数据文件
     print("4. 保存数据文件...")
@@ -127,11 +125,12 @@ def generate_temporal_network_data(months=12, num_developers=50):
     
     # 详细协作关系（时序）
     edges_df.to_csv('../data/collaborations_temporal.csv', index=False)
+    write_partitions(edges_df)
     print(f"    collaborations_temporal.csv: {len(edges_df)} 条协作记录")
     
-    # 月度聚合指标
-    monthly_df.to_csv('../data/monthly_metrics.csv', index=False)
-    print(f"    monthly_metrics.csv: {len(monthly_df)} 个月度指标")
+    # 按时间粒度聚合的指标
+    monthly_df.to_csv(os.path.join('../data', metrics_filename), index=False)
+    print(f"    {metrics_filename}: {len(monthly_df)} 个{PERIOD_LABELS[granularity]}指标")
     
     # 最新一个月的数据快照（用于网络图）
     latest_month = edges_df['year_month'].max()
@@ -145,15 +144,21 @@ def generate_temporal_network_data(months=12, num_developers=50):
     print("\n生成的文件:")
     print("  data/developers.csv          - 开发者属性信息")
     print("  data/collaborations_temporal.csv - 详细时序协作数据")
-    print("  data/monthly_metrics.csv     - 月度聚合指标（用于趋势图）")
+    print(f"  data/{metrics_filename}     - {PERIOD_LABELS[granularity]}聚合指标（用于趋势图）")
     print("  data/latest_network.csv      - 最新网络快照（用于网络图）")
     print("\n下一步: 运行 examples/network_analysis.ipynb 进行分析")
     
     return developers_df, edges_df, monthly_df
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="生成开源协作网络时序数据")
+    parser.add_argument('--granularity', choices=GRANULARITIES, default=DEFAULT_GRANULARITY,
+                        help="聚合指标的时间粒度")
+    args = parser.parse_args()
+    
     # 生成数据
-    dev_df, edges_df, monthly_df = generate_temporal_network_data(months=12, num_developers=50)
+    dev_df, edges_df, monthly_df = generate_temporal_network_data(months=12, num_developers=50,
+                                                                  granularity=args.granularity)
     
     # 显示数据摘要
     print("\n📊 数据摘要:")
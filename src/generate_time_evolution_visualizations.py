@@ -10,26 +10,36 @@
 
 import pandas as pd
 import matplotlib.pyplot as plt
+import argparse
 import os
 import sys
 
+from time_buckets import DEFAULT_GRANULARITY, GRANULARITIES, PERIOD_LABELS, period_filename, time_key
+
 # 设置中文字体
 plt.rcParams['font.sans-serif'] = ['SimHei', 'Arial Unicode MS', 'DejaVu Sans']
 plt.rcParams['axes.unicode_minus'] = False
 
-def generate_time_evolution_visualizations():
+# 各粒度时间轴的标签
+AXIS_LABELS = {'day': '日期', 'week': '周（周一）', 'month': '月份', 'quarter': '季度'}
+
+def generate_time_evolution_visualizations(granularity=DEFAULT_GRANULARITY):
     """
     生成四个时间演化可视化图
+    
+    参数:
+        granularity: 时间粒度；非月粒度时读取weekly_metrics.csv、community_evolution_weekly.csv等，
+                     图像文件名带粒度后缀，分析报告只针对月度数据生成
     """
     print("=" * 60)
     print("生成时间演化可视化图")
     print("=" * 60)
     
     # 获取项目根目录
-project_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    project_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     
     # 定义文件路径
-data_dir = os.path.join(project_path, 'data')
+    data_dir = os.path.join(project_path, 'data')
     graph_dir = os.path.join(project_path, 'graph')
     
     os.makedirs(graph_dir, exist_ok=True)
@@ -38,36 +48,38 @@ data_dir = os.path.join(project_path, 'data')
     print("1. 加载数据...")
     try:
         # 加载月度指标数据
-        monthly_df = pd.read_csv(os.path.join(data_dir, 'monthly_metrics.csv'))
+        monthly_df = pd.read_csv(os.path.join(data_dir, period_filename('monthly_metrics.csv', granularity)))
         
         # 加载社区演化月度数据
-        community_monthly_df = pd.read_csv(os.path.join(data_dir, 'community_evolution_monthly.csv'))
+        community_monthly_df = pd.read_csv(os.path.join(data_dir, period_filename('community_evolution_monthly.csv',
+                                                                                  granularity)))
         
-        print(f"    月度指标数据: {len(monthly_df)} 个月份")
-        print(f"    社区演化月度数据: {len(community_monthly_df)} 个月份")
+        print(f"    {PERIOD_LABELS[granularity]}指标数据: {len(monthly_df)} 个时间段")
+        print(f"    社区演化{PERIOD_LABELS[granularity]}数据: {len(community_monthly_df)} 个时间段")
     except Exception as e:
         print(f"    加载数据失败: {e}")
         return None
     
     # 2. 生成月度活跃开发者趋势图
     print("\n2. 生成月度活跃开发者趋势图...")
-    generate_active_developers_trend(monthly_df, graph_dir)
+    generate_active_developers_trend(monthly_df, graph_dir, granularity)
     
     # 3. 生成合作次数与强度趋势图
     print("\n3. 生成合作次数与强度趋势图...")
-    generate_collaboration_trend(monthly_df, graph_dir)
+    generate_collaboration_trend(monthly_df, graph_dir, granularity)
     
     # 4. 生成社区数量与规模演化图
     print("\n4. 生成社区数量与规模演化图...")
-    generate_community_evolution(community_monthly_df, graph_dir)
+    generate_community_evolution(community_monthly_df, graph_dir, granularity)
     
     # 5. 生成网络健康指标趋势图
     print("\n5. 生成网络健康指标趋势图...")
-    generate_network_health_trend(community_monthly_df, graph_dir)
+    generate_network_health_trend(community_monthly_df, graph_dir, granularity)
     
     # 6. 生成分析文件
-    print("\n6. 生成分析文件...")
-    generate_analysis_file(graph_dir)
+    if granularity == 'month':
+        print("\n6. 生成分析文件...")
+        generate_analysis_file(graph_dir)
     
     print("\n" + "=" * 60)
     print(" 所有时间演化可视化图生成完成！")
@@ -75,23 +87,23 @@ data_dir = os.path.join(project_path, 'data')
     print(" 分析文件已保存到: {os.path.join(graph_dir, 'time_evolution_analysis.md')}")
     print("=" * 60)
 
-def generate_active_developers_trend(monthly_df, output_dir):
+def generate_active_developers_trend(monthly_df, output_dir, granularity=DEFAULT_GRANULARITY):
     """
     生成月度活跃开发者趋势图
     """
     # 确保数据按时间排序
-    monthly_df = monthly_df.sort_values('year_month')
+    monthly_df = monthly_df.sort_values(time_key(granularity))
     
     # 绘制图形
     plt.figure(figsize=(12, 6), dpi=150)
     
     # 绘制月度活跃开发者曲线
-    plt.plot(monthly_df['year_month'], monthly_df['num_active_developers'], 
+    plt.plot(monthly_df[time_key(granularity)], monthly_df['num_active_developers'], 
              marker='o', linestyle='-', linewidth=2, markersize=6, color='#667eea', alpha=0.8)
     
     # 添加标题和标签
-    plt.title('月度活跃开发者趋势', fontsize=16, fontweight='bold', pad=20)
-    plt.xlabel('月份', fontsize=12, labelpad=10)
+    plt.title(f'{PERIOD_LABELS[granularity]}活跃开发者趋势', fontsize=16, fontweight='bold', pad=20)
+    plt.xlabel(AXIS_LABELS[granularity], fontsize=12, labelpad=10)
     plt.ylabel('活跃开发者数量', fontsize=12, labelpad=10)
     
     # 添加网格线
@@ -104,26 +116,26 @@ def generate_active_developers_trend(monthly_df, output_dir):
     plt.tight_layout()
     
     # 保存图像
-    output_path = os.path.join(output_dir, 'active_developers_trend.png')
+    output_path = os.path.join(output_dir, period_filename('active_developers_trend.png', granularity))
     plt.savefig(output_path, dpi=150, bbox_inches='tight', transparent=False, facecolor='white')
     plt.close()
     
     print(f"    已保存: {output_path}")
 
-def generate_collaboration_trend(monthly_df, output_dir):
+def generate_collaboration_trend(monthly_df, output_dir, granularity=DEFAULT_GRANULARITY):
     """
     生成合作次数与强度趋势图
     """
     # 确保数据按时间排序
-    monthly_df = monthly_df.sort_values('year_month')
+    monthly_df = monthly_df.sort_values(time_key(granularity))
     
     # 绘制图形
     fig, ax1 = plt.subplots(figsize=(12, 6), dpi=150)
     
     # 绘制合作次数曲线
-    ax1.plot(monthly_df['year_month'], monthly_df['num_collaborations'], 
+    ax1.plot(monthly_df[time_key(granularity)], monthly_df['num_collaborations'], 
              marker='o', linestyle='-', linewidth=2, markersize=6, color='#667eea', alpha=0.8, label='合作次数')
-    ax1.set_xlabel('月份', fontsize=12, labelpad=10)
+    ax1.set_xlabel(AXIS_LABELS[granularity], fontsize=12, labelpad=10)
     ax1.set_ylabel('合作次数', fontsize=12, labelpad=10, color='#667eea')
     ax1.tick_params(axis='y', labelcolor='#667eea')
     ax1.grid(True, alpha=0.3, linestyle='--')
@@ -132,7 +144,7 @@ def generate_collaboration_trend(monthly_df, output_dir):
     ax2 = ax1.twinx()
     
     # 绘制平均合作强度曲线
-    ax2.plot(monthly_df['year_month'], monthly_df['avg_collab_weight'], 
+    ax2.plot(monthly_df[time_key(granularity)], monthly_df['avg_collab_weight'], 
              marker='s', linestyle='--', linewidth=2, markersize=6, color='#ff7f50', alpha=0.8, label='平均合作强度')
     ax2.set_ylabel('平均合作强度', fontsize=12, labelpad=10, color='#ff7f50')
     ax2.tick_params(axis='y', labelcolor='#ff7f50')
@@ -150,26 +162,26 @@ def generate_collaboration_trend(monthly_df, output_dir):
     plt.tight_layout()
     
     # 保存图像
-    output_path = os.path.join(output_dir, 'collaboration_trend.png')
+    output_path = os.path.join(output_dir, period_filename('collaboration_trend.png', granularity))
     plt.savefig(output_path, dpi=150, bbox_inches='tight', transparent=False, facecolor='white')
     plt.close()
     
     print(f"    已保存: {output_path}")
 
-def generate_community_evolution(community_monthly_df, output_dir):
+def generate_community_evolution(community_monthly_df, output_dir, granularity=DEFAULT_GRANULARITY):
     """
     生成社区数量与规模演化图
     """
     # 确保数据按时间排序
-    community_monthly_df = community_monthly_df.sort_values('year_month')
+    community_monthly_df = community_monthly_df.sort_values(time_key(granularity))
     
     # 绘制图形
     fig, ax1 = plt.subplots(figsize=(12, 6), dpi=150)
     
     # 绘制社区数量曲线
-    ax1.plot(community_monthly_df['year_month'], community_monthly_df['num_communities'], 
+    ax1.plot(community_monthly_df[time_key(granularity)], community_monthly_df['num_communities'], 
              marker='o', linestyle='-', linewidth=2, markersize=6, color='#667eea', alpha=0.8, label='社区数量')
-    ax1.set_xlabel('月份', fontsize=12, labelpad=10)
+    ax1.set_xlabel(AXIS_LABELS[granularity], fontsize=12, labelpad=10)
     ax1.set_ylabel('社区数量', fontsize=12, labelpad=10, color='#667eea')
     ax1.tick_params(axis='y', labelcolor='#667eea')
     ax1.grid(True, alpha=0.3, linestyle='--')
@@ -178,7 +190,7 @@ def generate_community_evolution(community_monthly_df, output_dir):
     ax2 = ax1.twinx()
     
     # 绘制平均社区规模曲线
-    ax2.plot(community_monthly_df['year_month'], community_monthly_df['avg_community_size'], 
+    ax2.plot(community_monthly_df[time_key(granularity)], community_monthly_df['avg_community_size'], 
              marker='s', linestyle='--', linewidth=2, markersize=6, color='#ff7f50', alpha=0.8, label='平均社区规模')
     ax2.set_ylabel('平均社区规模', fontsize=12, labelpad=10, color='#ff7f50')
     ax2.tick_params(axis='y', labelcolor='#ff7f50')
@@ -196,40 +208,40 @@ def generate_community_evolution(community_monthly_df, output_dir):
     plt.tight_layout()
     
     # 保存图像
-    output_path = os.path.join(output_dir, 'community_evolution.png')
+    output_path = os.path.join(output_dir, period_filename('community_evolution.png', granularity))
     plt.savefig(output_path, dpi=150, bbox_inches='tight', transparent=False, facecolor='white')
     plt.close()
     
     print(f"    已保存: {output_path}")
 
-def generate_network_health_trend(community_monthly_df, output_dir):
+def generate_network_health_trend(community_monthly_df, output_dir, granularity=DEFAULT_GRANULARITY):
     """
     生成网络健康指标趋势图
     """
     # 确保数据按时间排序
-    community_monthly_df = community_monthly_df.sort_values('year_month')
+    community_monthly_df = community_monthly_df.sort_values(time_key(granularity))
     
     # 绘制图形
     fig, (ax1, ax2, ax3) = plt.subplots(3, 1, figsize=(12, 12), dpi=150, sharex=True)
     
     # 1. 绘制网络密度
-    ax1.plot(community_monthly_df['year_month'], community_monthly_df['network_density'], 
+    ax1.plot(community_monthly_df[time_key(granularity)], community_monthly_df['network_density'], 
              marker='o', linestyle='-', linewidth=2, markersize=6, color='#667eea', alpha=0.8)
     ax1.set_ylabel('网络密度', fontsize=12, labelpad=10)
     ax1.set_title('网络密度', fontsize=14, fontweight='bold', pad=10)
     ax1.grid(True, alpha=0.3, linestyle='--')
     
     # 2. 绘制平均聚类系数
-    ax2.plot(community_monthly_df['year_month'], community_monthly_df['avg_clustering_coefficient'], 
+    ax2.plot(community_monthly_df[time_key(granularity)], community_monthly_df['avg_clustering_coefficient'], 
              marker='s', linestyle='--', linewidth=2, markersize=6, color='#ff7f50', alpha=0.8)
     ax2.set_ylabel('平均聚类系数', fontsize=12, labelpad=10)
     ax2.set_title('平均聚类系数', fontsize=14, fontweight='bold', pad=10)
     ax2.grid(True, alpha=0.3, linestyle='--')
     
     # 3. 绘制连通分量数
-    ax3.plot(community_monthly_df['year_month'], community_monthly_df['num_connected_components'], 
+    ax3.plot(community_monthly_df[time_key(granularity)], community_monthly_df['num_connected_components'], 
              marker='^', linestyle='-.', linewidth=2, markersize=6, color='#2ecc71', alpha=0.8)
-    ax3.set_xlabel('月份', fontsize=12, labelpad=10)
+    ax3.set_xlabel(AXIS_LABELS[granularity], fontsize=12, labelpad=10)
     ax3.set_ylabel('连通分量数', fontsize=12, labelpad=10)
     ax3.set_title('连通分量数', fontsize=14, fontweight='bold', pad=10)
     ax3.grid(True, alpha=0.3, linestyle='--')
@@ -244,7 +256,7 @@ def generate_network_health_trend(community_monthly_df, output_dir):
     fig.suptitle('网络健康指标趋势', fontsize=18, fontweight='bold', y=0.98)
     
     # 保存图像
-    output_path = os.path.join(output_dir, 'network_health_trend.png')
+    output_path = os.path.join(output_dir, period_filename('network_health_trend.png', granularity))
     plt.savefig(output_path, dpi=150, bbox_inches='tight', transparent=False, facecolor='white')
     plt.close()
     
@@ -399,4 +411,7 @@ def generate_analysis_file(output_dir):
     print(f"    已保存: {output_path}")
 
 if __name__ == "__main__":
-    generate_time_evolution_visualizations()
+    parser = argparse.ArgumentParser(description="生成时间演化可视化图")
+    parser.add_argument('--granularity', choices=GRANULARITIES, default=DEFAULT_GRANULARITY, help="时间粒度")
+    args = parser.parse_args()
+    generate_time_evolution_visualizations(granularity=args.granularity)
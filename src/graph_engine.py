@@ -1,43 +1,299 @@
-"""图计算引擎适配器"""
+"""
+图计算引擎适配器
 
+后端在注册表中登记（名称、加载函数、能力集合、优先级），GraphEngine在第一次真正使用时
+才导入所选后端，因此导入本模块不会加载EasyGraph/NetworkX，也不会产生输出；
+每个后端的导入耗时记录在 backend_import_times() 中
+
+backend='auto'且存在基准报告（见benchmark_engine.py / cost_model.py）时，
+PageRank、度中心性、社区检测、介数中心性按代价模型逐次选择后端，
+图按需转换为所选后端的表示，并按源图对象缓存转换结果
+"""
+
+import time
 import warnings
+import weakref
+import numpy as np
 import pandas as pd
 
+from edge_consolidation import consolidate_frame
+
+
+class _Backend:
+    """注册表中的一个后端"""
+
+    def __init__(self, name, loader, display_name=None, capabilities=(), priority=0):
+        self.name = name
+        self.loader = loader
+        self.display_name = display_name or name
+        self.capabilities = frozenset(capabilities)
+        self.priority = priority
+
+
+_BACKENDS = {}
+_LOADED = {}
+_LOAD_ERRORS = {}
+_IMPORT_TIMES = {}
+
+# 所有内置后端都支持的操作
+BASE_CAPABILITIES = ('pagerank', 'degree_centrality', 'community_detection', 'betweenness', 'closeness')
+
+
+def register_backend(name, loader, display_name=None, capabilities=BASE_CAPABILITIES, priority=0):
+    """
+    注册图计算后端
+
+    参数:
+        loader: 无参函数，导入并返回后端模块（需提供DiGraph/Graph/pagerank/degree_centrality等接口）
+        capabilities: 后端支持的能力，GraphEngine(requires=...)据此筛选
+        priority: backend='auto'时按优先级从高到低尝试
+    """
+    _BACKENDS[name] = _Backend(name, loader, display_name, capabilities, priority)
+    _LOADED.pop(name, None)
+    _LOAD_ERRORS.pop(name, None)
+
+
+def available_backends(requires=()):
+    """按优先级排列的已注册后端名称，只包含具备requires中全部能力的后端"""
+    required = set(requires)
+    specs = sorted(_BACKENDS.values(), key=lambda spec: -spec.priority)
+    return [spec.name for spec in specs if required <= spec.capabilities]
+
+
+def load_backend(name):
+    """导入后端模块（只导入一次），记录导入耗时；导入失败时抛出ImportError"""
+    if name in _LOADED:
+        return _LOADED[name]
+    if name in _LOAD_ERRORS:
+        raise _LOAD_ERRORS[name]
+    if name not in _BACKENDS:
+        raise KeyError(f"未注册的图引擎: {name}，可选 {available_backends()}")
+    start = time.perf_counter()
+    try:
+        module = _BACKENDS[name].loader()
+    except ImportError as e:
+        _LOAD_ERRORS[name] = e
+        raise
+    finally:
+        _IMPORT_TIMES[name] = time.perf_counter() - start
+    _LOADED[name] = module
+    return module
+
+
+def backend_import_times():
+    """{后端名称: 导入耗时(秒)}，只包含已尝试导入的后端"""
+    return dict(_IMPORT_TIMES)
+
+
+def _load_sparse():
+    # CSR稀疏矩阵后端，只依赖NumPy
+    import sparse_graph
+    return sparse_graph
+
+
+def _load_easygraph():
+    import easygraph as eg
+    return eg
+
+
+def _load_easygraph_c():
+    import easygraph as eg
+    from easygraph_c import EasyGraphC
+    return EasyGraphC(eg)
+
+
+def _load_networkx():
+    import networkx as nx
+    return nx
+
+
+register_backend('easygraph', _load_easygraph, 'EasyGraph', priority=30)
+register_backend('networkx', _load_networkx, 'NetworkX', priority=20)
+register_backend('sparse', _load_sparse, 'Sparse', BASE_CAPABILITIES + ('csr', 'pagerank_series'), priority=10)
+# 编译版封装尚未与networkx参考结果做一致性校验，auto模式下排在最后（实际上只会在显式指定
+# backend='easygraph-c'、或校准报告中该后端结果一致且代价模型选中它时使用）
+register_backend('easygraph-c', _load_easygraph_c, 'EasyGraphC', BASE_CAPABILITIES + ('compiled',), priority=0)
+
+
+def _representation(G):
+    """图对象所属的后端；CSR快照可零拷贝转为稀疏图，视为sparse"""
+    if hasattr(G, 'indptr') or type(G).__name__ == 'SparseGraph':
+        return 'sparse'
+    if getattr(G, 'cflag', 0):
+        return 'easygraph-c'
+    return type(G).__module__.split('.')[0]
+
+
+def _attribute_dicts(table, attrs, mask=None):
+    """按列取出属性，返回每行一个的属性dict列表；没有属性列时返回None"""
+    if not attrs:
+        return None
+    if not isinstance(attrs, dict):
+        attrs = {column: column for column in attrs}
+    names = list(attrs)
+    columns = []
+    for column in attrs.values():
+        values = np.asarray(table[column])
+        columns.append((values if mask is None else values[mask]).tolist())
+    return [dict(zip(names, row)) for row in zip(*columns)]
+
+
+def _graph_size(G):
+    if hasattr(G, 'indptr'):
+        return G.num_nodes, G.num_edges
+    return G.number_of_nodes(), G.number_of_edges()
+
+
+_EASYGRAPH_ENGINES = ('EasyGraph', 'EasyGraphC')
+
+# 源图对象 -> {后端名称: (源图规模, 转换后的图)}；源图被回收后缓存随之释放
+_CONVERSIONS = weakref.WeakKeyDictionary()
+
+
 class GraphEngine:
+    """
+    参数:
+        backend: 后端名称，或'auto'（按优先级选择第一个能加载的后端）
+        requires: 后端必须具备的能力，如 ('csr',)
+        dispatch: backend='auto'时是否按代价模型逐次选择后端
+        cost_report: 校准代价模型的基准报告路径，默认 data/engine_benchmark.json
+    """
     
-    def __init__(self, backend='auto'):
+    def __init__(self, backend='auto', requires=(), dispatch=True, cost_report=None):
         self.backend = backend
-        self.engine = None
-        self._init_engine()
+        self.requires = tuple(requires)
+        self.dispatch = dispatch
+        self.cost_report = cost_report
+        self.last_dispatch = None
+        self._engine = None
+        self._engine_name = None
+        self._backend_name = None
+        self._cost_model = None
+        self._delegates = {}
+
+    @property
+    def engine(self):
+        if self._engine is None:
+            self._init_engine()
+        return self._engine
+
+    @property
+    def engine_name(self):
+        if self._engine is None:
+            self._init_engine()
+        return self._engine_name
         
     def _init_engine(self):
-        if self.backend == 'easygraph' or self.backend == 'auto':
+        if self.backend != 'auto':
+            spec = _BACKENDS.get(self.backend)
+            if spec is None:
+                raise RuntimeError(f"未注册的图引擎: {self.backend}，可选 {available_backends()}")
+            missing = set(self.requires) - spec.capabilities
+            if missing:
+                raise RuntimeError(f"图引擎 {spec.display_name} 不支持: {sorted(missing)}")
             try:
-                import easygraph as eg
-                self.engine = eg
-                self.engine_name = 'EasyGraph'
-                print(f"成功加载 {self.engine_name}")
-                return
+                self._engine = load_backend(spec.name)
             except ImportError as e:
-                print(f"EasyGraph 加载失败: {e}")
-                if self.backend == 'easygraph':
-                    raise RuntimeError("指定使用EasyGraph但加载失败")
+                raise RuntimeError(f"指定使用{spec.display_name}但加载失败: {e}")
+            self._engine_name = spec.display_name
+            self._backend_name = spec.name
+            print(f"成功加载 {self._engine_name}（导入耗时 {_IMPORT_TIMES[spec.name]:.3f}s）")
+            return
         
-        # 回退
-        try:
-            import networkx as nx
-            self.engine = nx
-            self.engine_name = 'NetworkX'
-            
-            if not hasattr(self.engine, 'DiGraph'):
-                self.engine.DiGraph = nx.DiGraph
-            if not hasattr(self.engine, 'Graph'):
-                self.engine.Graph = nx.Graph
-                
-            print(f"使用备用引擎: {self.engine_name}")
-        except ImportError as e:
-            raise RuntimeError(f"所有图引擎加载失败: {e}")
+        # 按优先级依次尝试，失败则回退到下一个
+        errors = []
+        for name in available_backends(self.requires):
+            try:
+                self._engine = load_backend(name)
+            except ImportError as e:
+                print(f"{_BACKENDS[name].display_name} 加载失败: {e}")
+                errors.append(f"{name}: {e}")
+                continue
+            self._engine_name = _BACKENDS[name].display_name
+            self._backend_name = name
+            print(f"使用图引擎: {self._engine_name}（导入耗时 {_IMPORT_TIMES[name]:.3f}s）")
+            return
+        raise RuntimeError(f"所有图引擎加载失败: {'; '.join(errors) or '没有满足能力要求的后端'}")
     
+    def _get_cost_model(self):
+        if self._cost_model is None:
+            from cost_model import CostModel
+            # 没有报告时记为False，不再重复查找
+            self._cost_model = CostModel.load(self.cost_report) or False
+        return self._cost_model or None
+
+    def _dispatch(self, operation, G):
+        """
+        按代价模型为本次调用选择后端
+
+        返回:
+            (执行的引擎, 转换后的图)；非auto模式或没有校准数据时为 (self, G)
+        """
+        if self.backend != 'auto' or not self.dispatch:
+            return self, G
+        model = self._get_cost_model()
+        if model is None:
+            return self, G
+        # 只考虑有该操作校准数据、且未曾导入失败的后端；此时不导入任何后端
+        candidates = [name for name in available_backends(self.requires)
+                      if (name, operation) in model.fits and name not in _LOAD_ERRORS]
+        num_nodes, num_edges = _graph_size(G)
+        current = _representation(G)
+        choice, estimates = model.choose(operation, num_nodes, num_edges, candidates, current)
+        if choice is None:
+            return self, G
+        # 只导入选中的后端，导入失败时按估计耗时依次尝试下一个
+        for choice in sorted(estimates, key=estimates.get):
+            try:
+                load_backend(choice)
+                break
+            except ImportError:
+                continue
+        else:
+            return self, G
+        self.last_dispatch = {'operation': operation, 'backend': choice, 'num_nodes': num_nodes,
+                              'num_edges': num_edges, 'estimates': estimates}
+        if choice not in self._delegates:
+            self._delegates[choice] = GraphEngine(backend=choice)
+        engine = self._delegates[choice]
+        return engine, engine.convert(G)
+
+    def convert(self, G):
+        """
+        把图转换为当前后端的表示，已是该表示时原样返回
+        转换结果按源图对象缓存；源图的节点数或边数变化后重新转换
+        """
+        import sparse_graph
+        if self._engine is None:
+            self._init_engine()
+        target = self._backend_name
+        if _representation(G) == target:
+            return G
+        size = _graph_size(G)
+        try:
+            cached = _CONVERSIONS.get(G, {}).get(target)
+        except TypeError:
+            cached = None
+        if cached is not None and cached[0] == size:
+            return cached[1]
+        if hasattr(G, 'indptr') and target != 'sparse':
+            converted = self.from_snapshot(G)
+        else:
+            S = sparse_graph.as_sparse(G)
+            if target == 'sparse':
+                converted = S
+            elif self.engine_name == 'EasyGraphC':
+                converted = self.engine.build(S.nodes(), S.edges(data=True), directed=S.directed)
+            else:
+                converted = self.create_graph(directed=S.directed)
+                converted.add_nodes_from(S.nodes())
+                converted.add_weighted_edges_from(S.edges(data=True))
+        try:
+            _CONVERSIONS.setdefault(G, {})[target] = (size, converted)
+        except TypeError:
+            pass
+        return converted
+
     def create_graph(self, directed=True):
         """创建图对象"""
         if directed:
@@ -45,9 +301,105 @@ class GraphEngine:
         else:
             return self.engine.Graph()
     
+    def from_snapshot(self, snapshot, directed=True):
+        """
+        由CSR快照（graph_snapshot.CSRSnapshot）构建当前引擎的图对象
+        节点与边从数组整批添加，不逐行遍历DataFrame
+        """
+        if self.engine_name == 'Sparse':
+            return self.engine.SparseGraph.from_snapshot(snapshot, directed=directed)
+        if self.engine_name == 'EasyGraphC':
+            # C++图整批添加节点与带权边
+            source_ids, target_ids, weights = snapshot.edge_list()
+            return self.engine.build(snapshot.nodes.tolist(),
+                                     zip(source_ids.tolist(), target_ids.tolist(), weights.tolist()), directed)
+        G = self.create_graph(directed=directed)
+        G.add_nodes_from(snapshot.nodes.tolist())
+        source_ids, target_ids, weights = snapshot.edge_list()
+        G.add_edges_from((u, v, {'weight': w}) for u, v, w in
+                         zip(source_ids.tolist(), target_ids.tolist(), weights.tolist()))
+        return G
+
+    def build_from_frame(self, edges, nodes=None, source='source', target='target', weight='weight',
+                         node_id='developer_id', node_attrs=None, edge_attrs=None, drop_unknown=True,
+                         directed=True, weight_agg=None):
+        """
+        由边表与节点表（DataFrame或 {列名: 数组}）整批构建当前引擎的图对象，不逐行遍历
+
+        参数:
+            edges: 边表，包含source/target列；没有weight列时权重为1
+            nodes: 节点表，包含node_id列；None时节点为边中出现的ID
+            node_attrs: 作为节点属性的列，列表或 {属性名: 列名}；默认为节点表中除node_id外的全部列
+            edge_attrs: 权重之外作为边属性的列，列表或 {属性名: 列名}
+            drop_unknown: 丢弃端点不在节点表中的边
+            directed: 是否构建有向图
+            weight_agg: 先把重复的 (source, target) 合并为一条边（无向图不区分方向），
+                        边权取 'sum'/'count'/'max'/'first'/'last'；合并结果中的count、weight_max、
+                        first_seen、last_seen等列可通过edge_attrs作为边属性。
+                        None时不合并，重复的边以最后一条为准
+
+        稀疏后端与EasyGraph C++图只保存权重，节点属性与其他边属性不保存
+        """
+        if weight_agg is not None:
+            edges = consolidate_frame(edges if isinstance(edges, pd.DataFrame) else pd.DataFrame(edges),
+                                      directed=directed, weight_agg=weight_agg,
+                                      source=source, target=target, weight=weight)
+        source_ids = np.asarray(edges[source])
+        target_ids = np.asarray(edges[target])
+        weights = (np.asarray(edges[weight], dtype=np.float64) if weight in edges
+                   else np.ones(len(source_ids)))
+        node_ids = None if nodes is None else np.asarray(nodes[node_id])
+        if node_ids is not None and drop_unknown:
+            known = np.isin(source_ids, node_ids) & np.isin(target_ids, node_ids)
+            source_ids, target_ids, weights = source_ids[known], target_ids[known], weights[known]
+        else:
+            known = None
+
+        if self.engine_name == 'Sparse':
+            return self.engine.SparseGraph.from_arrays(source_ids, target_ids, weights, nodes=node_ids,
+                                                       directed=directed)
+        if node_ids is None:
+            node_ids = pd.unique(np.concatenate([source_ids, target_ids]))
+        if self.engine_name == 'EasyGraphC':
+            return self.engine.build(node_ids.tolist(),
+                                     zip(source_ids.tolist(), target_ids.tolist(), weights.tolist()), directed)
+
+        G = self.create_graph(directed=directed)
+        if nodes is not None:
+            if node_attrs is None:
+                node_attrs = [column for column in nodes.keys() if column != node_id]
+            node_data = _attribute_dicts(nodes, node_attrs)
+            G.add_nodes_from(zip(node_ids.tolist(), node_data) if node_data else node_ids.tolist())
+        else:
+            G.add_nodes_from(node_ids.tolist())
+        edge_data = _attribute_dicts(edges, edge_attrs, known)
+        if edge_data:
+            for data, w in zip(edge_data, weights.tolist()):
+                data['weight'] = w
+        else:
+            edge_data = ({'weight': w} for w in weights.tolist())
+        G.add_edges_from(zip(source_ids.tolist(), target_ids.tolist(), edge_data))
+        return G
+
     def add_community_detection(self, G):
         """添加社区检测功能"""
-        if self.engine_name == 'EasyGraph':
+        engine, G = self._dispatch('community_detection', G)
+        if engine is not self:
+            return engine.add_community_detection(G)
+        if self.engine_name == 'Sparse':
+            # 对称化后的CSR邻接作为社区检测输入；python-louvain只接受networkx图，整批转换一次
+            G_undir = self.engine.as_sparse(G).to_undirected()
+            try:
+                import community as community_louvain
+            except ImportError:
+                warnings.warn("未安装python-louvain,使用简单的连通组件作为社区")
+                return self.engine.connected_components(G_undir)
+            partition = community_louvain.best_partition(G_undir.to_networkx())
+            communities_dict = {}
+            for node, comm_id in partition.items():
+                communities_dict.setdefault(comm_id, []).append(node)
+            return list(communities_dict.values())
+        elif self.engine_name in _EASYGRAPH_ENGINES:
             # EasyGraph 内置社区检测
             return self.engine.louvain(G.to_undirected()) if hasattr(G, 'to_undirected') else self.engine.louvain(G)
         else:
@@ -71,26 +423,183 @@ class GraphEngine:
     
     def calculate_pagerank(self, G, alpha=0.85):
         """计算PageRank"""
-        if self.engine_name == 'EasyGraph':
+        engine, G = self._dispatch('pagerank', G)
+        if engine is not self:
+            return engine.calculate_pagerank(G, alpha=alpha)
+        if self.engine_name == 'Sparse':
+            return self.engine.pagerank(G, alpha=alpha)
+        elif self.engine_name in _EASYGRAPH_ENGINES:
             return self.engine.pagerank(G, alpha=alpha)
         else:
             return self.engine.pagerank(G, alpha=alpha)
     
+    def calculate_pagerank_series(self, snapshots, alpha=0.85, warm_start=True, return_info=False):
+        """
+        批量计算时序快照的PageRank，得到 月份 × 开发者 的得分矩阵（用于趋势图）
+        快照本身就是CSR数组，因此无论使用哪个后端都在稀疏后端上向量化计算
+
+        参数:
+            snapshots: [(year_month, CSRSnapshot或图对象), ...]，按时间顺序
+            warm_start: 每个月以上个月收敛后的得分为初始向量
+            return_info: 同时返回每月迭代次数等信息
+
+        返回:
+            DataFrame，行为year_month，列为developer_id，当月不活跃的开发者为NaN
+        """
+        import sparse_graph
+        months = [month for month, _ in snapshots]
+        graphs = [sparse_graph.as_sparse(G) for _, G in snapshots]
+        scores, iterations = sparse_graph.pagerank_series(graphs, alpha=alpha, warm_start=warm_start)
+        
+        all_labels = sparse_graph.unique_sorted(np.concatenate([G.labels() for G in graphs])) if graphs else np.zeros(0)
+        matrix = np.full((len(graphs), len(all_labels)), np.nan)
+        for i, (G, x) in enumerate(zip(graphs, scores)):
+            matrix[i, sparse_graph.encode(G.labels(), all_labels)] = x
+        scores_df = pd.DataFrame(matrix, index=pd.Index(months, name='year_month'), columns=all_labels)
+        if return_info:
+            return scores_df, {'warm_start': warm_start, 'iterations': dict(zip(months, iterations)),
+                               'total_iterations': int(sum(iterations))}
+        return scores_df
+
+    def dynamic_pagerank(self, G=None, alpha=0.85, tol=1.0e-6):
+        """
+        创建可增量维护的PageRank（dynamic_pagerank.DynamicPageRank）
+        之后的边插入、删除与权重更新只在局部推送残差，recompute()可从头重算以作核对
+        """
+        from dynamic_pagerank import DynamicPageRank
+        return DynamicPageRank(G, alpha=alpha, tol=tol)
+
     def calculate_degree_centrality(self, G):
         """计算度中心性"""
-        if self.engine_name == 'EasyGraph':
+        engine, G = self._dispatch('degree_centrality', G)
+        if engine is not self:
+            return engine.calculate_degree_centrality(G)
+        if self.engine_name == 'Sparse':
+            return self.engine.degree_centrality(G)
+        elif self.engine_name in _EASYGRAPH_ENGINES:
             return self.engine.degree_centrality(G)
         else:
             return self.engine.degree_centrality(G)
-    
+
+    def calculate_betweenness_centrality(self, G, mode='exact', k=256, epsilon=0.05, delta=0.1, seed=None,
+                                         workers=None, return_info=False):
+        """
+        计算介数中心性
+
+        参数:
+            mode: 'exact' 精确计算；'sampled' 抽取k个源点；
+                  'rk' 按(epsilon, delta)保证抽样节点对；'auto' 节点数不超过k时精确，否则按k个源点抽样
+            workers: 精确计算的进程数，None为CPU核数；节点数不足betweenness.PARALLEL_MIN_NODES时串行
+            return_info: 同时返回 {'mode': 实际使用的模式, 'samples': 源点数或节点对数, ...}
+        """
+        import betweenness
+        engine, G = self._dispatch('betweenness', G)
+        if engine is not self:
+            return engine.calculate_betweenness_centrality(G, mode=mode, k=k, epsilon=epsilon, delta=delta, seed=seed,
+                                                           workers=workers, return_info=return_info)
+        n = _graph_size(G)[0]
+        if mode == 'auto':
+            mode = 'exact' if n <= k else 'sampled'
+        workers = self._centrality_workers(n, workers)
+        if mode == 'exact' and workers > 1:
+            # 按源点划分到进程池，各进程累计部分依赖度后归约
+            result = betweenness.shortest_path_centrality(G, closeness=False, workers=workers)['betweenness']
+            info = {'mode': 'exact', 'samples': n, 'workers': workers}
+        elif self.engine_name == 'NetworkX' and mode in ('exact', 'sampled'):
+            sampled = mode == 'sampled' and k < n
+            result = self.engine.betweenness_centrality(G, k=k if sampled else None, seed=seed)
+            info = {'mode': 'sampled', 'samples': k} if sampled else {'mode': 'exact', 'samples': n}
+        elif self.engine_name in _EASYGRAPH_ENGINES and mode == 'exact':
+            result = self.engine.betweenness_centrality(G)
+            info = {'mode': 'exact', 'samples': n}
+        else:
+            result, info = betweenness.betweenness_centrality(G, mode=mode, k=k, epsilon=epsilon, delta=delta,
+                                                              seed=seed, return_info=True)
+        return (result, info) if return_info else result
+
+    def calculate_closeness_centrality(self, G, workers=None):
+        """计算接近中心性（有向图按入向距离，与networkx一致），大图按源点划分到进程池"""
+        import betweenness
+        workers = self._centrality_workers(_graph_size(G)[0], workers)
+        if self.engine_name == 'EasyGraphC':
+            # C++实现
+            return self.engine.closeness_centrality(G)
+        elif self.engine_name == 'Sparse' or workers > 1:
+            return betweenness.closeness_centrality(G, workers=workers)
+        elif self.engine_name in _EASYGRAPH_ENGINES:
+            return self.engine.closeness_centrality(G)
+        else:
+            return self.engine.closeness_centrality(G)
+
+    def calculate_shortest_paths(self, G, sources=None, weight='weight'):
+        """
+        带权最短路径长度（Dijkstra）
+
+        返回:
+            {源点: {节点: 距离}}，sources为None时为全部节点
+        """
+        if self.engine_name in _EASYGRAPH_ENGINES:
+            sources = list(G.nodes) if sources is None else list(sources)
+            return {source: self.engine.Dijkstra(G, source, weight=weight) for source in sources}
+        G_nx = self._as_networkx(G)
+        sources = list(G_nx.nodes) if sources is None else list(sources)
+        import networkx as nx
+        return {source: nx.single_source_dijkstra_path_length(G_nx, source, weight=weight) for source in sources}
+
+    def calculate_clustering(self, G, weight=None):
+        """聚类系数 {节点: 值}"""
+        if self.engine_name in _EASYGRAPH_ENGINES:
+            return self.engine.clustering(G, weight=weight)
+        import networkx as nx
+        return nx.clustering(self._as_networkx(G), weight=weight)
+
+    def calculate_structural_holes(self, G, weight=None, workers=None):
+        """
+        结构洞指标
+
+        返回:
+            {'constraint': {...}, 'effective_size': {...}, 'hierarchy': {...}}；
+            NetworkX/稀疏后端没有hierarchy，只返回前两项
+        """
+        if self.engine_name in _EASYGRAPH_ENGINES:
+            from easygraph_c import MULTI_WORKER_ROUTINES
+            results = {}
+            for name in ('constraint', 'effective_size', 'hierarchy'):
+                kwargs = {'weight': weight}
+                if workers and workers > 1 and name in MULTI_WORKER_ROUTINES:
+                    kwargs['n_workers'] = workers
+                results[name] = getattr(self.engine, name)(G, **kwargs)
+            return results
+        import networkx as nx
+        G_nx = self._as_networkx(G)
+        return {'constraint': nx.constraint(G_nx, weight=weight),
+                'effective_size': nx.effective_size(G_nx, weight=weight)}
+
+    def _as_networkx(self, G):
+        """NetworkX/稀疏后端没有的算法借用networkx实现"""
+        if self.engine_name == 'Sparse':
+            return self.engine.as_sparse(G).to_networkx()
+        return G
+
+    @staticmethod
+    def _centrality_workers(n, workers):
+        """最短路径类中心性实际使用的进程数"""
+        import os
+        import betweenness
+        if n < betweenness.PARALLEL_MIN_NODES:
+            return 1
+        return workers or os.cpu_count() or 1
+
     def get_info(self):
         """获取引擎信息"""
+        engine = self.engine
         return {
             'backend': self.engine_name,
-            'version': self.engine.__version__ if hasattr(self.engine, '__version__') else '未知'
+            'version': engine.__version__ if hasattr(engine, '__version__') else '未知',
+            'import_time': _IMPORT_TIMES.get(self._backend_name)
         }
 
-# 全局默认引擎实例
+# 全局默认引擎实例（首次使用时才加载后端）
 default_engine = GraphEngine(backend='auto')
 
 def test_engine():
@@ -99,7 +608,7 @@ def test_engine():
     print("测试图计算引擎...")
     engine = GraphEngine()
     info = engine.get_info()
-    print(f"当前使用引擎: {info['backend']} (版本: {info['version']})")
+    print(f"当前使用引擎: {info['backend']} (版本: {info['version']}, 导入耗时: {info['import_time']:.3f}s)")
     
     # 创建更复杂的测试图
     G = engine.create_graph(directed=True)
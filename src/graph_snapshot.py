@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+月度协作网络的CSR快照
+目录结构: data/graph_snapshots/year_month=YYYY-MM/{indptr,indices,weights,nodes}.npy + meta.json
+- nodes: 升序的developer_id，节点编号即其下标
+- indptr/indices/weights: 按源节点压缩的出边（CSR），每行内按目标节点升序
+快照以np.load(mmap_mode='r')零拷贝加载，多个进程读取同一快照时共享页缓存
+
+用法:
+    python graph_snapshot.py              # 为全部月份分区生成/更新快照
+    python graph_snapshot.py 2026-09      # 只处理指定月份
+"""
+
+import json
+import os
+import shutil
+import sys
+
+import numpy as np
+
+from edge_store import DEFAULT_PARTITION_DIR, list_partitions, load_collaborations, read_partitions
+from edge_consolidation import DEFAULT_WEIGHT_AGG, aggregate_weight, consolidate_edges
+from sparse_graph import encode, unique_sorted
+
+PROJECT_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_SNAPSHOT_DIR = os.path.join(PROJECT_PATH, 'data', 'graph_snapshots')
+
+SNAPSHOT_ARRAYS = ['indptr', 'indices', 'weights', 'nodes']
+
+
+class CSRSnapshot:
+    """
+    有向加权图的CSR表示
+
+    属性:
+        nodes: 节点编号 -> developer_id
+        indptr: 节点i的出边位于 indices[indptr[i]:indptr[i+1]]
+        indices: 出边的目标节点编号
+        weights: 出边权重
+        path: 从磁盘加载时的快照目录（用于跨进程传递时按路径重新映射）
+    """
+
+    def __init__(self, indptr, indices, weights, nodes, year_month=None, path=None):
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+        self.nodes = nodes
+        self.year_month = year_month
+        self.path = path
+
+    def __reduce__(self):
+        # 已落盘的快照在进程间只传递路径，由接收方重新映射，避免复制数组
+        if self.path is not None:
+            return load_snapshot_dir, (self.path,)
+        return CSRSnapshot, (self.indptr, self.indices, self.weights, self.nodes, self.year_month)
+
+    @property
+    def num_nodes(self):
+        return len(self.nodes)
+
+    @property
+    def num_edges(self):
+        return len(self.indices)
+
+    def index_of(self, developer_ids):
+        """developer_id数组 -> 节点编号数组，不在图中的为-1"""
+        developer_ids = np.asarray(developer_ids, dtype=np.int64)
+        if self.num_nodes == 0:
+            return np.full(len(developer_ids), -1, dtype=np.int64)
+        positions = np.searchsorted(self.nodes, developer_ids).clip(max=self.num_nodes - 1)
+        return np.where(self.nodes[positions] == developer_ids, positions, -1)
+
+    def sources(self):
+        """每条边的源节点编号"""
+        return np.repeat(np.arange(self.num_nodes, dtype=np.int64), np.diff(self.indptr))
+
+    def out_degree(self):
+        return np.diff(self.indptr)
+
+    def in_degree(self):
+        return np.bincount(self.indices, minlength=self.num_nodes)
+
+    def edge_list(self):
+        """(source_id, target_id, weight) 三个数组"""
+        return self.nodes[self.sources()], self.nodes[self.indices], self.weights
+
+    def to_networkx(self, directed=True):
+        """构建networkx图（整批添加节点与边，不逐行遍历DataFrame）"""
+        import networkx as nx
+        G = nx.DiGraph() if directed else nx.Graph()
+        G.add_nodes_from(self.nodes.tolist())
+        source_ids, target_ids, weights = self.edge_list()
+        G.add_weighted_edges_from(zip(source_ids.tolist(), target_ids.tolist(), weights.tolist()))
+        return G
+
+
+def build_snapshot(source, target, weight, nodes=None, year_month=None, weight_agg=DEFAULT_WEIGHT_AGG,
+                   timestamp=None):
+    """
+    由边数组构建CSR快照，重复的(source, target)合并为一条边（见edge_consolidation）
+
+    参数:
+        nodes: 额外包含的节点（如没有协作的开发者），默认只包含出现在边中的节点
+        weight_agg: 合并后的边权：'sum'（协作总强度，默认）、'count'、'max'、'first'、'last'；
+                    'last'即旧的保留最后一条（与DiGraph.add_edge的覆盖语义一致）
+        timestamp: 事件时间，用于确定'first'/'last'，None时按输入顺序
+    """
+    source = np.asarray(source, dtype=np.int64)
+    target = np.asarray(target, dtype=np.int64)
+    weight = np.asarray(weight, dtype=np.float64)
+    all_nodes = np.concatenate([source, target] + ([np.asarray(nodes, dtype=np.int64)] if nodes is not None else []))
+    node_ids = unique_sorted(all_nodes)
+    n = len(node_ids)
+
+    # 合并结果按(source, target)升序，正好是CSR所需的行内有序
+    consolidated = consolidate_edges(source, target, weight, timestamp=timestamp)
+    row = encode(consolidated['source'], node_ids)
+    col = encode(consolidated['target'], node_ids)
+
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(row, minlength=n), out=indptr[1:])
+    return CSRSnapshot(indptr, col.astype(np.int64), aggregate_weight(consolidated, weight_agg), node_ids, year_month)
+
+
+def snapshot_from_frame(edges_df, nodes=None, year_month=None, weight_agg=DEFAULT_WEIGHT_AGG):
+    """由包含source/target/weight列（可选timestamp列）的DataFrame构建快照"""
+    timestamp = edges_df['timestamp'].to_numpy() if 'timestamp' in edges_df.columns else None
+    return build_snapshot(edges_df['source'].to_numpy(), edges_df['target'].to_numpy(),
+                          edges_df['weight'].to_numpy(), nodes=nodes, year_month=year_month,
+                          weight_agg=weight_agg, timestamp=timestamp)
+
+
+def _snapshot_dir(root, year_month):
+    return os.path.join(root, f'year_month={year_month}')
+
+
+def write_snapshot(snapshot, year_month, root=None, source_signature=None):
+    """写入快照目录（先写临时目录再整体替换）"""
+    root = root or DEFAULT_SNAPSHOT_DIR
+    path = _snapshot_dir(root, year_month)
+    tmp_path = f'{path}.tmp'
+    if os.path.isdir(tmp_path):
+        shutil.rmtree(tmp_path)
+    os.makedirs(tmp_path)
+    for name in SNAPSHOT_ARRAYS:
+        np.save(os.path.join(tmp_path, f'{name}.npy'), np.ascontiguousarray(getattr(snapshot, name)))
+    with open(os.path.join(tmp_path, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump({'year_month': year_month, 'num_nodes': snapshot.num_nodes, 'num_edges': snapshot.num_edges,
+                   'source_signature': source_signature}, f, ensure_ascii=False, indent=2)
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_snapshot_dir(path, mmap=True):
+    with open(os.path.join(path, 'meta.json'), encoding='utf-8') as f:
+        meta = json.load(f)
+    arrays = {name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r' if mmap else None)
+              for name in SNAPSHOT_ARRAYS}
+    return CSRSnapshot(year_month=meta['year_month'], path=path, **arrays)
+
+
+def load_snapshot(year_month, root=None, mmap=True):
+    """加载某个月的快照，默认内存映射（只读、零拷贝）"""
+    return load_snapshot_dir(_snapshot_dir(root or DEFAULT_SNAPSHOT_DIR, year_month), mmap=mmap)
+
+
+def list_snapshots(root=None):
+    root = root or DEFAULT_SNAPSHOT_DIR
+    if not os.path.isdir(root):
+        return []
+    return sorted(name.split('=', 1)[1] for name in os.listdir(root)
+                  if name.startswith('year_month=') and not name.endswith('.tmp'))
+
+
+def _partition_signature(partition_root, year_month):
+    """分区文件的名称、大小与修改时间，用于判断快照是否过期"""
+    part_dir = os.path.join(partition_root, f'year_month={year_month}')
+    return [[name, os.stat(os.path.join(part_dir, name)).st_size, os.stat(os.path.join(part_dir, name)).st_mtime_ns]
+            for name in sorted(os.listdir(part_dir)) if not name.endswith('.tmp')]
+
+
+def ensure_snapshots(months=None, root=None, partition_root=None, weight_agg=DEFAULT_WEIGHT_AGG):
+    """
+    为月份分区生成快照，只重建分区或边权合并方式有变化的月份
+
+    返回:
+        重建的月份列表
+    """
+    root = root or DEFAULT_SNAPSHOT_DIR
+    partition_root = partition_root or DEFAULT_PARTITION_DIR
+    rebuilt = []
+    if months is None:
+        # 删除分区已不存在的月份的快照
+        partitions = set(list_partitions(partition_root))
+        for year_month in list_snapshots(root):
+            if year_month not in partitions:
+                shutil.rmtree(_snapshot_dir(root, year_month))
+    for year_month in (list_partitions(partition_root) if months is None else months):
+        signature = {'files': _partition_signature(partition_root, year_month), 'weight_agg': weight_agg}
+        meta_path = os.path.join(_snapshot_dir(root, year_month), 'meta.json')
+        if os.path.exists(meta_path):
+            with open(meta_path, encoding='utf-8') as f:
+                if json.load(f).get('source_signature') == signature:
+                    continue
+        edges_df = read_partitions(partition_root, months=[year_month],
+                                   columns=['source', 'target', 'weight', 'timestamp'])
+        write_snapshot(snapshot_from_frame(edges_df, year_month=year_month, weight_agg=weight_agg),
+                       year_month, root, signature)
+        rebuilt.append(year_month)
+    return rebuilt
+
+
+def monthly_snapshots(months=None, weight_agg=DEFAULT_WEIGHT_AGG):
+    """
+    按时间顺序返回 [(year_month, CSRSnapshot), ...]
+    有月份分区时使用（并按需更新）磁盘上的内存映射快照，否则由collaborations_temporal.csv在内存中构建
+    同一个月内同一对开发者的多次协作按weight_agg合并为一条边
+    """
+    if list_partitions():
+        ensure_snapshots(months, weight_agg=weight_agg)
+        return [(year_month, load_snapshot(year_month))
+                for year_month in (list_partitions() if months is None else months)]
+    collab_df = load_collaborations(columns=['source', 'target', 'weight', 'timestamp', 'year_month'], months=months)
+    return [(year_month, snapshot_from_frame(month_df, year_month=year_month, weight_agg=weight_agg))
+            for year_month, month_df in collab_df.groupby('year_month', sort=True)]
+
+
+if __name__ == "__main__":
+    months = sys.argv[1:] or None
+    rebuilt = ensure_snapshots(months)
+    print(f"快照目录: {DEFAULT_SNAPSHOT_DIR}")
+    print(f"重建 {len(rebuilt)} 个月份快照: {rebuilt}")
+    for year_month in list_snapshots():
+        snapshot = load_snapshot(year_month)
+        print(f"   {year_month}: {snapshot.num_nodes} 个节点, {snapshot.num_edges} 条边")
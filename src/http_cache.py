@@ -0,0 +1,247 @@
+"""
+HTTP响应磁盘缓存
+响应体按内容哈希压缩存储，索引记录ETag/Last-Modified等响应头，支持TTL、LRU容量上限与离线回放
+环境变量:
+    OPENSAGA_HTTP_CACHE: 缓存目录，默认 data/.http_cache
+    OPENSAGA_CACHE_TTL: 缓存新鲜期（秒），默认3600
+    OPENSAGA_OFFLINE: 设为1时只读缓存，不访问网络
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+PROJECT_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CACHE_DIR = os.path.join(PROJECT_PATH, 'data', '.http_cache')
+
+# 不需要缓存的逐请求响应头
+_VOLATILE_HEADERS = {'date', 'set-cookie', 'x-ratelimit-remaining', 'x-ratelimit-reset',
+                     'x-ratelimit-used', 'x-github-request-id'}
+
+
+class CachedHeaders(dict):
+    """大小写不敏感的响应头字典（键统一存为小写）"""
+
+    def __init__(self, items=()):
+        super().__init__((k.lower(), v) for k, v in dict(items).items())
+
+    def __getitem__(self, name):
+        return super().__getitem__(name.lower())
+
+    def __contains__(self, name):
+        return super().__contains__(name.lower())
+
+    def get(self, name, default=None):
+        return super().get(name.lower(), default)
+
+
+class CacheMissError(RuntimeError):
+    """离线模式下请求的URL不在缓存中"""
+
+
+class ResponseCache:
+    """
+    内容寻址的HTTP响应缓存
+    命中路径只读索引；条目的最近访问时间（LRU淘汰依据）在内存中累积后批量写回
+
+    参数:
+        cache_dir: 缓存目录
+        ttl: 新鲜期（秒），新鲜期内直接命中，过期后发送条件请求重新验证
+        max_bytes: 压缩后响应体总大小上限，超出时按最近访问时间淘汰
+        offline: 离线回放模式，只读缓存
+    """
+
+    ACCESS_FLUSH_SIZE = 256
+
+    def __init__(self, cache_dir=None, ttl=3600, max_bytes=512 * 1024 * 1024, offline=False):
+        self.cache_dir = cache_dir or DEFAULT_CACHE_DIR
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.stats = {'hits': 0, 'revalidated': 0, 'stored': 0, 'evicted': 0}
+        # 命中时只在内存中记录访问时间，随下一次写事务（或每ACCESS_FLUSH_SIZE次命中）批量写回
+        self._accessed = {}
+        os.makedirs(os.path.join(self.cache_dir, 'objects'), exist_ok=True)
+        self._db = sqlite3.connect(os.path.join(self.cache_dir, 'index.sqlite'), timeout=30)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                url TEXT,
+                headers TEXT,
+                body_hash TEXT,
+                size INTEGER,
+                stored_at REAL,
+                accessed_at REAL
+            )
+        """)
+        self._db.commit()
+
+    @classmethod
+    def from_env(cls):
+        """按环境变量构建缓存实例"""
+        return cls(
+            cache_dir=os.environ.get('OPENSAGA_HTTP_CACHE'),
+            ttl=float(os.environ.get('OPENSAGA_CACHE_TTL', 3600)),
+            offline=os.environ.get('OPENSAGA_OFFLINE') == '1'
+        )
+
+    @staticmethod
+    def _key(url):
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+    def _object_path(self, body_hash):
+        return os.path.join(self.cache_dir, 'objects', body_hash[:2], f'{body_hash}.gz')
+
+    def lookup(self, url):
+        """
+        查找缓存条目（只读，不更新访问时间），返回 {'headers', 'body_hash', 'stored_at'} 或 None
+        """
+        row = self._db.execute(
+            "SELECT headers, body_hash, stored_at FROM entries WHERE key = ?", (self._key(url),)
+        ).fetchone()
+        if row is None or not os.path.exists(self._object_path(row[1])):
+            return None
+        return {'headers': CachedHeaders(json.loads(row[0])), 'body_hash': row[1], 'stored_at': row[2]}
+
+    def _touch(self, url):
+        """记录条目被使用的时间，累积到一定数量后批量写回"""
+        self._accessed[self._key(url)] = time.time()
+        if len(self._accessed) >= self.ACCESS_FLUSH_SIZE:
+            self._flush_accessed()
+            self._db.commit()
+
+    def _flush_accessed(self):
+        """把累积的访问时间写入当前事务（由调用方提交）"""
+        if self._accessed:
+            self._db.executemany("UPDATE entries SET accessed_at = ? WHERE key = ?",
+                                 [(accessed_at, key) for key, accessed_at in self._accessed.items()])
+            self._accessed.clear()
+
+    def is_fresh(self, entry):
+        return time.time() - entry['stored_at'] < self.ttl
+
+    @staticmethod
+    def conditional_headers(entry):
+        """根据缓存的ETag/Last-Modified构造条件请求头"""
+        headers = {}
+        cached = entry['headers']
+        if 'ETag' in cached:
+            headers['If-None-Match'] = cached['ETag']
+        if 'Last-Modified' in cached:
+            headers['If-Modified-Since'] = cached['Last-Modified']
+        return headers
+
+    def load_body(self, entry):
+        with gzip.open(self._object_path(entry['body_hash']), 'rb') as f:
+            return f.read()
+
+    def check(self, url):
+        """
+        一次查找同时给出可直接使用的缓存与用于条件请求的条目
+
+        返回:
+            ((body, headers), entry)：新鲜或离线模式下命中；
+            (None, entry)：需要请求网络，entry为过期条目（可发送条件请求）或None
+        离线模式下未命中抛出CacheMissError
+        """
+        entry = self.lookup(url)
+        if entry is not None and (self.offline or self.is_fresh(entry)):
+            self.stats['hits'] += 1
+            self._touch(url)
+            return (self.load_body(entry), entry['headers']), entry
+        if self.offline:
+            raise CacheMissError(f"离线模式下缓存未命中: {url}")
+        return None, entry
+
+    def get(self, url):
+        """
+        读取可直接使用的缓存（新鲜或离线模式），返回 (body, headers) 或 None
+        离线模式下未命中抛出CacheMissError
+        """
+        return self.check(url)[0]
+
+    def store(self, url, body, headers):
+        """写入响应体与响应头，相同内容的响应体只保存一份"""
+        body_hash = hashlib.sha256(body).hexdigest()
+        path = self._object_path(body_hash)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f'{path}.{os.getpid()}.tmp'
+            with gzip.open(tmp_path, 'wb') as f:
+                f.write(body)
+            os.replace(tmp_path, path)
+        kept = {k.lower(): v for k, v in headers.items() if k.lower() not in _VOLATILE_HEADERS}
+        now = time.time()
+        self._db.execute(
+            "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (self._key(url), url, json.dumps(kept), body_hash, os.path.getsize(path), now, now)
+        )
+        self._flush_accessed()
+        self._db.commit()
+        self.stats['stored'] += 1
+        self._evict()
+
+    def revalidated(self, url, entry, headers=None):
+        """收到304后刷新条目的新鲜期，返回缓存的 (body, headers)"""
+        cached_headers = entry['headers']
+        if headers:
+            for name in ('etag', 'last-modified'):
+                if name in headers:
+                    cached_headers[name] = headers[name]
+        now = time.time()
+        self._db.execute(
+            "UPDATE entries SET headers = ?, stored_at = ?, accessed_at = ? WHERE key = ?",
+            (json.dumps(cached_headers), now, now, self._key(url))
+        )
+        self._accessed.pop(self._key(url), None)
+        self._flush_accessed()
+        self._db.commit()
+        self.stats['revalidated'] += 1
+        return self.load_body(entry), cached_headers
+
+    def _evict(self):
+        """按最近访问时间淘汰条目，直到总大小不超过上限"""
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._db.execute("SELECT key, body_hash, size FROM entries ORDER BY accessed_at").fetchall()
+        for key, body_hash, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size
+            self.stats['evicted'] += 1
+            # 响应体可能被多个URL共享，无引用时才删除文件
+            shared = self._db.execute("SELECT 1 FROM entries WHERE body_hash = ? LIMIT 1", (body_hash,)).fetchone()
+            if shared is None and os.path.exists(self._object_path(body_hash)):
+                os.remove(self._object_path(body_hash))
+        self._db.commit()
+
+    def close(self):
+        self._flush_accessed()
+        self._db.commit()
+        self._db.close()
+
+
+def cached_get_json(url, cache=None, timeout=30):
+    """
+    带缓存的同步GET请求，用于OpenDigger静态JSON等简单接口
+    """
+    import requests
+
+    cache = cache or ResponseCache.from_env()
+    cached, entry = cache.check(url)
+    if cached is not None:
+        return json.loads(cached[0])
+
+    request_headers = cache.conditional_headers(entry) if entry else {}
+    response = requests.get(url, headers=request_headers, timeout=timeout)
+    if response.status_code == 304 and entry is not None:
+        body, _ = cache.revalidated(url, entry, response.headers)
+        return json.loads(body)
+    response.raise_for_status()
+    cache.store(url, response.content, response.headers)
+    return response.json()
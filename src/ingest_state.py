@@ -0,0 +1,142 @@
+"""
+增量抓取状态：每个仓库的高水位（最后处理的updated_at）与分页检查点
+issues按updated_at升序分页抓取，每处理完一页先落盘暂存块、再推进检查点，
+进程中断后从检查点继续，而不是从头开始
+"""
+
+import asyncio
+import glob
+import json
+import os
+import time
+
+import pandas as pd
+
+from async_fetcher import AsyncFetcher
+
+PROJECT_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_STATE_DIR = os.path.join(PROJECT_PATH, 'data', '.ingest_state')
+
+
+class IngestState:
+    """
+    单个仓库的增量抓取状态，保存为 data/.ingest_state/{org}__{repo}.json
+
+    字段:
+        watermark: 上一次完整抓取处理到的最大updated_at
+        checkpoint: 未完成抓取的进度，包括
+            run_id: 本轮抓取的标识，用于命名写出的分区文件
+            run_watermark: 本轮开始时的高水位（用于判断记录是否为新增）
+            cursor: 已处理页中的最大updated_at，恢复时作为since参数
+            cursor_ids: updated_at等于cursor且已处理的记录id（恢复时跳过）
+            chunk_seq: 已确认落盘的暂存块序号
+    """
+
+    def __init__(self, org, repo, state_dir=None):
+        self.org = org
+        self.repo = repo
+        self.state_dir = state_dir or DEFAULT_STATE_DIR
+        self.path = os.path.join(self.state_dir, f'{org}__{repo}.json')
+        self.staging_dir = os.path.join(self.state_dir, f'{org}__{repo}.staging')
+        self.watermark = None
+        self.checkpoint = None
+        if os.path.exists(self.path):
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+            self.watermark = data.get('watermark')
+            self.checkpoint = data.get('checkpoint')
+
+    def save(self):
+        os.makedirs(self.state_dir, exist_ok=True)
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'watermark': self.watermark, 'checkpoint': self.checkpoint}, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def begin(self, default_since=None):
+        """开始（或恢复）一轮抓取，返回检查点"""
+        if self.checkpoint is None:
+            start = self.watermark or default_since
+            self.checkpoint = {'run_id': time.strftime('%Y%m%dT%H%M%S'), 'run_watermark': self.watermark,
+                               'cursor': start, 'cursor_ids': [], 'chunk_seq': 0}
+            self.save()
+        else:
+            # 删除写入后尚未被检查点确认的暂存块
+            for path in self.staged_chunks():
+                if _chunk_seq(path) > self.checkpoint['chunk_seq']:
+                    os.remove(path)
+            print(f"   从检查点恢复: cursor={self.checkpoint['cursor']}, 已确认 {self.checkpoint['chunk_seq']} 个暂存块")
+        return self.checkpoint
+
+    def stage_chunk(self, edges_df, cursor, cursor_ids):
+        """写入一个暂存块并推进检查点"""
+        os.makedirs(self.staging_dir, exist_ok=True)
+        seq = self.checkpoint['chunk_seq'] + 1
+        path = os.path.join(self.staging_dir, f'chunk-{seq:06d}.csv')
+        edges_df.to_csv(f'{path}.tmp', index=False)
+        os.replace(f'{path}.tmp', path)
+        self.checkpoint.update({'cursor': cursor, 'cursor_ids': cursor_ids, 'chunk_seq': seq})
+        self.save()
+
+    def staged_chunks(self):
+        return sorted(glob.glob(os.path.join(self.staging_dir, 'chunk-*.csv')))
+
+    def read_staged(self):
+        frames = [pd.read_csv(path) for path in self.staged_chunks()]
+        frames = [df for df in frames if not df.empty]
+        return pd.concat(frames, ignore_index=True) if frames else None
+
+    def commit(self):
+        """暂存数据已写入分区后调用：推进高水位并清理检查点"""
+        if self.checkpoint is not None and self.checkpoint['cursor']:
+            self.watermark = self.checkpoint['cursor']
+        self.checkpoint = None
+        self.save()
+        for path in self.staged_chunks():
+            os.remove(path)
+        if os.path.isdir(self.staging_dir):
+            os.rmdir(self.staging_dir)
+
+
+def _chunk_seq(path):
+    return int(os.path.basename(path)[len('chunk-'):-len('.csv')])
+
+
+def fetch_issues_incremental(state, page_to_edges, default_since=None, **fetcher_kwargs):
+    """
+    增量抓取仓库issues/PR，逐页转换为协作边并写入暂存块
+
+    参数:
+        state: IngestState
+        page_to_edges: 协程函数 (fetcher, issues, run_watermark) -> DataFrame，
+            run_watermark之前发生的交互应被忽略
+        default_since: 没有高水位时的起始时间（ISO字符串）
+        fetcher_kwargs: 透传给AsyncFetcher的参数
+
+    返回:
+        本轮（含恢复前已暂存部分）的全部新增协作边，无新增时返回None
+    """
+    checkpoint = state.begin(default_since)
+    params = {'state': 'all', 'sort': 'updated', 'direction': 'asc', 'per_page': 100}
+    if checkpoint['cursor']:
+        params['since'] = checkpoint['cursor']
+
+    async def _run():
+        async with AsyncFetcher(**fetcher_kwargs) as fetcher:
+            pages = 0
+            async for issues in fetcher.iter_pages(f'repos/{state.org}/{state.repo}/issues', params):
+                skip = set(checkpoint['cursor_ids'])
+                issues = [issue for issue in issues if issue['id'] not in skip]
+                if not issues:
+                    continue
+                cursor = max(issue['updated_at'] for issue in issues)
+                cursor_ids = [issue['id'] for issue in issues if issue['updated_at'] == cursor]
+                if cursor == checkpoint['cursor']:
+                    cursor_ids = sorted(skip.union(cursor_ids))
+                edges_df = await page_to_edges(fetcher, issues, checkpoint['run_watermark'])
+                state.stage_chunk(edges_df, cursor, cursor_ids)
+                pages += 1
+            print(f"   增量抓取 {pages} 页，共发出 {fetcher.stats['requests']} 个请求")
+
+    asyncio.run(_run())
+    return state.read_staged()
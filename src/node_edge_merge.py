@@ -17,10 +17,10 @@ def generate_bidirectional_collaboration_data():
     print("=" * 60)
     
     # 获取项目根目录
-project_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    project_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     
     # 定义文件路径
-node_csv_path = os.path.join(project_path, 'viz', 'for_viz_nodes.csv')
+    node_csv_path = os.path.join(project_path, 'viz', 'for_viz_nodes.csv')
     edge_csv_path = os.path.join(project_path, 'viz', 'for_viz_edges.csv')
     output_dir = os.path.join(project_path, 'data')
     output_csv_path = os.path.join(output_dir, '协作网络_合并表.csv')
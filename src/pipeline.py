@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""
+数据处理流水线（DAG）
+每个阶段声明调用的函数、参数、输入文件与输出文件，阶段间的依赖由“某阶段的输入是另一阶段的输出”推出。
+运行前对阶段的输入文件（目录则为其中全部文件）、参数和脚本源码计算指纹，
+与清单 data/.pipeline_manifest.json 中上次成功运行的指纹一致且输出文件未被改动时跳过该阶段；
+互不依赖的阶段在进程池中并行执行。
+
+文件摘要按 (大小, 修改时间) 缓存在清单中，未变化的文件不重复读取。
+数据获取（fetch_*.py、generate_temporal_data.py、batch_ingest.py）不在流水线内，
+其产出的 data/ 文件作为流水线的外部输入。阶段指纹包含阶段脚本及其（递归）导入的src下模块的源码，
+由静态扫描import/from语句得到，修改共用模块（如graph_engine.py）后依赖它的阶段会重新运行。
+
+用法:
+    python pipeline.py                          # 运行全部阶段（未变化的阶段跳过）
+    python pipeline.py viz_data --workers 4     # 只运行viz_data及其上游阶段
+    python pipeline.py --dry-run                # 只列出各阶段是否需要运行
+    python pipeline.py --force community_evolution
+"""
+
+import argparse
+import hashlib
+import importlib
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from time_buckets import DEFAULT_GRANULARITY, GRANULARITIES, period_filename
+
+PROJECT_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC_DIR = os.path.join(PROJECT_PATH, 'src')
+DATA_DIR = os.path.join(PROJECT_PATH, 'data')
+DEFAULT_MANIFEST = os.path.join(DATA_DIR, '.pipeline_manifest.json')
+
+# import a, b / from a import ... （含函数内的延迟导入）
+_IMPORT_PATTERN = re.compile(r'^\s*(?:from\s+(\w+)\s+import\b|import\s+([\w\s,.]+?)\s*(?:#.*)?$)', re.MULTILINE)
+
+
+class Stage:
+    """
+    流水线中的一个阶段
+
+    参数:
+        name: 阶段名
+        target: 'module:function'，module为src下的脚本名，在工作进程中导入后调用
+        inputs / outputs: 读取与写出的文件或目录（绝对路径或相对项目根目录的路径），
+                          不存在的输入也参与指纹（例如没有月份分区时的分区目录）
+        params: 传给函数的关键字参数（需可JSON序列化），参与指纹
+    """
+
+    def __init__(self, name, target, inputs=(), outputs=(), params=None):
+        self.name = name
+        self.target = target
+        self.inputs = [_relpath(path) for path in inputs]
+        self.outputs = [_relpath(path) for path in outputs]
+        self.params = dict(params or {})
+
+    @property
+    def module(self):
+        return self.target.split(':', 1)[0]
+
+    def __repr__(self):
+        return f"Stage({self.name!r}, {self.target!r})"
+
+
+def _relpath(path):
+    return os.path.relpath(os.path.join(PROJECT_PATH, path), PROJECT_PATH).replace(os.sep, '/')
+
+
+def _contains(parent, path):
+    return path == parent or path.startswith(parent + '/')
+
+
+def local_imports(module):
+    """module（src下的脚本名）递归导入的src下模块，含自身，按名称排序"""
+    found, pending = set(), [module]
+    while pending:
+        name = pending.pop()
+        path = os.path.join(SRC_DIR, f'{name}.py')
+        if name in found or not os.path.isfile(path):
+            continue
+        found.add(name)
+        with open(path, encoding='utf-8') as f:
+            source = f.read()
+        for from_name, import_names in _IMPORT_PATTERN.findall(source):
+            names = [from_name] if from_name else [
+                part.split()[0].split('.')[0] for part in import_names.split(',') if part.strip()]
+            pending.extend(names)
+    return sorted(found)
+
+
+def run_stage(target, params):
+    """进程池工作函数：导入并调用阶段函数，返回耗时（秒）"""
+    module_name, function_name = target.split(':', 1)
+    if SRC_DIR not in sys.path:
+        sys.path.insert(0, SRC_DIR)
+    start = time.perf_counter()
+    getattr(importlib.import_module(module_name), function_name)(**params)
+    return time.perf_counter() - start
+
+
+class FileDigests:
+    """
+    文件内容摘要（sha256），按 (大小, 修改时间) 缓存
+    目录的摘要由其中各文件的相对路径与摘要计算（跳过以.开头的隐藏文件与.tmp临时文件）
+    """
+
+    def __init__(self, cache=None):
+        self.cache = dict(cache or {})
+
+    def file(self, relpath):
+        path = os.path.join(PROJECT_PATH, relpath)
+        stat = os.stat(path)
+        cached = self.cache.get(relpath)
+        if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            return cached[2]
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        self.cache[relpath] = [stat.st_size, stat.st_mtime_ns, digest.hexdigest()]
+        return digest.hexdigest()
+
+    def path(self, relpath):
+        """文件或目录的摘要，不存在时为None"""
+        path = os.path.join(PROJECT_PATH, relpath)
+        if os.path.isfile(path):
+            return self.file(relpath)
+        if not os.path.isdir(path):
+            return None
+        digest = hashlib.sha256()
+        for root, dirs, files in os.walk(path):
+            dirs[:] = sorted(name for name in dirs if not name.startswith('.'))
+            for name in sorted(files):
+                if name.startswith('.') or name.endswith('.tmp'):
+                    continue
+                child = _relpath(os.path.join(root, name))
+                digest.update(f"{child[len(relpath) + 1:]}\0{self.file(child)}\n".encode('utf-8'))
+        return digest.hexdigest()
+
+
+class Pipeline:
+    """
+    参数:
+        stages: Stage列表，同一个文件只能由一个阶段输出
+        manifest_path: 清单文件路径
+    """
+
+    def __init__(self, stages, manifest_path=None):
+        self.stages = {stage.name: stage for stage in stages}
+        self.manifest_path = manifest_path or DEFAULT_MANIFEST
+        producers = {}
+        for stage in stages:
+            for output in stage.outputs:
+                if output in producers:
+                    raise ValueError(f"{output} 同时是阶段 {producers[output]} 和 {stage.name} 的输出")
+                producers[output] = stage.name
+        # 输入与某阶段的输出是同一路径、或位于其输出目录之下（或反之）时依赖该阶段
+        self.upstream = {
+            stage.name: {producer for output, producer in producers.items()
+                         if producer != stage.name and any(_contains(output, path) or _contains(path, output)
+                                                            for path in stage.inputs)}
+            for stage in stages
+        }
+        self.order = self._topological_order()
+        self.manifest = self._load_manifest()
+        self.digests = FileDigests(self.manifest.get('files'))
+
+    def _topological_order(self):
+        order, visiting, done = [], set(), set()
+
+        def visit(name):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"阶段依赖存在环: {name}")
+            visiting.add(name)
+            for upstream in sorted(self.upstream[name]):
+                visit(upstream)
+            visiting.discard(name)
+            done.add(name)
+            order.append(name)
+
+        for name in self.stages:
+            visit(name)
+        return order
+
+    def _load_manifest(self):
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, encoding='utf-8') as f:
+                return json.load(f)
+        return {'stages': {}, 'files': {}}
+
+    def save_manifest(self):
+        self.manifest['files'] = self.digests.cache
+        os.makedirs(os.path.dirname(self.manifest_path), exist_ok=True)
+        tmp_path = f'{self.manifest_path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def select(self, targets=None):
+        """targets及其全部上游阶段（按拓扑顺序），targets为None时为全部阶段"""
+        if targets is None:
+            return list(self.order)
+        unknown = [name for name in targets if name not in self.stages]
+        if unknown:
+            raise ValueError(f"未知的阶段: {unknown}，可选 {self.order}")
+        selected, pending = set(), list(targets)
+        while pending:
+            name = pending.pop()
+            if name not in selected:
+                selected.add(name)
+                pending.extend(self.upstream[name])
+        return [name for name in self.order if name in selected]
+
+    def fingerprint(self, name):
+        """阶段的指纹：调用目标、参数、阶段脚本及其导入的本地模块的源码、各输入的摘要"""
+        stage = self.stages[name]
+        payload = {
+            'target': stage.target,
+            'params': stage.params,
+            'code': {module: self.digests.path(f'src/{module}.py') for module in local_imports(stage.module)},
+            'inputs': {path: self.digests.path(path) for path in stage.inputs},
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def is_fresh(self, name, fingerprint):
+        """指纹与上次成功运行一致，且输出都存在、未被改动"""
+        record = self.manifest['stages'].get(name)
+        if not record or record['fingerprint'] != fingerprint:
+            return False
+        return all(self.digests.path(path) == digest for path, digest in record['outputs'].items())
+
+    def _record(self, name, fingerprint, seconds):
+        stage = self.stages[name]
+        missing = [path for path in stage.outputs if self.digests.path(path) is None]
+        if missing:
+            raise RuntimeError(f"阶段 {name} 没有生成输出: {missing}")
+        self.manifest['stages'][name] = {
+            'fingerprint': fingerprint,
+            'outputs': {path: self.digests.path(path) for path in stage.outputs},
+            'seconds': round(seconds, 3),
+            'finished_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        }
+        self.save_manifest()
+
+    def run(self, targets=None, workers=1, force=False, dry_run=False):
+        """
+        按依赖顺序运行阶段
+
+        参数:
+            targets: 要运行的阶段名（连同其上游），None为全部
+            workers: 并行运行的阶段数，None为全部CPU核；1时在当前进程中依次运行
+            force: True时不检查指纹，targets中的阶段一律重新运行（上游阶段仍按指纹判断）
+            dry_run: 只判断各阶段是否需要运行，不执行
+
+        返回:
+            {阶段名: 'skipped' | 'ran' | 'failed' | 'blocked' | 'pending'}
+        """
+        names = self.select(targets)
+        forced = set(names if targets is None else targets) if force else set()
+        workers = workers or os.cpu_count() or 1
+        status = {}
+        running = {}
+        fingerprints = {}
+        pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 and not dry_run else None
+        try:
+            while len(status) < len(names):
+                for name in names:
+                    if name in status or name in running.values():
+                        continue
+                    upstream = [status.get(up) for up in self.upstream[name] if up in names]
+                    if any(state in ('failed', 'blocked') for state in upstream):
+                        status[name] = 'blocked'
+                        print(f"[{name}] 上游阶段失败，跳过")
+                        continue
+                    if not all(state in ('skipped', 'ran', 'pending') for state in upstream):
+                        continue
+                    # dry-run时上游需要运行，则下游也需要运行
+                    fingerprints[name] = self.fingerprint(name)
+                    if 'pending' not in upstream and name not in forced and self.is_fresh(name, fingerprints[name]):
+                        status[name] = 'skipped'
+                        print(f"[{name}] 输入未变化，跳过")
+                    elif dry_run:
+                        status[name] = 'pending'
+                        print(f"[{name}] 需要运行")
+                    elif pool is None:
+                        print(f"[{name}] 开始运行")
+                        status[name] = self._finish(name, fingerprints[name], lambda: run_stage(
+                            self.stages[name].target, self.stages[name].params))
+                    else:
+                        print(f"[{name}] 开始运行")
+                        future = pool.submit(run_stage, self.stages[name].target, self.stages[name].params)
+                        running[future] = name
+                if running:
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        name = running.pop(future)
+                        status[name] = self._finish(name, fingerprints[name], future.result)
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=True)
+        return {name: status[name] for name in names}
+
+    def _finish(self, name, fingerprint, result):
+        try:
+            seconds = result()
+            self._record(name, fingerprint, seconds)
+        except BaseException as e:
+            if isinstance(e, KeyboardInterrupt):
+                raise
+            print(f"[{name}] 运行失败: {e!r}")
+            return 'failed'
+        print(f"[{name}] 完成，耗时 {seconds:.1f}s")
+        return 'ran'
+
+
+def default_stages(granularity=DEFAULT_GRANULARITY, betweenness_mode='auto'):
+    """
+    本项目的阶段定义
+
+    参数:
+        granularity: 社区演化、趋势数据与时间演化图使用的时间粒度；
+                     viz_data始终读取月度的社区演化明细，非月粒度时另有monthly_community_evolution阶段生成它
+    """
+    partitions = 'data/collaborations_temporal'
+    collaborations = [partitions, 'data/collaborations_temporal.csv']
+    developers = 'data/developers.csv'
+    latest_network = [partitions, 'data/latest_network.csv']
+    metrics = f"data/{period_filename('monthly_metrics.csv', granularity)}"
+    community_detail = f"data/{period_filename('community_evolution_detail.csv', granularity)}"
+    community_summary = f"data/{period_filename('community_evolution_monthly.csv', granularity)}"
+    monthly_community_detail = 'data/community_evolution_detail.csv'
+    time_evolution_graphs = [f'graph/{period_filename(name, granularity)}' for name in (
+        'active_developers_trend.png', 'collaboration_trend.png', 'community_evolution.png',
+        'network_health_trend.png')]
+    if granularity == 'month':
+        time_evolution_graphs.append('graph/time_evolution_analysis.md')
+
+    stages = [
+        Stage('community_evolution', 'generate_community_evolution:generate_community_evolution',
+              inputs=collaborations,
+              outputs=[community_detail, community_summary,
+                       f"viz/{period_filename('for_viz_community_monthly.csv', granularity)}"],
+              params={'granularity': granularity}),
+        Stage('viz_trends', 'generate_for_viz_trends:generate_for_viz_trends',
+              inputs=[metrics],
+              outputs=[f"viz/{period_filename('for_viz_trends.csv', granularity)}"],
+              params={'granularity': granularity}),
+        Stage('viz_data', 'generate_for_viz_data:generate_for_viz_data',
+              inputs=[developers, *collaborations, 'data/monthly_metrics.csv', 'data/latest_network.csv',
+                      monthly_community_detail],
+              outputs=['viz/for_viz_nodes.csv', 'viz/for_viz_pagerank_monthly.csv', 'viz/for_viz_communities.csv',
+                       'viz/for_viz_core_developers.csv'],
+              params={'betweenness_mode': betweenness_mode, 'include_trends': False}),
+        Stage('full_year_edges', 'generate_full_year_edges:generate_full_year_edges',
+              inputs=[developers, *collaborations],
+              outputs=['viz/for_viz_edges.csv']),
+        Stage('merged_edges', 'node_edge_merge:generate_bidirectional_collaboration_data',
+              inputs=['viz/for_viz_nodes.csv', 'viz/for_viz_edges.csv'],
+              outputs=['viz/协作网络_合并表.csv']),
+        Stage('network_graphs', 'generate_network_visualizations:generate_network_visualizations',
+              inputs=[developers, *latest_network, 'viz/for_viz_nodes.csv'],
+              outputs=['graph/developer_collaboration_graph.png', 'graph/core_developer_influence_graph.png',
+                       'graph/tech_stack_collaboration_graph.png']),
+        Stage('time_evolution_graphs', 'generate_time_evolution_visualizations:generate_time_evolution_visualizations',
+              inputs=[metrics, community_summary],
+              outputs=time_evolution_graphs,
+              params={'granularity': granularity}),
+    ]
+    if granularity != 'month':
+        # viz_data读取的月度社区演化明细由单独的月粒度阶段生成，保证其是最新的且viz_data排在其后
+        stages.insert(1, Stage(
+            'monthly_community_evolution', 'generate_community_evolution:generate_community_evolution',
+            inputs=collaborations,
+            outputs=[monthly_community_detail, 'data/community_evolution_monthly.csv',
+                     'viz/for_viz_community_monthly.csv'],
+            params={'granularity': 'month'}))
+    return stages
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="运行数据处理流水线，跳过输入未变化的阶段")
+    parser.add_argument('stages', nargs='*', help="要运行的阶段（连同其上游），默认全部")
+    parser.add_argument('--workers', type=int, default=1, help="并行运行的阶段数，0为全部CPU核")
+    parser.add_argument('--force', action='store_true', help="忽略指纹，重新运行指定的阶段")
+    parser.add_argument('--dry-run', action='store_true', help="只列出需要运行的阶段")
+    parser.add_argument('--granularity', choices=GRANULARITIES, default=DEFAULT_GRANULARITY, help="时间粒度")
+    parser.add_argument('--betweenness', default='auto', help="viz_data的介数中心性计算模式")
+    args = parser.parse_args()
+
+    pipeline = Pipeline(default_stages(args.granularity, args.betweenness))
+    status = pipeline.run(args.stages or None, workers=args.workers or None, force=args.force,
+                          dry_run=args.dry_run)
+    print("\n" + "=" * 60)
+    for name, state in status.items():
+        print(f"   {name:<28} {state}")
+    print("=" * 60)
+    sys.exit(1 if any(state in ('failed', 'blocked') for state in status.values()) else 0)
@@ -0,0 +1,434 @@
+"""
+基于CSR邻接数组的图后端（GraphEngine的backend='sparse'）
+图以 indptr/indices/weights 三个NumPy数组保存，PageRank、度中心性、连通分量
+均为整批向量运算，不为每个节点/边创建Python对象；结果格式与NetworkX一致（dict / list）
+"""
+
+import numpy as np
+
+
+class SparseGraph:
+    """
+    CSR存储的加权图，提供与networkx相同的常用建图接口
+
+    无向图的每条边在CSR中按两个方向各存一次；重复添加的边覆盖旧的权重
+    批量数据建议用from_arrays/from_snapshot构建，避免逐条添加
+    """
+
+    def __init__(self, directed=True):
+        self.directed = directed
+        self._labels = []
+        self._index = None
+        self._pending = []
+        self._csr = (np.zeros(1, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float64))
+
+    @classmethod
+    def from_arrays(cls, source, target, weight=None, nodes=None, directed=True):
+        """由边数组构建，节点编号按节点升序排列"""
+        source = np.asarray(source)
+        target = np.asarray(target)
+        weight = np.ones(len(source)) if weight is None else np.asarray(weight, dtype=np.float64)
+        labels = unique_sorted(np.concatenate([source, target] + ([np.asarray(nodes)] if nodes is not None else [])))
+        G = cls(directed=directed)
+        G._labels = labels
+        rows = encode(source, labels)
+        cols = encode(target, labels)
+        G._csr = _build_csr(len(labels), rows, cols, weight, directed)
+        return G
+
+    @classmethod
+    def from_snapshot(cls, snapshot, directed=True):
+        """由CSR快照构建；有向图直接引用快照数组（内存映射时零拷贝）"""
+        G = cls(directed=directed)
+        G._labels = snapshot.nodes
+        if directed:
+            G._csr = (snapshot.indptr, snapshot.indices, snapshot.weights)
+        else:
+            rows = np.repeat(np.arange(len(snapshot.nodes), dtype=np.int64), np.diff(snapshot.indptr))
+            G._csr = _build_csr(len(snapshot.nodes), rows, np.asarray(snapshot.indices),
+                                np.asarray(snapshot.weights), directed=False)
+        return G
+
+    @classmethod
+    def from_networkx(cls, G, weight='weight'):
+        labels = list(G.nodes())
+        index = {node: i for i, node in enumerate(labels)}
+        edges = list(G.edges(data=weight, default=1.0))
+        H = cls(directed=G.is_directed())
+        H._labels = labels
+        H._index = index
+        if edges:
+            rows = np.fromiter((index[u] for u, _, _ in edges), dtype=np.int64, count=len(edges))
+            cols = np.fromiter((index[v] for _, v, _ in edges), dtype=np.int64, count=len(edges))
+            weights = np.fromiter((w for _, _, w in edges), dtype=np.float64, count=len(edges))
+            H._csr = _build_csr(len(labels), rows, cols, weights, H.directed)
+        else:
+            H._csr = (np.zeros(len(labels) + 1, dtype=np.int64), H._csr[1], H._csr[2])
+        return H
+
+    # ---- 建图接口（与networkx一致） ----
+
+    def _node_index(self):
+        if self._index is None:
+            labels = self._labels.tolist() if isinstance(self._labels, np.ndarray) else self._labels
+            self._labels = list(labels)
+            self._index = {node: i for i, node in enumerate(self._labels)}
+        return self._index
+
+    def add_node(self, node, **attr):
+        index = self._node_index()
+        if node not in index:
+            index[node] = len(self._labels)
+            self._labels.append(node)
+        return index[node]
+
+    def add_nodes_from(self, nodes):
+        for node in nodes:
+            self.add_node(node[0] if isinstance(node, tuple) else node)
+
+    def add_edge(self, u, v, weight=1.0, **attr):
+        self._pending.append((self.add_node(u), self.add_node(v), weight))
+
+    def add_edges_from(self, ebunch, **attr):
+        default = attr.get('weight', 1.0)
+        for edge in ebunch:
+            weight = edge[2].get('weight', default) if len(edge) > 2 else default
+            self.add_edge(edge[0], edge[1], weight=weight)
+
+    def add_weighted_edges_from(self, ebunch, weight='weight'):
+        for u, v, w in ebunch:
+            self.add_edge(u, v, weight=w)
+
+    def csr(self):
+        """返回 (indptr, indices, weights)，先合并逐条添加的边"""
+        n = len(self._labels)
+        indptr, indices, weights = self._csr
+        if self._pending or len(indptr) != n + 1:
+            rows = np.repeat(np.arange(len(indptr) - 1, dtype=np.int64), np.diff(indptr))
+            new = np.array(self._pending, dtype=np.float64).reshape(-1, 3)
+            new_rows, new_cols = new[:, 0].astype(np.int64), new[:, 1].astype(np.int64)
+            if not self.directed:
+                # 已有的CSR已经是对称的，只需要对新边补上反向
+                new_rows, new_cols = np.concatenate([new_rows, new_cols]), np.concatenate([new_cols, new_rows])
+                new = np.concatenate([new, new])
+            self._csr = _build_csr(n, np.concatenate([rows, new_rows]), np.concatenate([indices, new_cols]),
+                                   np.concatenate([weights, new[:, 2]]), directed=True)
+            self._pending = []
+        return self._csr
+
+    def nodes(self):
+        return list(self._labels)
+
+    def labels(self):
+        """节点编号 -> 节点（数组）"""
+        return np.asarray(self._labels) if not isinstance(self._labels, np.ndarray) else self._labels
+
+    def __len__(self):
+        return len(self._labels)
+
+    def __contains__(self, node):
+        return node in self._node_index()
+
+    def __iter__(self):
+        return iter(self.nodes())
+
+    def number_of_nodes(self):
+        return len(self._labels)
+
+    def number_of_edges(self):
+        indptr, indices, _ = self.csr()
+        if self.directed:
+            return len(indices)
+        rows = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+        return int((rows <= indices).sum())
+
+    def is_directed(self):
+        return self.directed
+
+    def edges(self, data=False):
+        indptr, indices, weights = self.csr()
+        rows = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+        keep = slice(None) if self.directed else rows <= indices
+        labels = self.labels()
+        u, v, w = labels[rows[keep]].tolist(), labels[indices[keep]].tolist(), weights[keep].tolist()
+        return list(zip(u, v, w)) if data else list(zip(u, v))
+
+    def to_undirected(self):
+        if not self.directed:
+            return self
+        indptr, indices, weights = self.csr()
+        G = SparseGraph(directed=False)
+        G._labels = self._labels
+        G._index = self._index
+        rows = np.repeat(np.arange(len(indptr) - 1, dtype=np.int64), np.diff(indptr))
+        G._csr = _build_csr(len(self._labels), rows, indices, weights, directed=False)
+        return G
+
+    def to_networkx(self):
+        """转换为networkx图（整批添加，用于python-louvain等只接受networkx的算法）"""
+        import networkx as nx
+        G = nx.DiGraph() if self.directed else nx.Graph()
+        G.add_nodes_from(self.nodes())
+        G.add_weighted_edges_from(self.edges(data=True))
+        return G
+
+
+def unique_sorted(values):
+    """升序去重（整数数组上比np.unique快）"""
+    values = np.sort(values)
+    if len(values) == 0:
+        return values
+    keep = np.empty(len(values), dtype=bool)
+    keep[0] = True
+    np.not_equal(values[1:], values[:-1], out=keep[1:])
+    return values[keep]
+
+
+def encode(values, labels):
+    """把节点映射为在升序labels中的编号；节点为较稠密的非负整数时直接查表"""
+    values = np.asarray(values)
+    if len(labels) and labels.dtype.kind in 'iu' and labels[0] >= 0 and labels[-1] < 4 * len(labels) + 1024:
+        lookup = np.full(int(labels[-1]) + 1, -1, dtype=np.int64)
+        lookup[labels] = np.arange(len(labels))
+        return lookup[values]
+    return np.searchsorted(labels, values)
+
+
+def last_unique(key):
+    """按key升序返回下标，相同的key只保留最后出现的一个"""
+    order = np.argsort(key, kind='stable')
+    if len(order) == 0:
+        return order
+    sorted_key = key[order]
+    last = np.empty(len(order), dtype=bool)
+    last[-1] = True
+    np.not_equal(sorted_key[1:], sorted_key[:-1], out=last[:-1])
+    return order[last]
+
+
+def _build_csr(n, rows, cols, weights, directed=True):
+    """
+    由坐标三元组构建CSR，重复的(row, col)保留最后一条；
+    无向图先补上反向边，同一对节点的两个方向取输入中最后出现的权重（由有向CSR转换时即按行优先顺序）
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    cols = np.asarray(cols, dtype=np.int64)
+    weights = np.asarray(weights, dtype=np.float64)
+    if not directed:
+        lo, hi = np.minimum(rows, cols), np.maximum(rows, cols)
+        keep = last_unique(lo * max(n, 1) + hi)
+        lo, hi, weights = lo[keep], hi[keep], weights[keep]
+        loops = lo == hi
+        rows = np.concatenate([lo, hi[~loops]])
+        cols = np.concatenate([hi, lo[~loops]])
+        weights = np.concatenate([weights, weights[~loops]])
+    keep = last_unique(rows * max(n, 1) + cols)
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows[keep], minlength=n), out=indptr[1:])
+    return indptr, cols[keep], weights[keep]
+
+
+def as_sparse(G):
+    """把networkx图、CSR快照或SparseGraph统一转换为SparseGraph"""
+    if isinstance(G, SparseGraph):
+        return G
+    if hasattr(G, 'indptr') and hasattr(G, 'nodes'):
+        return SparseGraph.from_snapshot(G)
+    return SparseGraph.from_networkx(G)
+
+
+def DiGraph():
+    return SparseGraph(directed=True)
+
+
+def Graph():
+    return SparseGraph(directed=False)
+
+
+class _PageRankOperator:
+    """PageRank迭代算子 x -> alpha * (P^T x + 悬挂质量 * p) + (1 - alpha) * p"""
+
+    def __init__(self, G, alpha=0.85, personalization=None):
+        indptr, indices, weights = G.csr()
+        self.n = n = len(indptr) - 1
+        self.alpha = alpha
+        self.indices = indices
+        self.rows = np.repeat(np.arange(n, dtype=np.int64), np.diff(indptr))
+        out_weight = np.bincount(self.rows, weights=weights, minlength=n)
+        # 出边权重之和为0的节点（含只有权重为0的出边）按悬挂节点处理，与networkx一致
+        self.transition = np.divide(weights, out_weight[self.rows], out=np.zeros(len(weights)),
+                                    where=out_weight[self.rows] > 0)
+        self.dangling = out_weight <= 0
+        self.p = np.full(n, 1.0 / n) if personalization is None else \
+            np.asarray(personalization, dtype=np.float64) / np.sum(personalization)
+
+    def __call__(self, x):
+        y = self.alpha * np.bincount(self.indices, weights=x[self.rows] * self.transition, minlength=self.n)
+        y += (self.alpha * x[self.dangling].sum() + (1.0 - self.alpha)) * self.p
+        return y
+
+
+def pagerank_vector(G, alpha=0.85, max_iter=100, tol=1.0e-6, start=None, personalization=None):
+    """
+    向量化幂迭代PageRank，语义与networkx.pagerank一致
+    （出边权重归一化；悬挂节点的得分按personalization分配）
+
+    参数:
+        start: 初始向量（按节点编号），默认均匀分布
+        personalization: 按节点编号的个性化向量，默认均匀分布
+
+    返回:
+        (得分数组, 迭代次数)
+    """
+    n = len(G)
+    if n == 0:
+        return np.zeros(0), 0
+    step = _PageRankOperator(G, alpha, personalization)
+    x = np.full(n, 1.0 / n) if start is None else np.asarray(start, dtype=np.float64) / np.sum(start)
+    for iteration in range(1, max_iter + 1):
+        x_last = x
+        x = step(x_last)
+        if np.abs(x - x_last).sum() < n * tol:
+            return x, iteration
+    raise RuntimeError(f"PageRank在{max_iter}次迭代内未收敛")
+
+
+def pagerank(G, alpha=0.85, max_iter=100, tol=1.0e-6):
+    """返回 {节点: PageRank得分}"""
+    G = as_sparse(G)
+    x, _ = pagerank_vector(G, alpha=alpha, max_iter=max_iter, tol=tol)
+    return dict(zip(G.labels().tolist(), x.tolist()))
+
+
+def _pagerank_batch(graphs, alpha=0.85, max_iter=100, tol=1.0e-6):
+    """
+    把多个图拼成一个分块对角矩阵，所有图在同一组向量运算中同时迭代；
+    每个分块按自己的节点数判断收敛，已收敛的分块不再更新
+    """
+    sizes = np.array([len(G) for G in graphs], dtype=np.int64)
+    offsets = np.concatenate(([0], np.cumsum(sizes)))
+    total = int(offsets[-1])
+    rows, indices, weights = [], [], []
+    for offset, G in zip(offsets, graphs):
+        indptr, cols, w = G.csr()
+        rows.append(offset + np.repeat(np.arange(len(indptr) - 1, dtype=np.int64), np.diff(indptr)))
+        indices.append(offset + np.asarray(cols, dtype=np.int64))
+        weights.append(np.asarray(w, dtype=np.float64))
+    rows = np.concatenate(rows) if rows else np.zeros(0, dtype=np.int64)
+    indices = np.concatenate(indices) if indices else np.zeros(0, dtype=np.int64)
+    weights = np.concatenate(weights) if weights else np.zeros(0)
+    block = np.repeat(np.arange(len(graphs)), sizes)
+
+    out_weight = np.bincount(rows, weights=weights, minlength=total)
+    # 与_PageRankOperator一致：出边权重之和为0的节点按悬挂节点处理
+    transition = np.divide(weights, out_weight[rows], out=np.zeros(len(weights)), where=out_weight[rows] > 0)
+    dangling = (out_weight <= 0).astype(np.float64)
+    p = 1.0 / sizes[block]
+    x = p.copy()
+    iterations = np.zeros(len(graphs), dtype=np.int64)
+    active = sizes > 0
+    for iteration in range(1, max_iter + 1):
+        x_last = x
+        x = alpha * np.bincount(indices, weights=x_last[rows] * transition, minlength=total)
+        dangling_sum = np.bincount(block, weights=x_last * dangling, minlength=len(graphs))
+        x += (alpha * dangling_sum[block] + (1.0 - alpha)) * p
+        # 已收敛的分块保持不变
+        x = np.where(active[block], x, x_last)
+        error = np.bincount(block, weights=np.abs(x - x_last), minlength=len(graphs))
+        iterations[active] = iteration
+        active &= ~(error < sizes * tol)
+        if not active.any():
+            return [x[offsets[i]:offsets[i + 1]] for i in range(len(graphs))], iterations.tolist()
+    raise RuntimeError(f"PageRank在{max_iter}次迭代内未收敛")
+
+
+def pagerank_series(graphs, alpha=0.85, max_iter=100, tol=1.0e-6, warm_start=True):
+    """
+    计算一组时序图（如逐月快照）的PageRank
+
+    参数:
+        warm_start: 每个图以上一个图收敛后的得分作为初始向量（按节点对齐，新节点取均匀值）；
+            相邻月份的网络相似时可大幅减少迭代次数。每个月先比较热启动向量与均匀向量的一步残差，
+            选用更接近不动点的一个，因此网络变化很大时不会比冷启动更慢。
+            为False时全部图拼成分块对角矩阵一次批量迭代
+
+    返回:
+        (每个图的得分数组列表, 每个图的迭代次数列表)
+    """
+    graphs = [as_sparse(G) for G in graphs]
+    if not warm_start:
+        return _pagerank_batch(graphs, alpha=alpha, max_iter=max_iter, tol=tol)
+
+    all_labels = unique_sorted(np.concatenate([G.labels() for G in graphs])) if graphs else np.zeros(0)
+    previous = np.full(len(all_labels), np.nan)
+    scores, iterations = [], []
+    for G in graphs:
+        position = encode(G.labels(), all_labels)
+        start = previous[position]
+        extra = 0
+        if len(start) and not np.isnan(start).all():
+            start = np.where(np.isnan(start), 1.0 / len(start), start)
+            start /= start.sum()
+            uniform = np.full(len(start), 1.0 / len(start))
+            step = _PageRankOperator(G, alpha)
+            # 各做一步迭代比较残差，从残差较小的一个迭代一步后的向量继续（两步都计入迭代次数）
+            warm_next, uniform_next = step(start), step(uniform)
+            if np.abs(warm_next - start).sum() < np.abs(uniform_next - uniform).sum():
+                start = warm_next
+            else:
+                start = uniform_next
+            extra = 2
+        else:
+            start = None
+        x, iteration = pagerank_vector(G, alpha=alpha, max_iter=max_iter, tol=tol, start=start)
+        previous[position] = x
+        scores.append(x)
+        iterations.append(iteration + extra)
+    return scores, iterations
+
+
+def degree_vector(G):
+    """按节点编号的度数（有向图为入度+出度，自环计2）"""
+    indptr, indices, _ = G.csr()
+    n = len(indptr) - 1
+    out_degree = np.diff(indptr)
+    if G.directed:
+        return out_degree + np.bincount(indices, minlength=n)
+    rows = np.repeat(np.arange(n), out_degree)
+    return out_degree + np.bincount(rows[rows == indices], minlength=n)
+
+
+def degree_centrality(G):
+    """返回 {节点: 度中心性}，与networkx.degree_centrality一致"""
+    G = as_sparse(G)
+    n = G.number_of_nodes()
+    labels = G.labels().tolist()
+    if n <= 1:
+        return {node: 1.0 for node in labels}
+    return dict(zip(labels, (degree_vector(G) / (n - 1)).tolist()))
+
+
+def connected_component_labels(G):
+    """按节点编号的（弱）连通分量标签：标签传播 + 指针跳跃"""
+    indptr, indices, _ = G.csr()
+    n = len(indptr) - 1
+    rows = np.repeat(np.arange(n, dtype=np.int64), np.diff(indptr))
+    labels = np.arange(n, dtype=np.int64)
+    while True:
+        previous = labels
+        labels = labels.copy()
+        np.minimum.at(labels, rows, previous[indices])
+        np.minimum.at(labels, indices, previous[rows])
+        labels = labels[labels]
+        if np.array_equal(labels, previous):
+            return labels
+
+
+def connected_components(G):
+    """返回连通分量列表 [set(节点), ...]"""
+    G = as_sparse(G)
+    component = connected_component_labels(G)
+    order = np.argsort(component, kind='stable')
+    bounds = np.flatnonzero(np.diff(component[order])) + 1
+    labels = G.labels()
+    return [set(labels[group].tolist()) for group in np.split(order, bounds)] if len(order) else []
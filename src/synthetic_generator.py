@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+大规模模拟协作网络生成器（用于压测下游流水线）
+按月整批用NumPy生成协作事件，不逐条构造字典：
+- 优先连接：被选中概率与 (初始吸引力 + 历史度数)^指数 成正比，度分布呈幂律
+- 社区结构：大部分协作发生在同一社区内部
+- 人员流动：开发者陆续加入，并以一定概率在之后的月份离开
+- 技术栈同质性：社区有主导技术栈，同技术栈协作权重更高
+输出只取决于seed与各参数（不依赖运行时的日期），相同参数下完全一致；结果按块流式写入月份分区
+
+用法:
+    python synthetic_generator.py --developers 1000000 --events-per-month 20000000 --seed 42
+"""
+
+import argparse
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from developer_registry import DEVELOPER_COLUMNS, TECH_STACKS
+from edge_store import DEFAULT_PARTITION_DIR, EDGE_COLUMNS, append_partitions
+
+PROJECT_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(PROJECT_PATH, 'data')
+# 默认的最后一个月，与仓库中现有数据（2025-01 ~ 2025-12）一致；固定取值保证同一seed在任何时候生成相同的数据
+DEFAULT_END_MONTH = '2025-12'
+
+
+class SyntheticNetwork:
+    """
+    模拟协作网络
+
+    参数:
+        num_developers: 开发者总数（含后续加入的）
+        months: 月份数
+        events_per_month: 每月协作事件数，按当月在岗人数相对总人数缩放
+        num_communities: 社区数
+        intra_community: 协作对象来自同一社区的概率
+        homophily: 开发者使用所在社区主导技术栈的概率
+        churn_rate: 在岗开发者每月离开的概率
+        initial_fraction: 第一个月已经加入的开发者比例，其余在之后的月份陆续加入
+        attachment_exponent: 优先连接的度数指数，0表示不做优先连接
+        end_month: 最后一个月（YYYY-MM），默认DEFAULT_END_MONTH
+        seed: 随机种子
+    """
+
+    def __init__(self, num_developers=50, months=12, events_per_month=150, num_communities=8,
+                 intra_community=0.8, homophily=0.7, churn_rate=0.02, initial_fraction=0.6,
+                 attachment_exponent=1.0, end_month=None, seed=None):
+        self.num_developers = num_developers
+        self.months = months
+        self.events_per_month = events_per_month
+        self.num_communities = max(1, min(num_communities, num_developers))
+        self.intra_community = intra_community
+        self.homophily = homophily
+        self.churn_rate = churn_rate
+        self.initial_fraction = initial_fraction
+        self.attachment_exponent = attachment_exponent
+        self.seed = seed
+        end = np.datetime64(end_month or DEFAULT_END_MONTH, 'M')
+        self.month_starts = end - np.arange(months - 1, -1, -1)
+        self.rng = np.random.default_rng(seed)
+        self._init_developers()
+
+    def _init_developers(self):
+        rng = self.rng
+        n = self.num_developers
+        # 社区规模不均匀
+        community_sizes = rng.dirichlet(np.full(self.num_communities, 2.0))
+        self.community = rng.choice(self.num_communities, size=n, p=community_sizes).astype(np.int32)
+        community_tech = rng.integers(len(TECH_STACKS), size=self.num_communities)
+        random_tech = rng.integers(len(TECH_STACKS), size=n)
+        self.tech = np.where(rng.random(n) < self.homophily, community_tech[self.community], random_tech).astype(np.int8)
+        self.activity = rng.uniform(0.3, 1.0, size=n)
+        # 适应度（初始吸引力）服从Pareto分布，保证即使没有历史度数也存在少量核心开发者
+        self.fitness = rng.pareto(2.0, size=n) + 1.0
+
+        initial = rng.random(n) < self.initial_fraction
+        self.join_month = np.where(initial, 0, rng.integers(1, max(self.months, 2), size=n)).astype(np.int32)
+        if self.churn_rate > 0:
+            tenure = rng.geometric(self.churn_rate, size=n)
+            self.leave_month = np.minimum(self.join_month + tenure, self.months).astype(np.int32)
+        else:
+            self.leave_month = np.full(n, self.months, dtype=np.int32)
+        self.join_offset = rng.integers(0, 28, size=n)
+        self.degree = np.zeros(n, dtype=np.int64)
+
+    def developers_frame(self):
+        """开发者信息表，列与developers.csv一致"""
+        join_date = self.month_starts[0].astype('datetime64[D]') + (self.join_month * 30 + self.join_offset)
+        return pd.DataFrame({
+            'developer_id': np.arange(1, self.num_developers + 1),
+            'name': [f'Dev_{i:03d}' for i in range(1, self.num_developers + 1)],
+            'primary_tech': np.asarray(TECH_STACKS)[self.tech],
+            'join_date': np.datetime_as_string(join_date, unit='D'),
+            'activity_level': self.activity.round(4),
+            'community': self.community
+        }, columns=DEVELOPER_COLUMNS + ['community'])
+
+    def _sample_targets(self, sources, active, weights):
+        """按社区内/全局的加权概率为每个事件抽取协作对象（按社区分段的累积和上二分查找）"""
+        rng = self.rng
+        order = np.argsort(self.community[active], kind='stable')
+        members = active[order]
+        cumulative = np.cumsum(weights[members])
+        total = cumulative[-1]
+        bounds = np.searchsorted(self.community[members], np.arange(self.num_communities + 1))
+        community_start = np.concatenate(([0.0], cumulative))[bounds[:-1]]
+        community_total = np.concatenate(([0.0], cumulative))[bounds[1:]] - community_start
+
+        source_community = self.community[sources]
+        local = (rng.random(len(sources)) < self.intra_community) & (community_total[source_community] > 0)
+        offsets = rng.random(len(sources))
+        offsets = np.where(local,
+                           community_start[source_community] + offsets * community_total[source_community],
+                           offsets * total)
+        index = np.minimum(np.searchsorted(cumulative, offsets, side='right'), len(members) - 1)
+        return members[index]
+
+    def iter_month(self, month_index, chunk_size=1000000):
+        """逐块产出某个月的协作事件（列为EDGE_COLUMNS）"""
+        rng = self.rng
+        active = np.flatnonzero((self.join_month <= month_index) & (self.leave_month > month_index))
+        if len(active) < 2:
+            return
+        num_events = int(round(self.events_per_month * len(active) / self.num_developers))
+        # 初始吸引力按每人每月的期望度数缩放，避免早期少数节点滚雪球式垄断
+        attractiveness = self.fitness[active] * (2.0 * self.events_per_month / self.num_developers)
+        weights = (attractiveness + self.degree[active]) ** self.attachment_exponent
+        source_weights = np.cumsum(weights * self.activity[active])
+
+        month_start = self.month_starts[month_index]
+        days_in_month = int(((month_start + 1).astype('datetime64[D]') - month_start.astype('datetime64[D]')).astype(int))
+        year_month = str(month_start)
+        tech_names = np.asarray(TECH_STACKS, dtype=object)
+
+        weight_by_index = np.zeros(self.num_developers)
+        weight_by_index[active] = weights
+        month_degree = np.zeros(self.num_developers, dtype=np.int64)
+        for chunk_start in range(0, num_events, chunk_size):
+            size = min(chunk_size, num_events - chunk_start)
+            sources = active[np.searchsorted(source_weights, rng.random(size) * source_weights[-1], side='right')
+                             .clip(max=len(active) - 1)]
+            targets = self._sample_targets(sources, active, weight_by_index)
+            # 自环改为在全体在岗开发者中重抽一次，仍冲突的丢弃
+            loops = sources == targets
+            if loops.any():
+                targets[loops] = active[rng.integers(len(active), size=int(loops.sum()))]
+                keep = sources != targets
+                sources, targets = sources[keep], targets[keep]
+
+            source_tech, target_tech = self.tech[sources], self.tech[targets]
+            tech_match = np.where(source_tech == target_tech, 1.0, 0.3)
+            days = month_start.astype('datetime64[D]') + rng.integers(days_in_month, size=len(sources))
+            month_degree += np.bincount(sources, minlength=self.num_developers)
+            month_degree += np.bincount(targets, minlength=self.num_developers)
+            yield pd.DataFrame({
+                'source': sources + 1,
+                'target': targets + 1,
+                'weight': (tech_match * rng.uniform(0.5, 1.5, size=len(sources))).round(2),
+                'timestamp': np.datetime_as_string(days, unit='D'),
+                'year_month': year_month,
+                'source_tech': tech_names[source_tech],
+                'target_tech': tech_names[target_tech]
+            }, columns=EDGE_COLUMNS)
+        # 本月的协作在下个月才影响优先连接
+        self.degree += month_degree
+
+    def iter_edges(self, chunk_size=1000000):
+        """按时间顺序逐块产出全部协作事件"""
+        for month_index in range(self.months):
+            yield from self.iter_month(month_index, chunk_size)
+
+
+class _MonthlyMetrics:
+    """分块累计月度指标，结果与compute_monthly_metrics一致"""
+
+    def __init__(self, num_developers):
+        self.num_developers = num_developers
+        self.rows = []
+        self.year_month = None
+
+    def _reset(self, year_month):
+        self.year_month = year_month
+        self.count = 0
+        self.weight_sum = 0.0
+        self.active = np.zeros(self.num_developers + 1, dtype=bool)
+        # 每块去重后的协作对编码，月末合并时再整体去重一次（避免每块都对累计集合重新排序）
+        self.pairs = []
+
+    def add(self, chunk_df):
+        year_month = chunk_df['year_month'].iloc[0]
+        if year_month != self.year_month:
+            self.finish()
+            self._reset(year_month)
+        sources = chunk_df['source'].to_numpy(dtype=np.int64)
+        targets = chunk_df['target'].to_numpy(dtype=np.int64)
+        self.count += len(chunk_df)
+        self.weight_sum += float(chunk_df['weight'].sum())
+        self.active[sources] = True
+        self.active[targets] = True
+        self.pairs.append(np.unique(sources * (self.num_developers + 1) + targets))
+
+    def finish(self):
+        if self.year_month is None or self.count == 0:
+            return
+        self.rows.append({
+            'year_month': self.year_month,
+            'num_collaborations': self.count,
+            'num_active_developers': int(self.active.sum()),
+            'avg_collab_weight': round(self.weight_sum / self.count, 4),
+            'unique_pairs': len(np.unique(np.concatenate(self.pairs)))
+        })
+        self.year_month = None
+
+    def frame(self):
+        self.finish()
+        return pd.DataFrame(self.rows, columns=['year_month', 'num_collaborations', 'num_active_developers',
+                                                'avg_collab_weight', 'unique_pairs'])
+
+
+def generate_synthetic_data(data_dir=None, chunk_size=1000000, write_csv=True, **network_kwargs):
+    """
+    生成模拟数据并写入data目录：developers.csv、月份分区、monthly_metrics.csv、latest_network.csv，
+    以及（可选）collaborations_temporal.csv
+
+    参数:
+        chunk_size: 每块协作事件数，决定内存峰值
+        write_csv: 是否同时导出完整的collaborations_temporal.csv（超大规模时可关闭）
+        network_kwargs: 透传给SyntheticNetwork的参数
+    """
+    data_dir = data_dir or DATA_DIR
+    os.makedirs(data_dir, exist_ok=True)
+    network = SyntheticNetwork(**network_kwargs)
+
+    print("=" * 60)
+    print(f"生成模拟协作网络: {network.num_developers} 位开发者, {network.months} 个月, seed={network.seed}")
+    print("=" * 60)
+
+    print("1. 生成开发者信息...")
+    developers_df = network.developers_frame()
+    developers_df.to_csv(os.path.join(data_dir, 'developers.csv'), index=False)
+    print(f"    developers.csv: {len(developers_df)} 位开发者")
+
+    print("2. 流式生成协作事件...")
+    partition_dir = os.path.join(data_dir, os.path.basename(DEFAULT_PARTITION_DIR))
+    if os.path.isdir(partition_dir):
+        shutil.rmtree(partition_dir)
+    collaborations_csv_path = os.path.join(data_dir, 'collaborations_temporal.csv')
+    latest_csv_path = os.path.join(data_dir, 'latest_network.csv')
+    metrics = _MonthlyMetrics(network.num_developers)
+    total = 0
+    last_month = None
+    for seq, chunk_df in enumerate(network.iter_edges(chunk_size)):
+        year_month = chunk_df['year_month'].iloc[0]
+        append_partitions(chunk_df, root=partition_dir, run_id=f'synthetic-{seq:06d}')
+        if write_csv:
+            chunk_df.to_csv(collaborations_csv_path, mode='w' if seq == 0 else 'a', header=seq == 0, index=False)
+        # latest_network.csv 只保留最后一个月
+        chunk_df[['source', 'target', 'weight']].to_csv(latest_csv_path, mode='a' if year_month == last_month else 'w',
+                                                        header=year_month != last_month, index=False)
+        if year_month != last_month:
+            print(f"    {year_month}...")
+        last_month = year_month
+        metrics.add(chunk_df)
+        total += len(chunk_df)
+    print(f"    共生成 {total} 条协作记录")
+
+    print("3. 生成月度聚合指标...")
+    monthly_df = metrics.frame()
+    monthly_df.to_csv(os.path.join(data_dir, 'monthly_metrics.csv'), index=False)
+    print(f"    monthly_metrics.csv: {len(monthly_df)} 个月份")
+    return developers_df, monthly_df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="生成大规模模拟协作网络")
+    parser.add_argument('--developers', type=int, default=50)
+    parser.add_argument('--months', type=int, default=12)
+    parser.add_argument('--events-per-month', type=int, default=150)
+    parser.add_argument('--communities', type=int, default=8)
+    parser.add_argument('--intra-community', type=float, default=0.8)
+    parser.add_argument('--homophily', type=float, default=0.7)
+    parser.add_argument('--churn', type=float, default=0.02)
+    parser.add_argument('--attachment-exponent', type=float, default=1.0)
+    parser.add_argument('--end-month', default=DEFAULT_END_MONTH,
+                        help=f"最后一个月，如2026-10，默认{DEFAULT_END_MONTH}")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--chunk-size', type=int, default=1000000)
+    parser.add_argument('--no-csv', action='store_true', help="不导出完整的collaborations_temporal.csv")
+    args = parser.parse_args()
+
+    generate_synthetic_data(chunk_size=args.chunk_size, write_csv=not args.no_csv,
+                            num_developers=args.developers, months=args.months,
+                            events_per_month=args.events_per_month, num_communities=args.communities,
+                            intra_community=args.intra_community, homophily=args.homophily,
+                            churn_rate=args.churn, attachment_exponent=args.attachment_exponent,
+                            end_month=args.end_month, seed=args.seed)
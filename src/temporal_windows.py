@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+滑动时间窗口上的协作图（如最近90天、每周推进一次）
+
+协作事件按时间排序后只进入、离开窗口各一次：窗口推进时，新进入窗口的事件与
+离开窗口的事件分别合并成 (source, target) 的增量（见edge_consolidation），只更新涉及的边与节点，
+不按窗口从原始记录重建图。边权（窗口内权重之和）、事件数、节点度数与强度、连通分量数都随增量维护：
+- 新增的边用并查集合并连通分量；
+- 边或节点离开窗口后分量可能分裂，只标记失效，下次查询时由当前的边重建并查集
+
+用法:
+    python temporal_windows.py                          # 90天窗口、每周推进，打印各窗口指标
+    python temporal_windows.py --window 30 --step 1     # 30天窗口、每天推进
+    python temporal_windows.py --check                  # 同时与逐窗口重建的结果比较
+"""
+
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+
+from edge_consolidation import consolidate_edges
+from graph_snapshot import build_snapshot
+
+
+class RollingWindowGraph:
+    """
+    时间窗口 [end - window_days, end) 内的协作图
+
+    参数:
+        events_df: 协作事件，包含source/target/weight/timestamp列
+        window_days: 窗口长度（天）
+        directed: False时 (u, v) 与 (v, u) 视为同一条边
+
+    属性:
+        start, end: 当前窗口（numpy datetime64[D]），尚未推进时为None
+        stats: 累计进入/离开窗口的事件数与连通分量重建次数
+    """
+
+    def __init__(self, events_df, window_days=90, directed=True):
+        timestamps = pd.to_datetime(events_df['timestamp']).to_numpy().astype('datetime64[D]')
+        order = np.argsort(timestamps, kind='stable')
+        self._time = timestamps[order]
+        self._source = events_df['source'].to_numpy()[order]
+        self._target = events_df['target'].to_numpy()[order]
+        self._weight = (events_df['weight'].to_numpy(dtype=np.float64)[order] if 'weight' in events_df.columns
+                        else np.ones(len(order)))
+        self.window = np.timedelta64(int(window_days), 'D')
+        self.directed = directed
+        self.start = None
+        self.end = None
+        self._head = 0   # 下一个进入窗口的事件
+        self._tail = 0   # 下一个离开窗口的事件
+        self._pairs = {}        # (u, v) -> [权重之和, 事件数]
+        self._node_events = {}  # 节点 -> 窗口内涉及该节点的事件数
+        self._neighbors = {}    # 节点 -> {无向邻居: 连接它们的有向边数}
+        self._strength = {}     # 节点 -> 关联边的权重之和
+        self._num_events = 0
+        self._total_weight = 0.0
+        self._parent = {}
+        self._num_components = 0
+        self._components_valid = True
+        self.stats = {'entered': 0, 'expired': 0, 'component_rebuilds': 0}
+
+    # ---- 窗口推进 ----
+
+    def advance_to(self, end):
+        """把窗口移动到 [end - window_days, end)，end不能早于当前窗口"""
+        end = np.datetime64(end, 'D')
+        if self.end is not None and end < self.end:
+            raise ValueError(f"窗口只能向后推进: {end} < {self.end}")
+        start = end - self.window
+        enter = int(np.searchsorted(self._time, end, side='left'))
+        expire = int(np.searchsorted(self._time, start, side='left'))
+        # 已在窗口中的事件先离开；一步跨过整个窗口的事件不进入
+        self._apply(self._tail, min(expire, self._head), -1)
+        self._apply(max(self._head, expire), enter, +1)
+        self._tail = max(self._tail, expire)
+        self._head = max(self._head, enter)
+        self.start, self.end = start, end
+        return self
+
+    def iter_windows(self, step_days=7, first_end=None, last_end=None):
+        """
+        每次推进step_days天并返回自身
+
+        参数:
+            first_end: 第一个窗口的末端，默认为最早事件的日期加step_days
+            last_end: 最后一个窗口的末端，默认为覆盖最晚事件的第一个末端
+        """
+        if len(self._time) == 0:
+            return
+        step = np.timedelta64(int(step_days), 'D')
+        end = np.datetime64(first_end, 'D') if first_end is not None else self._time[0] + step
+        if last_end is not None:
+            last_end = np.datetime64(last_end, 'D')
+        while (end <= last_end) if last_end is not None else (end - step <= self._time[-1]):
+            yield self.advance_to(end)
+            end = end + step
+
+    def _apply(self, lo, hi, sign):
+        """把事件 [lo, hi) 合并成边的增量后加入（sign=1）或移出（sign=-1）窗口"""
+        if hi <= lo:
+            return
+        delta = consolidate_edges(self._source[lo:hi], self._target[lo:hi], self._weight[lo:hi],
+                                  directed=self.directed)
+        for u, v, weight, count in zip(delta['source'].tolist(), delta['target'].tolist(),
+                                       delta['weight_sum'].tolist(), delta['count'].tolist()):
+            self._strength[u] = self._strength.get(u, 0.0) + sign * weight
+            if v != u:
+                self._strength[v] = self._strength.get(v, 0.0) + sign * weight
+            pair = self._pairs.get((u, v))
+            if sign > 0:
+                if pair is None:
+                    self._pairs[(u, v)] = [weight, count]
+                    self._link(u, v)
+                else:
+                    pair[0] += weight
+                    pair[1] += count
+            else:
+                pair[1] -= count
+                if pair[1] == 0:
+                    del self._pairs[(u, v)]
+                    self._unlink(u, v)
+                else:
+                    pair[0] -= weight
+        nodes, counts = np.unique(np.concatenate([self._source[lo:hi], self._target[lo:hi]]), return_counts=True)
+        for node, count in zip(nodes.tolist(), counts.tolist()):
+            remaining = self._node_events.get(node, 0) + sign * count
+            if remaining > 0:
+                if node not in self._node_events:
+                    self._add_node(node)
+                self._node_events[node] = remaining
+            else:
+                self._remove_node(node)
+        self._num_events += sign * (hi - lo)
+        self._total_weight += sign * float(self._weight[lo:hi].sum())
+        self.stats['entered' if sign > 0 else 'expired'] += hi - lo
+
+    # ---- 节点、边与连通分量 ----
+
+    def _add_node(self, node):
+        self._neighbors.setdefault(node, {})
+        if self._components_valid and node not in self._parent:
+            self._parent[node] = node
+            self._num_components += 1
+
+    def _remove_node(self, node):
+        self._node_events.pop(node, None)
+        self._neighbors.pop(node, None)
+        self._strength.pop(node, None)
+        self._components_valid = False
+
+    def _link(self, u, v):
+        if u == v:
+            return
+        for a, b in ((u, v), (v, u)):
+            neighbors = self._neighbors.setdefault(a, {})
+            neighbors[b] = neighbors.get(b, 0) + 1
+        if self._components_valid:
+            for node in (u, v):
+                if node not in self._parent:
+                    self._parent[node] = node
+                    self._num_components += 1
+            self._union(u, v)
+
+    def _unlink(self, u, v):
+        if u == v:
+            return
+        for a, b in ((u, v), (v, u)):
+            neighbors = self._neighbors[a]
+            neighbors[b] -= 1
+            if neighbors[b] == 0:
+                del neighbors[b]
+                self._components_valid = False
+
+    def _find(self, node):
+        parent = self._parent
+        root = node
+        while parent[root] != root:
+            root = parent[root]
+        while parent[node] != root:
+            parent[node], node = root, parent[node]
+        return root
+
+    def _union(self, u, v):
+        root_u, root_v = self._find(u), self._find(v)
+        if root_u != root_v:
+            self._parent[root_u] = root_v
+            self._num_components -= 1
+
+    def _rebuild_components(self):
+        self._parent = {node: node for node in self._node_events}
+        self._num_components = len(self._parent)
+        for u, neighbors in self._neighbors.items():
+            for v in neighbors:
+                if u < v:
+                    self._union(u, v)
+        self._components_valid = True
+        self.stats['component_rebuilds'] += 1
+
+    # ---- 查询 ----
+
+    def num_nodes(self):
+        return len(self._node_events)
+
+    def num_edges(self):
+        return len(self._pairs)
+
+    def num_components(self):
+        if not self._components_valid:
+            self._rebuild_components()
+        return self._num_components
+
+    def degree(self):
+        """{节点: 窗口内的无向邻居数}（不含自环）"""
+        return {node: len(self._neighbors.get(node, ())) for node in self._node_events}
+
+    def strength(self):
+        """{节点: 关联边的权重之和}"""
+        return {node: self._strength.get(node, 0.0) for node in self._node_events}
+
+    def edges(self):
+        """[(u, v, 权重之和, 事件数)]"""
+        return [(u, v, weight, count) for (u, v), (weight, count) in self._pairs.items()]
+
+    def to_snapshot(self):
+        """当前窗口的CSR快照（无向时每条边按 较小节点 -> 较大节点 存一次），可交给GraphEngine计算其他指标"""
+        if self._pairs:
+            source, target = (np.array(side) for side in zip(*self._pairs))
+            weights = np.array([weight for weight, _ in self._pairs.values()])
+        else:
+            source = target = np.zeros(0, dtype=np.int64)
+            weights = np.zeros(0)
+        return build_snapshot(source, target, weights, nodes=np.array(list(self._node_events), dtype=np.int64),
+                              year_month=f"{self.start}~{self.end}")
+
+    def metrics(self):
+        """当前窗口的网络级指标"""
+        n = self.num_nodes()
+        m = self.num_edges()
+        pairs = n * (n - 1) if self.directed else n * (n - 1) / 2
+        return {
+            'window_start': str(self.start),
+            'window_end': str(self.end),
+            'num_active_developers': n,
+            'num_collaborations': self._num_events,
+            'num_edges': m,
+            'total_weight': round(self._total_weight, 6),
+            'avg_degree': sum(len(neighbors) for neighbors in self._neighbors.values()) / n if n else 0,
+            'network_density': m / pairs if pairs else 0,
+            'num_connected_components': self.num_components(),
+        }
+
+
+def rolling_window_metrics(events_df, window_days=90, step_days=7, directed=True, first_end=None, last_end=None):
+    """各滑动窗口的网络级指标DataFrame"""
+    graph = RollingWindowGraph(events_df, window_days=window_days, directed=directed)
+    return pd.DataFrame([window.metrics() for window in graph.iter_windows(step_days, first_end, last_end)])
+
+
+def window_metrics_from_scratch(events_df, start, end, directed=True):
+    """由原始事件重建一个窗口并计算指标（用于校验增量结果）"""
+    import networkx as nx
+    timestamps = pd.to_datetime(events_df['timestamp']).to_numpy().astype('datetime64[D]')
+    window_df = events_df[(timestamps >= np.datetime64(start, 'D')) & (timestamps < np.datetime64(end, 'D'))]
+    consolidated = consolidate_edges(window_df['source'].to_numpy(), window_df['target'].to_numpy(),
+                                     window_df['weight'].to_numpy(), directed=directed)
+    G = nx.Graph()
+    G.add_nodes_from(np.concatenate([window_df['source'].to_numpy(), window_df['target'].to_numpy()]).tolist())
+    G.add_edges_from((u, v) for u, v in zip(consolidated['source'].tolist(), consolidated['target'].tolist())
+                     if u != v)
+    return {
+        'num_active_developers': G.number_of_nodes(),
+        'num_collaborations': len(window_df),
+        'num_edges': len(consolidated['source']),
+        'total_weight': round(float(window_df['weight'].sum()), 6),
+        'num_connected_components': nx.number_connected_components(G),
+        'degree': dict(G.degree()),
+    }
+
+
+if __name__ == "__main__":
+    from edge_store import load_collaborations
+
+    parser = argparse.ArgumentParser(description="滑动时间窗口的协作网络指标")
+    parser.add_argument('--window', type=int, default=90, help="窗口长度（天）")
+    parser.add_argument('--step', type=int, default=7, help="推进步长（天）")
+    parser.add_argument('--undirected', action='store_true')
+    parser.add_argument('--check', action='store_true', help="与逐窗口重建的结果比较")
+    parser.add_argument('--output', default=None, help="保存指标CSV的路径")
+    args = parser.parse_args()
+
+    events_df = load_collaborations(columns=['source', 'target', 'weight', 'timestamp'])
+    if events_df.empty:
+        print("没有协作数据")
+        sys.exit(1)
+    graph = RollingWindowGraph(events_df, window_days=args.window, directed=not args.undirected)
+    rows = []
+    mismatches = 0
+    for window in graph.iter_windows(args.step):
+        rows.append(window.metrics())
+        if args.check:
+            expected = window_metrics_from_scratch(events_df, window.start, window.end, window.directed)
+            degree = expected.pop('degree')
+            actual = {key: rows[-1][key] for key in expected}
+            if actual != expected or window.degree() != degree:
+                mismatches += 1
+                print(f"   {window.start} ~ {window.end} 不一致: 增量 {actual} / 重建 {expected}")
+    metrics_df = pd.DataFrame(rows)
+    print(metrics_df.to_string(index=False))
+    print(f"\n{len(metrics_df)} 个窗口，事件进入 {graph.stats['entered']} 次、离开 {graph.stats['expired']} 次，"
+          f"连通分量重建 {graph.stats['component_rebuilds']} 次")
+    if args.check:
+        print(f"与逐窗口重建比较: {'全部一致' if mismatches == 0 else f'{mismatches} 个窗口不一致'}")
+    if args.output:
+        metrics_df.to_csv(args.output, index=False, encoding='utf-8')
+        print(f"已保存: {args.output}")
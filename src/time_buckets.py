@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+协作事件的时间粒度（日/周/月/季度）与时间索引
+
+事件的时间戳先换算为整数的桶编号（天数、周数、月数、季度数，随时间单调递增），
+再用一次bincount统计各桶的事件数、一次稳定排序得到按桶分组的事件下标，
+整个过程都是数组运算，不按桶逐个筛选DataFrame；桶标签只为出现过的桶生成。
+
+桶标签与时间列名:
+    day      date        2025-03-14
+    week     week        2025-03-10（该周周一）
+    month    year_month  2025-03
+    quarter  quarter     2025-Q1
+
+月份分区（data/collaborations_temporal/year_month=YYYY-MM）仍按月存储，其他粒度由timestamp列换算。
+
+用法:
+    index = TemporalIndex.from_frame(edges_df, 'week')
+    for label, week_df in index.groups(edges_df):
+        ...
+"""
+
+import numpy as np
+import pandas as pd
+
+GRANULARITIES = ('day', 'week', 'month', 'quarter')
+DEFAULT_GRANULARITY = 'month'
+
+# 各粒度的时间列名与输出文件名中使用的形容词
+TIME_KEYS = {'day': 'date', 'week': 'week', 'month': 'year_month', 'quarter': 'quarter'}
+PERIOD_NAMES = {'day': 'daily', 'week': 'weekly', 'month': 'monthly', 'quarter': 'quarterly'}
+PERIOD_LABELS = {'day': '日度', 'week': '周度', 'month': '月度', 'quarter': '季度'}
+
+
+def check_granularity(granularity):
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"未知的时间粒度: {granularity}，可选 {GRANULARITIES}")
+    return granularity
+
+
+def time_key(granularity):
+    """该粒度下的时间列名（月为year_month，与原有数据一致）"""
+    return TIME_KEYS[check_granularity(granularity)]
+
+
+def period_filename(filename, granularity):
+    """
+    按粒度区分的输出文件名：月粒度保持原名，其他粒度在扩展名前加后缀，
+    文件名中已含monthly的直接替换，如 monthly_metrics.csv -> weekly_metrics.csv
+    """
+    check_granularity(granularity)
+    if granularity == 'month':
+        return filename
+    if 'monthly' in filename:
+        return filename.replace('monthly', PERIOD_NAMES[granularity])
+    stem, ext = filename.rsplit('.', 1)
+    return f"{stem}_{PERIOD_NAMES[granularity]}.{ext}"
+
+
+def to_days(timestamps):
+    """时间戳（日期字符串或datetime64）-> datetime64[D]数组"""
+    values = np.asarray(timestamps)
+    if values.dtype.kind == 'M':
+        return values.astype('datetime64[D]')
+    parsed = pd.to_datetime(pd.Index(values), format='ISO8601')
+    if parsed.tz is not None:
+        parsed = parsed.tz_convert(None)
+    return parsed.to_numpy().astype('datetime64[D]')
+
+
+def bucket_codes(timestamps, granularity):
+    """每个事件所在桶的整数编号（随时间单调递增）"""
+    check_granularity(granularity)
+    days = to_days(timestamps)
+    if granularity == 'day':
+        return days.astype(np.int64)
+    if granularity == 'week':
+        # 1970-01-01是周四，+3后按7整除即以周一为一周的开始
+        return (days.astype(np.int64) + 3) // 7
+    months = days.astype('datetime64[M]').astype(np.int64)
+    return months if granularity == 'month' else months // 3
+
+
+def bucket_labels(codes, granularity):
+    """桶编号 -> 桶标签字符串数组"""
+    codes = np.asarray(codes, dtype=np.int64)
+    if granularity == 'day':
+        return np.datetime_as_string(codes.astype('datetime64[D]'), unit='D')
+    if granularity == 'week':
+        return np.datetime_as_string((codes * 7 - 3).astype('datetime64[D]'), unit='D')
+    if granularity == 'month':
+        return np.datetime_as_string(codes.astype('datetime64[M]'), unit='M')
+    return np.array([f"{1970 + code // 4}-Q{code % 4 + 1}" for code in codes.tolist()], dtype=str)
+
+
+def bucket_months(codes, granularity):
+    """桶编号 -> (桶内第一个月, 最后一个月) 的YYYY-MM数组，用于确定需要读取的月份分区"""
+    codes = np.asarray(codes, dtype=np.int64)
+    if granularity == 'day':
+        first = last = codes.astype('datetime64[D]').astype('datetime64[M]')
+    elif granularity == 'week':
+        first = (codes * 7 - 3).astype('datetime64[D]').astype('datetime64[M]')
+        last = (codes * 7 + 3).astype('datetime64[D]').astype('datetime64[M]')
+    elif granularity == 'month':
+        first = last = codes.astype('datetime64[M]')
+    else:
+        first = (codes * 3).astype('datetime64[M]')
+        last = first + np.timedelta64(2, 'M')
+    return np.datetime_as_string(first, unit='M'), np.datetime_as_string(last, unit='M')
+
+
+class TemporalIndex:
+    """
+    事件按时间桶的索引
+
+    属性:
+        granularity: 时间粒度
+        codes: 出现过的桶编号（升序）
+        labels: 对应的桶标签
+        counts: 各桶的事件数
+        bucket_of: 每个事件所在桶在codes中的下标
+    """
+
+    def __init__(self, timestamps=None, granularity=DEFAULT_GRANULARITY, codes=None):
+        self.granularity = check_granularity(granularity)
+        event_codes = bucket_codes(timestamps, granularity) if codes is None else np.asarray(codes, dtype=np.int64)
+        if len(event_codes) == 0:
+            self.codes = np.zeros(0, dtype=np.int64)
+            self.counts = np.zeros(0, dtype=np.int64)
+            self.bucket_of = np.zeros(0, dtype=np.int64)
+        else:
+            # 桶编号是较稠密的整数，直接bincount，不排序
+            lowest = event_codes.min()
+            counts = np.bincount(event_codes - lowest)
+            present = np.flatnonzero(counts)
+            lookup = np.full(len(counts), -1, dtype=np.int64)
+            lookup[present] = np.arange(len(present))
+            self.codes = present + lowest
+            self.counts = counts[present]
+            self.bucket_of = lookup[event_codes - lowest]
+        self.labels = bucket_labels(self.codes, granularity)
+        self.offsets = np.concatenate([[0], np.cumsum(self.counts)]).astype(np.int64)
+        self._order = None
+
+    @classmethod
+    def from_frame(cls, edges_df, granularity=DEFAULT_GRANULARITY, timestamp='timestamp'):
+        """由DataFrame建立索引；月粒度且有year_month列时直接使用该列（与月份分区一致）"""
+        check_granularity(granularity)
+        if granularity == 'month' and 'year_month' in edges_df.columns:
+            codes = edges_df['year_month'].to_numpy().astype('datetime64[M]').astype(np.int64)
+            return cls(granularity=granularity, codes=codes)
+        return cls(edges_df[timestamp].to_numpy(), granularity)
+
+    def __len__(self):
+        return len(self.codes)
+
+    @property
+    def order(self):
+        """按桶分组的事件下标（桶内保持原顺序）"""
+        if self._order is None:
+            # 桶数不超过65536时按uint16排序，numpy对16位整数的稳定排序是基数排序（线性时间）
+            keys = self.bucket_of.astype(np.uint16) if len(self.codes) <= 65536 else self.bucket_of
+            self._order = np.argsort(keys, kind='stable')
+        return self._order
+
+    def positions(self, i):
+        """第i个桶的事件下标"""
+        return self.order[self.offsets[i]:self.offsets[i + 1]]
+
+    def event_labels(self):
+        """每个事件的桶标签"""
+        return self.labels[self.bucket_of]
+
+    def groups(self, frame):
+        """按时间顺序产出 (桶标签, 该桶的行)"""
+        for i, label in enumerate(self.labels.tolist()):
+            yield label, frame.iloc[self.positions(i)]
+
+
+def add_time_key(edges_df, granularity=DEFAULT_GRANULARITY, timestamp='timestamp'):
+    """返回增加了该粒度时间列（见time_key）的DataFrame；月粒度且已有year_month列时原样返回"""
+    key = time_key(granularity)
+    if key in edges_df.columns:
+        return edges_df
+    index = TemporalIndex.from_frame(edges_df, granularity, timestamp)
+    return edges_df.assign(**{key: index.event_labels()})
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    from edge_store import load_collaborations
+
+    edges_df = load_collaborations(columns=['source', 'target', 'weight', 'timestamp', 'year_month'])
+    for granularity in sys.argv[1:] or GRANULARITIES:
+        start = time.perf_counter()
+        index = TemporalIndex.from_frame(edges_df, granularity)
+        elapsed = time.perf_counter() - start
+        print(f"{granularity:<8} {len(index)} 个时间桶，"
+              f"{index.labels[0] if len(index) else '-'} ~ {index.labels[-1] if len(index) else '-'}，"
+              f"每桶事件数 {index.counts.min() if len(index) else 0}~{index.counts.max() if len(index) else 0}，"
+              f"耗时 {elapsed * 1000:.1f}ms")